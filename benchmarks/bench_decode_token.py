@@ -0,0 +1,48 @@
+"""
+Микробенчмарк decode_token: пропускная способность с кэшем проверенных токенов и без него.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_decode_token.py [--iterations 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from app.core.security import create_access_token, decode_token, token_cache  # noqa: E402
+
+
+def _run(token: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        decode_token(token)
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    token = create_access_token(sub=uuid.uuid4())
+
+    token_cache.enabled = False
+    uncached = _run(token, args.iterations)
+
+    token_cache.enabled = True
+    token_cache.clear()
+    cached = _run(token, args.iterations)
+
+    print(f"uncached: {uncached:>12,.0f} decodes/s")
+    print(f"cached:   {cached:>12,.0f} decodes/s")
+    print(f"speedup:  {cached / uncached:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
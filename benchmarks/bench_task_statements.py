@@ -0,0 +1,114 @@
+"""
+Микробенчмарк выражений для GET /tasks: сборка select() на каждый запрос (как раньше)
+против заранее собранных выражений из task_statements.
+
+Время на запрос делится на:
+  build   — построение дерева выражения;
+  compile — ключ кэша + поиск/компиляция через кэш компиляции SQLAlchemy
+            (то же, что делает Connection.execute);
+  execute — полный round-trip в БД, только с --dsn.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_task_statements.py [--iterations 20000]
+    python benchmarks/bench_task_statements.py --dsn postgresql+asyncpg://u:p@localhost/db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from adapters.db.models.task import Task  # noqa: E402
+from adapters.db.repositories.pagination import order_by_clauses  # noqa: E402
+from adapters.db.repositories.task_statements import (  # noqa: E402
+    READ_COLUMNS,
+    PageShape,
+    page_params,
+    page_statement,
+    sort_keys,
+)
+from domain.value_objects.task_state import TaskState  # noqa: E402
+from sqlalchemy import and_, select  # noqa: E402
+from sqlalchemy.dialects.postgresql import asyncpg  # noqa: E402
+
+Request = Tuple[Any, Dict[str, Any]]
+
+
+def adhoc(owner_id: uuid.UUID, state: TaskState) -> Request:
+    """Как TaskRepository.list до выноса выражений: новое дерево на каждый вызов."""
+    keys = sort_keys()
+    stmt = (
+        select(*READ_COLUMNS, Task.priority_rank)
+        .where(and_(Task.owner_id == owner_id, Task.state == state))
+        .order_by(*order_by_clauses(keys))
+        .limit(51)
+    )
+    return stmt, {}
+
+
+SHAPE = PageShape(owned=True, has_state=True, has_due_before=False)
+
+
+def prebuilt(owner_id: uuid.UUID, state: TaskState) -> Request:
+    params = page_params(SHAPE, owner_id=owner_id, state=state, limit=51)
+    return page_statement(SHAPE), params
+
+
+def _measure(build: Callable[[uuid.UUID, TaskState], Request], iterations: int) -> Dict[str, float]:
+    dialect = asyncpg.dialect()
+    cache: Dict[Any, Any] = {}
+    owners = [uuid.uuid4() for _ in range(64)]
+    build_s = compile_s = 0.0
+    for i in range(iterations):
+        started = time.perf_counter()
+        stmt, _ = build(owners[i % len(owners)], TaskState.TODO)
+        built = time.perf_counter()
+        stmt._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])
+        compile_s += time.perf_counter() - built
+        build_s += built - started
+    return {"build": build_s / iterations * 1e6, "compile": compile_s / iterations * 1e6}
+
+
+async def _measure_execute(
+    dsn: str, build: Callable[[uuid.UUID, TaskState], Request], iterations: int
+) -> float:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(dsn, pool_size=1)
+    try:
+        async with engine.connect() as conn:
+            owner_id = uuid.uuid4()
+            await conn.execute(*build(owner_id, TaskState.TODO))  # прогрев соединения
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await conn.execute(*build(owner_id, TaskState.TODO))
+            return (time.perf_counter() - started) / iterations * 1e6
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--dsn", help="PostgreSQL с применёнными миграциями для замера execute")
+    args = parser.parse_args()
+
+    print(f"{'variant':<10}{'build, µs':>12}{'compile, µs':>14}{'execute, µs':>14}")
+    for name, build in (("adhoc", adhoc), ("prebuilt", prebuilt)):
+        timings = _measure(build, args.iterations)
+        execute = "—"
+        if args.dsn:
+            execute_us = asyncio.run(_measure_execute(args.dsn, build, args.iterations // 10))
+            execute = f"{execute_us:,.1f}"
+        print(f"{name:<10}{timings['build']:>12,.1f}{timings['compile']:>14,.1f}{execute:>14}")
+
+
+if __name__ == "__main__":
+    main()
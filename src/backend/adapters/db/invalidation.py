@@ -0,0 +1,239 @@
+"""
+Шина инвалидации кэшей между воркерами поверх Postgres LISTEN/NOTIFY.
+
+Кэши процесса (principals, task_stats, task_lists) сбрасываются после commit только
+в том воркере, который писал. Чтобы остальные воркеры не отдавали устаревшее до
+истечения TTL, репозитории помечают изменённые ключи через publish(), а перед commit
+транзакция отправляет их одним NOTIFY: сообщение доставляется только если commit
+прошёл. Каждый воркер держит одно выделенное LISTEN-соединение (InvalidationListener)
+и применяет сообщения зарегистрированными обработчиками; они же закрепляют чтения
+владельца за primary, как у записавшего воркера.
+
+NOTIFY не хранится: пока соединение слушателя разорвано, сообщения теряются. Поэтому
+после каждого (пере)подключения кэши данных процесса сбрасываются целиком.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import asyncpg
+from app.core.cache import caches
+from app.core.metrics import registry
+from app.core.settings import CacheBus, DatabaseConfig, config
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+# Виды ключей в сообщениях
+TASKS = "task"  # ключ — owner_id
+USERS = "user"  # ключ — user_id
+FLUSH_ALL = "*"
+# Полезная нагрузка NOTIFY ограничена 8000 байт; длиннее — одно сообщение FLUSH_ALL
+MAX_PAYLOAD_BYTES = 7900
+
+# Идентификатор процесса: свои сообщения слушатель пропускает — их уже применил after_commit
+NODE_ID = uuid.uuid4().hex[:12]
+
+# Публикуют все процессы с cache.bus.enabled, включая jobs без слушателя
+enabled = config.cache.bus.enabled
+
+_PENDING = "cache_invalidation_pending"
+
+_handlers: Dict[str, Callable[[str], None]] = {}
+_flush_hooks: List[Callable[[], None]] = []
+
+_messages = registry.counter("cache_bus_messages_total", "Применённые сообщения шины кэшей")
+_flushes = registry.counter("cache_bus_flushes_total", "Полные сбросы кэшей по шине")
+_reconnects = registry.counter("cache_bus_reconnects_total", "Переподключения LISTEN-соединения")
+
+
+def register(kind: str, handler: Callable[[str], None]) -> None:
+    """Обработчик сообщений вида kind; получает ключ строкой."""
+    _handlers[kind] = handler
+
+
+def on_flush(hook: Callable[[], None]) -> None:
+    """Дополнительное действие при полном сбросе (например, Generations.bump_all)."""
+    _flush_hooks.append(hook)
+
+
+def flush_all() -> None:
+    """Сбросить кэши данных; служебные (flushable=False) остаются."""
+    _flushes.inc()
+    for cache in caches.values():
+        if cache.flushable:
+            cache.clear()
+    for hook in _flush_hooks:
+        hook()
+
+
+def publish(session: AsyncSession, kind: str, key: Any) -> None:
+    """Пометить ключ изменённым; NOTIFY уйдёт один на транзакцию, перед commit."""
+    if enabled:
+        session.info.setdefault(_PENDING, set()).add(f"{kind}:{key}")
+
+
+def encode(node_id: str, items: Any) -> str:
+    payload = f"{node_id}|{','.join(sorted(items))}"
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        return f"{node_id}|{FLUSH_ALL}"
+    return payload
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        # В той же транзакции: Postgres доставит уведомление только после COMMIT
+        session.execute(select(func.pg_notify(CHANNEL, encode(NODE_ID, pending))))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, _previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def apply(payload: str) -> None:
+    """
+    Применить сообщение другого воркера. Неизвестный вид ключа, FLUSH_ALL или ошибка
+    обработчика — полный сброс: лучше лишний промах кэша, чем устаревшие данные.
+    """
+    node_id, _, body = payload.partition("|")
+    if node_id == NODE_ID:
+        return
+    _messages.inc()
+    try:
+        for item in body.split(","):
+            kind, _, key = item.partition(":")
+            handler = _handlers.get(kind)
+            if item == FLUSH_ALL or handler is None:
+                flush_all()
+                return
+            handler(key)
+    except Exception:
+        logger.exception("cache invalidation message failed: %r", payload)
+        flush_all()
+
+
+Connect = Callable[[], Awaitable[Any]]
+
+
+class InvalidationListener:
+    """
+    Выделенное LISTEN-соединение воркера. При разрыве (termination listener или
+    неудачная проверка keepalive) переподключается с экспоненциальной задержкой;
+    после каждого подключения сбрасывает кэши целиком, т.к. часть сообщений могла
+    потеряться.
+    """
+
+    def __init__(
+        self,
+        connect: Connect,
+        *,
+        channel: str = CHANNEL,
+        reconnect_delay_seconds: float = 1.0,
+        max_reconnect_delay_seconds: float = 30.0,
+        keepalive_seconds: float = 30.0,
+    ):
+        self._connect = connect
+        self.channel = channel
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.max_reconnect_delay_seconds = max_reconnect_delay_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.connected = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cache-invalidation-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+        apply(payload)
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay_seconds
+        attempt = 0
+        while True:
+            if attempt:
+                _reconnects.inc()
+            attempt += 1
+            try:
+                await self._listen()
+                delay = self.reconnect_delay_seconds  # соединение было живо — сброс задержки
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError, asyncio.TimeoutError):
+                logger.warning("cache invalidation listener disconnected", exc_info=True)
+            self.connected.clear()
+            # Джиттер: воркеры не переподключаются к БД одновременно
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.max_reconnect_delay_seconds)
+
+    async def _listen(self) -> None:
+        """Одна сессия LISTEN; возвращается, когда соединение потеряно."""
+        connection = await self._connect()
+        lost = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _conn: lost.set())
+            await connection.add_listener(self.channel, self._on_notify)
+            flush_all()  # всё, что пришло до LISTEN, могло быть пропущено
+            self.connected.set()
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    # Тишина в канале не отличима от полуоткрытого TCP — проверяем запросом
+                    await asyncio.wait_for(
+                        connection.execute("SELECT 1"), timeout=self.keepalive_seconds
+                    )
+        finally:
+            if not connection.is_closed():
+                connection.terminate()
+
+
+listener: Optional[InvalidationListener] = None
+
+
+def start_listener(
+    database: DatabaseConfig = config.database, bus: CacheBus = config.cache.bus
+) -> InvalidationListener:
+    """Запускает слушатель воркера. Вызывается из lifespan приложения."""
+    global listener
+
+    async def connect() -> Any:
+        return await asyncpg.connect(
+            host=database.host,
+            port=database.port,
+            user=database.user,
+            password=database.password,
+            database=database.name,
+        )
+
+    listener = InvalidationListener(
+        connect,
+        reconnect_delay_seconds=bus.reconnect_delay_seconds,
+        max_reconnect_delay_seconds=bus.max_reconnect_delay_seconds,
+        keepalive_seconds=bus.keepalive_seconds,
+    )
+    listener.start()
+    return listener
+
+
+async def stop_listener() -> None:
+    global listener
+    if listener is not None:
+        await listener.stop()
+    listener = None
@@ -0,0 +1,40 @@
+"""rate limit counters
+
+Revision ID: 3f1c2a7d9b4e
+Revises: 99074f6867c8
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a7d9b4e"
+down_revision: Union[str, Sequence[str], None] = "99074f6867c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rate_limit_counters",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("window_start", sa.Float(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rate_limit_counters")
@@ -0,0 +1,62 @@
+"""task priority_rank
+
+Revision ID: 5e0d3b8a1c27
+Revises: c2b7e91f4a03
+Create Date: 2026-10-17 13:02:11.504218
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0d3b8a1c27"
+down_revision: Union[str, Sequence[str], None] = "c2b7e91f4a03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIORITY_RANK_SQL = "CASE priority WHEN 'low' THEN 1 WHEN 'medium' THEN 2 WHEN 'high' THEN 3 END"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED generated column: ADD COLUMN сам заполняет значения для существующих строк
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "priority_rank",
+            sa.SmallInteger(),
+            sa.Computed(PRIORITY_RANK_SQL, persisted=True),
+            nullable=False,
+        ),
+    )
+    op.drop_index("ix_tasks_owner_id_priority_id", table_name="tasks")
+    op.drop_index("ix_tasks_priority_id", table_name="tasks")
+    op.create_index(
+        "ix_tasks_owner_id_priority_rank_id",
+        "tasks",
+        ["owner_id", "priority_rank", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_tasks_priority_rank_id",
+        "tasks",
+        ["priority_rank", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_priority_rank_id", table_name="tasks")
+    op.drop_index("ix_tasks_owner_id_priority_rank_id", table_name="tasks")
+    op.create_index("ix_tasks_priority_id", "tasks", ["priority", "id"], unique=False)
+    op.create_index(
+        "ix_tasks_owner_id_priority_id",
+        "tasks",
+        ["owner_id", "priority", "id"],
+        unique=False,
+    )
+    op.drop_column("tasks", "priority_rank")
@@ -0,0 +1,104 @@
+"""task counters
+
+Revision ID: 8b41f6d2e7a9
+Revises: 5e0d3b8a1c27
+Create Date: 2026-10-17 13:40:27.771093
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b41f6d2e7a9"
+down_revision: Union[str, Sequence[str], None] = "5e0d3b8a1c27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level триггеры с transition tables: один upsert на оператор,
+# а не на строку, поэтому bulk-операции и COPY не превращаются в N апдейтов.
+# Для UPDATE строки, у которых не сменились owner_id/state, дают нулевую
+# дельту и счётчики не трогают.
+APPLY_DELTA = """
+    INSERT INTO task_counters (owner_id, state, count)
+    SELECT owner_id, state, sum(delta) FROM ({rows}) AS d
+    GROUP BY owner_id, state
+    HAVING sum(delta) <> 0
+    ON CONFLICT (owner_id, state)
+    DO UPDATE SET count = task_counters.count + EXCLUDED.count, updated = now();
+"""
+NEW_ROWS = "SELECT owner_id, state, 1 AS delta FROM new_rows"
+OLD_ROWS = "SELECT owner_id, state, -1 AS delta FROM old_rows"
+
+FUNCTION_SQL = f"""
+CREATE FUNCTION task_counters_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {APPLY_DELTA.format(rows=NEW_ROWS)}
+    ELSIF TG_OP = 'DELETE' THEN
+        {APPLY_DELTA.format(rows=OLD_ROWS)}
+    ELSE
+        {APPLY_DELTA.format(rows=f"{NEW_ROWS} UNION ALL {OLD_ROWS}")}
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+TRIGGERS = {
+    "tasks_counters_insert": "AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows",
+    "tasks_counters_update": (
+        "AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "tasks_counters_delete": "AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_counters",
+        sa.Column("owner_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "state",
+            sa.Enum(
+                "todo",
+                "in_progress",
+                "done",
+                name="task_counter_state",
+                native_enum=False,
+                create_constraint=True,
+            ),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("owner_id", "state"),
+    )
+    op.execute(FUNCTION_SQL)
+    for name, spec in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {spec} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()"
+        )
+    # Начальное заполнение: триггеры уже стоят, так что записи после этого шага не потеряются
+    op.execute(
+        "INSERT INTO task_counters (owner_id, state, count) "
+        "SELECT owner_id, state, count(*) FROM tasks GROUP BY owner_id, state "
+        "ON CONFLICT (owner_id, state) DO UPDATE SET count = EXCLUDED.count"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_counters_apply()")
+    op.drop_table("task_counters")
@@ -0,0 +1,35 @@
+"""task admin due order index
+
+Revision ID: a3f6b2d8c417
+Revises: c7d1e5a9f324
+Create Date: 2026-10-19 09:42:17.204815
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f6b2d8c417"
+down_revision: Union[str, Sequence[str], None] = "c7d1e5a9f324"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GET /admin/tasks без владельца в порядке списка: due_at ASC NULLS LAST,
+    # priority_rank DESC, id DESC. Индексы с owner_id впереди для него не годятся.
+    # Архив admin-список не читает, поэтому индекс только на tasks.
+    op.create_index(
+        "ix_tasks_due_at_priority_rank_id",
+        "tasks",
+        ["due_at", sa.text("priority_rank DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_due_at_priority_rank_id", table_name="tasks")
@@ -0,0 +1,31 @@
+"""task keyset indexes
+
+Revision ID: a84d0e6c51f2
+Revises: 3f1c2a7d9b4e
+Create Date: 2026-10-17 11:02:17.604811
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a84d0e6c51f2"
+down_revision: Union[str, Sequence[str], None] = "3f1c2a7d9b4e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_tasks_owner_id_priority_id", "tasks", ["owner_id", "priority", "id"], unique=False
+    )
+    op.create_index("ix_tasks_priority_id", "tasks", ["priority", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_priority_id", table_name="tasks")
+    op.drop_index("ix_tasks_owner_id_priority_id", table_name="tasks")
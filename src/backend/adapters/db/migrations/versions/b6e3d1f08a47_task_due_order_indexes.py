@@ -0,0 +1,42 @@
+"""task due order indexes
+
+Revision ID: b6e3d1f08a47
+Revises: f2c8a4e1b905
+Create Date: 2026-10-18 10:14:52.631904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e3d1f08a47"
+down_revision: Union[str, Sequence[str], None] = "f2c8a4e1b905"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Порядок списка: due_at ASC NULLS LAST, priority_rank DESC, id DESC
+ORDER = ["due_at", sa.text("priority_rank DESC"), sa.text("id DESC")]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("tasks", "tasks_archive"):
+        op.create_index(f"ix_{table}_owner_id_due_at_priority_rank_id", table, ["owner_id", *ORDER])
+        # Новый индекс начинается теми же столбцами и заменяет (owner_id, state, due_at)
+        op.create_index(
+            f"ix_{table}_owner_id_state_due_at_priority_rank_id",
+            table,
+            ["owner_id", "state", *ORDER],
+        )
+        op.drop_index(f"ix_{table}_owner_id_state_due_at", table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("tasks", "tasks_archive"):
+        op.create_index(f"ix_{table}_owner_id_state_due_at", table, ["owner_id", "state", "due_at"])
+        op.drop_index(f"ix_{table}_owner_id_state_due_at_priority_rank_id", table_name=table)
+        op.drop_index(f"ix_{table}_owner_id_due_at_priority_rank_id", table_name=table)
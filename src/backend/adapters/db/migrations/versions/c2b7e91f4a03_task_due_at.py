@@ -0,0 +1,35 @@
+"""task due_at
+
+Revision ID: c2b7e91f4a03
+Revises: a84d0e6c51f2
+Create Date: 2026-10-17 12:26:53.140377
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2b7e91f4a03"
+down_revision: Union[str, Sequence[str], None] = "a84d0e6c51f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("tasks", sa.Column("due_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_tasks_owner_id_state_due_at",
+        "tasks",
+        ["owner_id", "state", "due_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_owner_id_state_due_at", table_name="tasks")
+    op.drop_column("tasks", "due_at")
@@ -0,0 +1,87 @@
+"""task list versions
+
+Revision ID: c7d1e5a9f324
+Revises: b6e3d1f08a47
+Create Date: 2026-10-18 12:05:41.318270
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d1e5a9f324"
+down_revision: Union[str, Sequence[str], None] = "b6e3d1f08a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level триггеры, как у task_counters: один upsert на оператор. Строка
+# владельца блокируется до конца транзакции, так что конкурирующие записи получают
+# последовательные номера; ORDER BY — одинаковый порядок блокировок в bulk-операциях.
+BUMP = """
+    INSERT INTO task_list_versions (owner_id, version)
+    SELECT DISTINCT owner_id, 1 FROM ({rows}) AS w
+    ORDER BY owner_id
+    ON CONFLICT (owner_id)
+    DO UPDATE SET version = task_list_versions.version + 1, updated = now();
+"""
+NEW_OWNERS = "SELECT owner_id FROM new_rows"
+OLD_OWNERS = "SELECT owner_id FROM old_rows"
+
+FUNCTION_SQL = f"""
+CREATE FUNCTION task_list_versions_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {BUMP.format(rows=NEW_OWNERS)}
+    ELSIF TG_OP = 'DELETE' THEN
+        {BUMP.format(rows=OLD_OWNERS)}
+    ELSE
+        {BUMP.format(rows=f"{NEW_OWNERS} UNION {OLD_OWNERS}")}
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+TRIGGERS = {
+    "tasks_list_version_insert": "AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows",
+    "tasks_list_version_update": (
+        "AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "tasks_list_version_delete": "AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_list_versions",
+        sa.Column("owner_id", sa.UUID(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("owner_id"),
+    )
+    op.execute(FUNCTION_SQL)
+    for name, spec in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {spec} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION task_list_versions_bump()"
+        )
+    # Версией списка был max(updated); строки владельцев заводит первая запись
+    op.drop_index("ix_tasks_owner_id_updated", table_name="tasks")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_tasks_owner_id_updated", "tasks", ["owner_id", "updated"], unique=False)
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_list_versions_bump()")
+    op.drop_table("task_list_versions")
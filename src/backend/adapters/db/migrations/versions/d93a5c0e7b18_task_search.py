@@ -0,0 +1,55 @@
+"""task search
+
+Revision ID: d93a5c0e7b18
+Revises: 8b41f6d2e7a9
+Create Date: 2026-10-17 15:08:44.219530
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d93a5c0e7b18"
+down_revision: Union[str, Sequence[str], None] = "8b41f6d2e7a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gin — чтобы owner_id лёг в тот же GIN-индекс, что и tsvector/триграммы
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_tasks_owner_id_search_vector",
+        "tasks",
+        ["owner_id", "search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.execute(
+        "CREATE INDEX ix_tasks_owner_id_search_text_trgm ON tasks "
+        "USING gin (owner_id, (name || ' ' || description) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_owner_id_search_text_trgm", table_name="tasks")
+    op.drop_index("ix_tasks_owner_id_search_vector", table_name="tasks")
+    op.drop_column("tasks", "search_vector")
@@ -0,0 +1,104 @@
+"""tasks archive
+
+Revision ID: e4a7c9d2f160
+Revises: d93a5c0e7b18
+Create Date: 2026-10-17 15:41:12.508327
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a7c9d2f160"
+down_revision: Union[str, Sequence[str], None] = "d93a5c0e7b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "tasks_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.String(length=63), nullable=False),
+        sa.Column("description", sa.String(length=255), nullable=False),
+        sa.Column(
+            "state",
+            sa.Enum(
+                "todo",
+                "in_progress",
+                "done",
+                name="task_archive_state",
+                native_enum=False,
+                create_constraint=True,
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "priority",
+            sa.Enum(
+                "low",
+                "medium",
+                "high",
+                name="task_archive_priority",
+                native_enum=False,
+                create_constraint=True,
+            ),
+            nullable=False,
+        ),
+        sa.Column("priority_rank", sa.SmallInteger(), nullable=False),
+        sa.Column("owner_id", sa.UUID(), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tasks_archive_owner_id_priority_rank_id",
+        "tasks_archive",
+        ["owner_id", "priority_rank", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_tasks_archive_owner_id_state_due_at",
+        "tasks_archive",
+        ["owner_id", "state", "due_at"],
+        unique=False,
+    )
+    # Частичный индекс: задание архивации выбирает старые done-задачи, не читая всю таблицу
+    op.create_index(
+        "ix_tasks_done_updated",
+        "tasks",
+        ["updated"],
+        unique=False,
+        postgresql_where=sa.text("state = 'done'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Архивные задачи возвращаются в tasks, иначе откат миграции их потеряет
+    op.execute(
+        "INSERT INTO tasks (id, name, description, state, priority, owner_id, due_at, "
+        "created, updated) "
+        "SELECT id, name, description, state, priority, owner_id, due_at, created, updated "
+        "FROM tasks_archive"
+    )
+    op.drop_index("ix_tasks_done_updated", table_name="tasks")
+    op.drop_index("ix_tasks_archive_owner_id_state_due_at", table_name="tasks_archive")
+    op.drop_index("ix_tasks_archive_owner_id_priority_rank_id", table_name="tasks_archive")
+    op.drop_table("tasks_archive")
@@ -0,0 +1,28 @@
+"""task owner updated index
+
+Revision ID: f2c8a4e1b905
+Revises: e4a7c9d2f160
+Create Date: 2026-10-17 16:12:37.194206
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c8a4e1b905"
+down_revision: Union[str, Sequence[str], None] = "e4a7c9d2f160"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # max(updated) по владельцу для ETag списка — один шаг по индексу
+    op.create_index("ix_tasks_owner_id_updated", "tasks", ["owner_id", "updated"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_owner_id_updated", table_name="tasks")
@@ -1,5 +1,9 @@
 from .base import Base
+from .rate_limit import RateLimitCounter
 from .task import Task
+from .task_archive import TaskArchive
+from .task_counter import TaskCounter
+from .task_list_version import TaskListVersion
 from .user import User
 
-__all__ = (Base, Task, User)
+__all__ = (Base, RateLimitCounter, Task, TaskArchive, TaskCounter, TaskListVersion, User)
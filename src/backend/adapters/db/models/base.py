@@ -17,6 +17,9 @@ TgId = Annotated[int, mapped_column(BigInteger)]
 
 class Base(AsyncAttrs, DeclarativeBase):
     __abstract__ = True  # чтобы не создавать таблицу для Base
+    # Серверные значения (id, created/updated, generated columns) приходят
+    # в RETURNING того же INSERT/UPDATE, без отдельного SELECT/refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     created: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -0,0 +1,13 @@
+from adapters.db.models.base import Base
+from sqlalchemy import Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class RateLimitCounter(Base):
+    """Счётчик фиксированного окна для лимитера, общий для всех воркеров."""
+
+    __tablename__ = "rate_limit_counters"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 hex
+    window_start: Mapped[float] = mapped_column(Float, nullable=False)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False)
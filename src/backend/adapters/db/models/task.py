@@ -1,20 +1,77 @@
 import uuid
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
 from adapters.db.models.base import Base, MyLongSTR, MyShortSTR
 from domain.value_objects.task_priority import TaskPriority
 from domain.value_objects.task_state import TaskState
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import ForeignKey, Index, SmallInteger, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.schema import Computed
+from sqlalchemy.types import DateTime
 
 if TYPE_CHECKING:
     from adapters.db.models.user import User
 
+PRIORITY_RANK_SQL = (
+    "CASE priority " + " ".join(f"WHEN '{p.value}' THEN {p.rank}" for p in TaskPriority) + " END"
+)
+# Конфигурация 'simple': названия бывают и на русском, и на английском, без стемминга
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_SQL = (
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(name, '') || ' ' || coalesce(description, ''))"
+)
+# Текст для поиска подстроки (pg_trgm); выражение должно совпадать с индексом
+SEARCH_TEXT_SQL = "(name || ' ' || description)"
+
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # ?sort=priority (владелец и admin): ORDER BY priority_rank DESC, id DESC обратным
+        # проходом индекса; строки страницы читаются из heap, LIMIT ограничивает их число
+        Index("ix_tasks_owner_id_priority_rank_id", "owner_id", "priority_rank", "id"),
+        Index("ix_tasks_priority_rank_id", "priority_rank", "id"),
+        # порядок списка по умолчанию: due_at ASC NULLS LAST, priority_rank DESC, id DESC —
+        # страница читается из индекса в этом порядке, без сортировки всех задач владельца
+        Index(
+            "ix_tasks_owner_id_due_at_priority_rank_id",
+            "owner_id",
+            "due_at",
+            text("priority_rank DESC"),
+            text("id DESC"),
+        ),
+        # тот же порядок без владельца: GET /admin/tasks по умолчанию (sort=due)
+        Index(
+            "ix_tasks_due_at_priority_rank_id",
+            "due_at",
+            text("priority_rank DESC"),
+            text("id DESC"),
+        ),
+        # то же с фильтром по статусу; due< — диапазон по due_at
+        Index(
+            "ix_tasks_owner_id_state_due_at_priority_rank_id",
+            "owner_id",
+            "state",
+            "due_at",
+            text("priority_rank DESC"),
+            text("id DESC"),
+        ),
+        # кандидаты в архив: только выполненные задачи, по времени последнего изменения
+        Index("ix_tasks_done_updated", "updated", postgresql_where=text("state = 'done'")),
+        # полнотекстовый и подстрочный поиск в пределах владельца (btree_gin + pg_trgm)
+        Index(
+            "ix_tasks_owner_id_search_vector", "owner_id", "search_vector", postgresql_using="gin"
+        ),
+        Index(
+            "ix_tasks_owner_id_search_text_trgm",
+            "owner_id",
+            text(f"{SEARCH_TEXT_SQL} gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -48,6 +105,16 @@ class Task(Base):
         nullable=False,
         index=True,
     )
+    # Ранг из TaskPriority.rank; generated column — БД сама держит его в актуальном состоянии
+    priority_rank: Mapped[int] = mapped_column(
+        SmallInteger,
+        Computed(PRIORITY_RANK_SQL, persisted=True),
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_SQL, persisted=True),
+        deferred=True,  # нужен только в WHERE/ORDER BY поиска
+    )
     owner_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey(
@@ -57,5 +124,7 @@ class Task(Base):
         ),
         index=True,
     )
+    due_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    owner: Mapped["User"] = relationship(lazy="selectin")
+    # Грузится только по явному запросу (selectinload); случайный доступ — ошибка, а не запрос
+    owner: Mapped["User"] = relationship(lazy="raise_on_sql")
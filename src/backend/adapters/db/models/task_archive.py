@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from adapters.db.models.base import Base, MyLongSTR, MyShortSTR
+from domain.value_objects.task_priority import TaskPriority
+from domain.value_objects.task_state import TaskState
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import ForeignKey, Index, SmallInteger, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import DateTime
+
+
+class TaskArchive(Base):
+    """
+    Холодные задачи: выполненные задачи старше archive.done_after_days переносит
+    сюда jobs.archive_done_tasks. Основная таблица tasks (и её индексы) остаётся
+    небольшой; архив читается только по GET /tasks?include_archived=true.
+
+    created/updated копируются из tasks как есть; priority_rank — обычный столбец,
+    значение переносится готовым.
+    """
+
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        # тот же порядок keyset-пагинации, что и у tasks
+        Index("ix_tasks_archive_owner_id_priority_rank_id", "owner_id", "priority_rank", "id"),
+        Index(
+            "ix_tasks_archive_owner_id_due_at_priority_rank_id",
+            "owner_id",
+            "due_at",
+            text("priority_rank DESC"),
+            text("id DESC"),
+        ),
+        Index(
+            "ix_tasks_archive_owner_id_state_due_at_priority_rank_id",
+            "owner_id",
+            "state",
+            "due_at",
+            text("priority_rank DESC"),
+            text("id DESC"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    name: Mapped[MyShortSTR]
+    description: Mapped[MyLongSTR]
+    state: Mapped[TaskState] = mapped_column(
+        SQLEnum(
+            TaskState,
+            native_enum=False,
+            create_constraint=True,
+            validate_strings=True,
+            name="task_archive_state",
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        nullable=False,
+    )
+    priority: Mapped[TaskPriority] = mapped_column(
+        SQLEnum(
+            TaskPriority,
+            native_enum=False,
+            create_constraint=True,
+            validate_strings=True,
+            name="task_archive_priority",
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        nullable=False,
+    )
+    priority_rank: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    owner_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    due_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
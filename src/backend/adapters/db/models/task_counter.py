@@ -0,0 +1,35 @@
+import uuid
+
+from adapters.db.models.base import Base
+from domain.value_objects.task_state import TaskState
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class TaskCounter(Base):
+    """
+    Число задач владельца в каждом статусе. Ведётся триггерами на tasks
+    (см. миграцию task_counters), поэтому учитывает любые пути записи,
+    включая bulk-UPDATE и COPY. Расхождения чинит jobs.reconcile_task_counters.
+
+    FK на users нет намеренно: каскадное удаление задач пользователя
+    обновляет счётчики уже после удаления самого пользователя.
+    """
+
+    __tablename__ = "task_counters"
+
+    owner_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    state: Mapped[TaskState] = mapped_column(
+        SQLEnum(
+            TaskState,
+            native_enum=False,
+            create_constraint=True,
+            validate_strings=True,
+            name="task_counter_state",
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        primary_key=True,
+    )
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
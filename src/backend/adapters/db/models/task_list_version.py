@@ -0,0 +1,23 @@
+import uuid
+
+from adapters.db.models.base import Base
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class TaskListVersion(Base):
+    """
+    Версия задач владельца для ETag списка. Каждый оператор, изменивший его задачи,
+    увеличивает её триггером (см. миграцию task_list_versions). Строку владельца
+    блокирует upsert, поэтому параллельные транзакции получают разные номера и
+    любой commit меняет версию, в отличие от max(updated) — времени начала транзакции.
+
+    Строки не удаляются: версия владельца никогда не вернётся к прежнему номеру.
+    FK на users нет по той же причине, что у task_counters.
+    """
+
+    __tablename__ = "task_list_versions"
+
+    owner_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
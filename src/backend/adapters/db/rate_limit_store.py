@@ -0,0 +1,66 @@
+import math
+import time
+from typing import Callable
+
+from adapters.db import session_context
+from adapters.db.models.rate_limit import RateLimitCounter
+from app.core.rate_limit import RateLimitDecision
+from sqlalchemy import case, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+
+class PostgresRateLimitStore:
+    """
+    Общее для нескольких воркеров хранилище лимитера: счётчик фиксированного окна
+    в таблице rate_limit_counters, один upsert на проверку. Используется только для
+    правил с shared=True (логин), чтобы не добавлять транзакцию записи к каждому чтению.
+
+    Строки закончившихся окон удаляются в той же транзакции, что и проверка, не чаще
+    раза в purge_interval_seconds на процесс: иначе таблица растёт с каждым новым ключом.
+    retention_seconds — наибольшее окно общих правил.
+    """
+
+    def __init__(
+        self,
+        *,
+        retention_seconds: float,
+        purge_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.retention_seconds = retention_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._clock = clock
+        self._next_purge = 0.0
+
+    async def hit(self, key: str, *, limit: int, window_seconds: float) -> RateLimitDecision:
+        now = self._clock()
+        window_start = math.floor(now / window_seconds) * window_seconds
+
+        table = RateLimitCounter.__table__
+        stmt = pg_insert(RateLimitCounter).values(key=key, window_start=window_start, hits=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RateLimitCounter.key],
+            set_={
+                # Новое окно — сбрасываем счётчик, иначе инкрементируем
+                "hits": case(
+                    (table.c.window_start == stmt.excluded.window_start, table.c.hits + 1),
+                    else_=1,
+                ),
+                "window_start": stmt.excluded.window_start,
+            },
+        ).returning(RateLimitCounter.hits)
+
+        async with session_context.get_async_session_manager() as session:
+            hits = (await session.execute(stmt)).scalar_one()
+            if now >= self._next_purge:
+                self._next_purge = now + self.purge_interval_seconds
+                # Окно строки началось раньше now - retention — значит, оно уже закончилось
+                retention = max(self.retention_seconds, window_seconds)
+                await session.execute(
+                    delete(RateLimitCounter).where(RateLimitCounter.window_start < now - retention)
+                )
+            await session.commit()
+
+        if hits > limit:
+            return RateLimitDecision(False, window_start + window_seconds - now)
+        return RateLimitDecision(True)
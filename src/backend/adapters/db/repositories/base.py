@@ -1,7 +1,15 @@
-from contextlib import asynccontextmanager
-from typing import Any
+import uuid
+from typing import Any, Callable, Dict, Optional
 
+from adapters.db import invalidation, session_context
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+# Ошибки, после которых реплику считаем недоступной и читаем из primary
+REPLICA_UNAVAILABLE = (OperationalError, InterfaceError, PoolTimeoutError, OSError)
 
 
 class RepositoryError(RuntimeError):
@@ -16,21 +24,48 @@ class ForbiddenError(RepositoryError):
     pass
 
 
+class AlreadyExistsError(RepositoryError):
+    def __init__(self, field: str):
+        super().__init__(f"{field} already exists")
+        self.field = field
+
+
 class BaseRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def _flush_refresh(self, instance: Any) -> Any:
-        await self.session.flush()
-        await self.session.refresh(instance)
-        return instance
-
-    @asynccontextmanager
-    async def _transaction(self):
-        try:
-            yield
-        except Exception:
-            await self.session.rollback()
-            raise
-        else:
-            await self.session.commit()
+    async def _execute_read(
+        self,
+        stmt: Executable,
+        owner_id: Optional[uuid.UUID] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Result:
+        """
+        Чтение без побочных эффектов: в реплику, если она настроена, здорова и владелец
+        не писал только что. На реплике — отдельное соединение, а не транзакция сессии,
+        поэтому её сбой не ломает unit of work и чтение просто повторяется в primary.
+        """
+        replica = session_context.replica
+        target = replica.engine_for_read(owner_id) if replica is not None else None
+        if target is not None:
+            try:
+                async with target.connect() as conn:
+                    return await conn.execute(
+                        stmt, params
+                    )  # Result буферизован, соединение можно вернуть
+            except REPLICA_UNAVAILABLE:
+                replica.mark_unhealthy()
+        return await self.session.execute(stmt, params)
+
+    @staticmethod
+    def _pin_reads(owner_id: uuid.UUID) -> None:
+        """После записи чтения владельца какое-то время идут в primary (read-your-writes)."""
+        session_context.pin_reads(owner_id)
+
+    def _after_commit(self, callback: Callable[[], None]) -> None:
+        """Побочный эффект записи (инвалидация кэшей) — только после commit unit of work."""
+        session_context.after_commit(self.session, callback)
+
+    def _publish_invalidation(self, kind: str, key: Any) -> None:
+        """Кэши других воркеров сбросит NOTIFY этой транзакции (adapters.db.invalidation)."""
+        invalidation.publish(self.session, kind, key)
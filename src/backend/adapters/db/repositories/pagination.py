@@ -0,0 +1,105 @@
+import base64
+import binascii
+import datetime as dt
+import enum
+import json
+import uuid
+from typing import Any, List, Mapping, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+from .base import RepositoryError
+
+
+class InvalidCursorError(RepositoryError):
+    pass
+
+
+class SortKey(NamedTuple):
+    column: Any  # InstrumentedAttribute / Column
+    descending: bool = False
+    nullable: bool = False  # NULL-значения сортируются в конец (NULLS LAST)
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str] = None
+
+
+def order_by_clauses(keys: Sequence[SortKey]) -> List[ColumnElement]:
+    clauses = []
+    for key in keys:
+        clause = key.column.desc() if key.descending else key.column.asc()
+        if key.nullable:
+            clause = clause.nulls_last()
+        clauses.append(clause)
+    return clauses
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+    return value
+
+
+def _load(key: SortKey, raw: Any) -> Any:
+    if raw is None:
+        if not key.nullable:
+            raise InvalidCursorError("Unexpected null in cursor")
+        return None
+    python_type = key.column.type.python_type
+    if python_type is dt.datetime:
+        return dt.datetime.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(keys: Sequence[SortKey], row: Mapping[str, Any]) -> str:
+    values = [_dump(row[key.column.key]) for key in keys]
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(keys: Sequence[SortKey], cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError("cursor shape mismatch")
+        return [_load(key, value) for key, value in zip(keys, raw)]
+    except (ValueError, TypeError, KeyError, binascii.Error) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def keyset_after(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """
+    Условие «строго после позиции курсора» для сортировки keys.
+
+    Если все ключи NOT NULL и в одном направлении, строим row comparison
+    (a, b) > (:a, :b) — Postgres использует его как границу диапазона в индексе.
+    Иначе — эквивалентное раскрытие через OR/AND с учётом NULLS LAST.
+    """
+    directions = {key.descending for key in keys}
+    if len(directions) == 1 and not any(key.nullable for key in keys):
+        row = tuple_(*(key.column for key in keys))
+        bound = tuple_(*values)
+        return row < bound if keys[0].descending else row > bound
+
+    clauses = []
+    for i, key in enumerate(keys):
+        value = values[i]
+        if value is None:
+            continue  # после NULL при NULLS LAST по этому ключу ничего нет
+        beyond = key.column < value if key.descending else key.column > value
+        if key.nullable:
+            beyond = or_(beyond, key.column.is_(None))
+        prefix = [
+            prev.column.is_(None) if prev_value is None else prev.column == prev_value
+            for prev, prev_value in zip(keys[:i], values[:i])
+        ]
+        clauses.append(and_(*prefix, beyond))
+    return or_(*clauses) if clauses else false()
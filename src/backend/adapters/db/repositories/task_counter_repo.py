@@ -0,0 +1,91 @@
+import uuid
+from typing import Optional, Sequence
+
+from adapters.db import invalidation
+from adapters.db.models.task import Task
+from adapters.db.models.task_counter import TaskCounter
+from adapters.db.models.user import User
+from domain.value_objects.task_state import TaskState
+from sqlalchemy import and_, bindparam, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import BaseRepository
+
+_TOTAL_OWNER = TaskCounter.owner_id == bindparam("owner_id")
+# Собраны один раз: по форме «со статусом / без»
+_TOTAL = {
+    False: select(func.coalesce(func.sum(TaskCounter.count), 0)).where(_TOTAL_OWNER),
+    True: select(func.coalesce(func.sum(TaskCounter.count), 0)).where(
+        and_(_TOTAL_OWNER, TaskCounter.state == bindparam("state"))
+    ),
+}
+
+
+class TaskCounterRepository(BaseRepository):
+    """Чтение и сверка task_counters; сами счётчики ведут триггеры на tasks."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+
+    async def total(self, *, owner_id: uuid.UUID, state: Optional[TaskState] = None) -> int:
+        """Чтение по первичному ключу: не больше одной строки на статус."""
+        res = await self._execute_read(
+            _TOTAL[state is not None], owner_id, {"owner_id": owner_id, "state": state}
+        )
+        return int(res.scalar_one())
+
+    async def reconcile(self, owner_ids: Sequence[uuid.UUID]) -> int:
+        """
+        Пересчитывает счётчики группы владельцев по tasks и исправляет расхождения.
+        Возвращает число исправленных строк.
+
+        Строки счётчиков блокируются FOR UPDATE до пересчёта: триггеры параллельных
+        записей ждут коммита сверки и применяют свою дельту уже поверх точного значения.
+        Кэши списков исправленных владельцев (X-Total-Count) сбрасываются через шину
+        инвалидации.
+        """
+        locked = await self.session.execute(
+            select(TaskCounter.owner_id, TaskCounter.state, TaskCounter.count)
+            .where(TaskCounter.owner_id.in_(owner_ids))
+            .with_for_update()
+        )
+        stored = {(row.owner_id, row.state): row.count for row in locked}
+        counted = await self.session.execute(
+            select(Task.owner_id, Task.state, func.count())
+            .where(Task.owner_id.in_(owner_ids))
+            .group_by(Task.owner_id, Task.state)
+        )
+        actual = {(owner_id, state): count for owner_id, state, count in counted}
+
+        drifted = [
+            {"owner_id": owner_id, "state": state, "count": count}
+            for (owner_id, state), count in actual.items()
+            if stored.get((owner_id, state)) != count
+        ]
+        stale = [key for key in stored if key not in actual and stored[key] != 0]
+        if drifted:
+            stmt = pg_insert(TaskCounter).values(drifted)
+            await self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[TaskCounter.owner_id, TaskCounter.state],
+                    set_={"count": stmt.excluded.count, "updated": func.now()},
+                )
+            )
+        if stale:
+            await self.session.execute(
+                delete(TaskCounter).where(
+                    tuple_(TaskCounter.owner_id, TaskCounter.state).in_(stale)
+                )
+            )
+        for owner_id in {row["owner_id"] for row in drifted} | {owner for owner, _ in stale}:
+            self._publish_invalidation(invalidation.TASKS, owner_id)
+        return len(drifted) + len(stale)
+
+    async def delete_orphans(self) -> int:
+        """Удаляет счётчики удалённых пользователей: новых задач у них уже не появится."""
+        stmt = delete(TaskCounter).where(
+            ~select(User.id).where(User.id == TaskCounter.owner_id).exists()
+        )
+        res = await self.session.execute(stmt)
+        return int(res.rowcount or 0)
@@ -1,34 +1,81 @@
 import datetime as dt
 import uuid
-from typing import Optional, Sequence
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    NoReturn,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
 
+from adapters.db import invalidation
 from adapters.db.models.task import Task
+from adapters.db.models.task_archive import TaskArchive
+from domain.entities.task import Task as TaskEntity
 from domain.value_objects.task_priority import TaskPriority
 from domain.value_objects.task_state import TaskState
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, cast, column, delete, func, insert, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from .base import BaseRepository, ForbiddenError, NotFoundError
+from .base import BaseRepository, ForbiddenError, NotFoundError, RepositoryError
+from .pagination import InvalidCursorError, Page, SortKey, decode_cursor, encode_cursor
+from .task_statements import (
+    GET_TASK,
+    LIST_VERSION,
+    MIN_SUBSTRING_QUERY,
+    READ_COLUMNS,
+    STATS,
+    PageShape,
+    count_statement,
+    export_statement,
+    like_pattern,
+    page_params,
+    page_statement,
+    search_statement,
+    sort_keys,
+)
+
+# Поля, которые PATCH /tasks/batch может менять
+BATCH_UPDATE_FIELDS = ("name", "description", "state", "priority", "due_at")
+
+
+class TaskStatsBucket(NamedTuple):
+    state: TaskState
+    priority: TaskPriority
+    count: int
+    overdue: int  # due_at в прошлом, задача не выполнена
+
+
+# Столбцы COPY в порядке полей записи в copy_many
+COPY_COLUMNS = ("name", "description", "state", "priority", "owner_id", "due_at")
+
+
+def _to_entity(row: Mapping[str, Any]) -> TaskEntity:
+    # Значения пришли из БД с уже типизированными колонками — повторная валидация не нужна
+    return TaskEntity.model_construct(**row)
 
 
 class TaskRepository(BaseRepository):
     def __init__(self, session: AsyncSession):
         super().__init__(session)
 
-    async def _require_owned(self, task_id: uuid.UUID, owner_id: uuid.UUID) -> Task:
-        res = await self.session.execute(
-            select(Task)
-            .options(selectinload(Task.owner))
-            .where(and_(Task.id == task_id, Task.owner_id == owner_id))
-        )
-        task = res.scalars().first()
-        if not task:
-            res2 = await self.session.execute(select(Task.id).where(Task.id == task_id))
-            if res2.scalars().first():
-                raise ForbiddenError("Task belongs to another user")
-            raise NotFoundError("Task not found")
-        return task
+    def _written(self, owner_id: uuid.UUID) -> None:
+        """Задачи владельца изменены в этой транзакции."""
+        self._pin_reads(owner_id)
+        self._publish_invalidation(invalidation.TASKS, owner_id)
+
+    async def _raise_missing(self, task_id: uuid.UUID) -> NoReturn:
+        """Вызывается только когда owner-scoped запрос ничего не нашёл: 403 или 404."""
+        res = await self.session.execute(select(Task.id).where(Task.id == task_id))
+        if res.scalars().first():
+            raise ForbiddenError("Task belongs to another user")
+        raise NotFoundError("Task not found")
 
     async def create(
         self,
@@ -40,24 +87,71 @@ class TaskRepository(BaseRepository):
         priority: TaskPriority,
         due_at: Optional[dt.datetime] = None,
     ) -> Task:
-        task_kwargs = dict(
+        task = Task(
             owner_id=owner_id,
             name=name,
             description=description,
             state=state,
             priority=priority,
+            due_at=due_at,
         )
-        if hasattr(Task, "due_at") and due_at is not None:
-            task_kwargs["due_at"] = due_at
-
-        task = Task(**task_kwargs)
-        async with self._transaction():
-            self.session.add(task)
-            await self._flush_refresh(task)
+        self.session.add(task)
+        await self.session.flush()  # INSERT ... RETURNING (eager_defaults) вместо refresh
+        self._written(owner_id)
         return task
 
-    async def get(self, task_id: uuid.UUID, *, owner_id: uuid.UUID) -> Task:
-        return await self._require_owned(task_id, owner_id)
+    async def get(self, task_id: uuid.UUID, *, owner_id: uuid.UUID) -> TaskEntity:
+        res = await self._execute_read(
+            GET_TASK, owner_id, {"task_id": task_id, "owner_id": owner_id}
+        )
+        row = res.mappings().first()
+        if row is None:
+            await self._raise_missing(task_id)
+        return _to_entity(row)
+
+    @staticmethod
+    def _sort_keys(order_by_due_first: bool = True) -> List[SortKey]:
+        return sort_keys(order_by_due_first)
+
+    async def _fetch_page(
+        self,
+        *,
+        owner_id: Optional[uuid.UUID],
+        state: Optional[TaskState],
+        due_before: Optional[dt.datetime],
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+        order_by_due_first: bool = True,
+        include_archived: bool = False,
+    ) -> Page:
+        keys = sort_keys(order_by_due_first, include_archived)
+        cursor_values = decode_cursor(keys, cursor) if cursor is not None else []
+        shape = PageShape(
+            owned=owner_id is not None,
+            has_state=state is not None,
+            has_due_before=due_before is not None,
+            order_by_due_first=order_by_due_first,
+            cursor_nulls=tuple(v is None for v in cursor_values) if cursor is not None else None,
+            has_offset=bool(offset) and cursor is None,  # курсор заменяет offset
+            include_archived=include_archived,
+        )
+        params = page_params(
+            shape,
+            owner_id=owner_id,
+            state=state,
+            due_before=due_before,
+            cursor_values=cursor_values,
+            limit=limit + 1,  # лишняя строка = признак следующей страницы
+            offset=offset,
+        )
+        res = await self._execute_read(page_statement(shape), owner_id, params)
+        rows = res.mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(keys, rows[-1])
+        return Page([_to_entity(row) for row in rows], next_cursor)
 
     async def list(
         self,
@@ -67,33 +161,51 @@ class TaskRepository(BaseRepository):
         due_before: Optional[dt.datetime] = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: Optional[str] = None,
         order_by_due_first: bool = True,
-    ) -> Sequence[Task]:
-        filters = [Task.owner_id == owner_id]
-        if state is not None:
-            filters.append(Task.state == state)
-        if due_before is not None and hasattr(Task, "due_at"):
-            filters.append(getattr(Task, "due_at") < due_before)  # type: ignore[misc]
-
-        stmt = (
-            select(Task)
-            .options(selectinload(Task.owner))
-            .where(and_(*filters))
-            .limit(limit)
-            .offset(offset)
+        include_archived: bool = False,
+    ) -> Page:
+        return await self._fetch_page(
+            owner_id=owner_id,
+            state=state,
+            due_before=due_before,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            order_by_due_first=order_by_due_first,
+            include_archived=include_archived,
         )
 
-        if hasattr(Task, "due_at") and order_by_due_first:
-            due_col = getattr(Task, "due_at")
-            stmt = stmt.order_by(due_col.asc().nulls_last(), Task.priority.desc())
-        else:
-            stmt = stmt.order_by(
-                Task.priority.desc(),
-                Task.created_at.asc() if hasattr(Task, "created_at") else Task.id.asc(),
-            )
-
-        res = await self.session.execute(stmt)
-        return list(res.scalars().all())
+    async def search(
+        self,
+        *,
+        owner_id: uuid.UUID,
+        q: str,
+        state: Optional[TaskState] = None,
+        due_before: Optional[dt.datetime] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        """Результаты по релевантности; курсора нет — порядок задаёт ранг, а не ключи."""
+        if cursor is not None:
+            raise InvalidCursorError("Cursor pagination is not supported for search")
+        substring = len(q) >= MIN_SUBSTRING_QUERY
+        params: Dict[str, Any] = {
+            "owner_id": owner_id,
+            "q": q,
+            "limit": limit,
+            "offset": offset,
+        }
+        if substring:
+            params["pattern"] = like_pattern(q)
+        if state is not None:
+            params["state"] = state
+        if due_before is not None:
+            params["due_before"] = due_before
+        stmt = search_statement(state is not None, due_before is not None, substring)
+        res = await self._execute_read(stmt, owner_id, params)
+        return Page([_to_entity(row) for row in res.mappings().all()])
 
     async def update(
         self,
@@ -105,28 +217,161 @@ class TaskRepository(BaseRepository):
         state: Optional[TaskState] = None,
         priority: Optional[TaskPriority] = None,
         due_at: Optional[dt.datetime] = None,
-    ) -> Task:
-        task = await self._require_owned(task_id, owner_id)
-
+    ) -> TaskEntity:
+        values: dict[str, Any] = {}
         if name is not None:
-            task.name = name
+            values["name"] = name
         if description is not None:
-            task.description = description
+            values["description"] = description
         if state is not None:
-            task.state = state
+            values["state"] = state
         if priority is not None:
-            task.priority = priority
-        if due_at is not None and hasattr(Task, "due_at"):
-            setattr(task, "due_at", due_at)
+            values["priority"] = priority
+        if due_at is not None:
+            values["due_at"] = due_at
 
-        async with self._transaction():
-            await self._flush_refresh(task)
-        return task
+        if not values:
+            return await self.get(task_id, owner_id=owner_id)
+
+        # Проверка владельца — часть WHERE, новое состояние строки — из RETURNING
+        stmt = (
+            update(Task)
+            .where(and_(Task.id == task_id, Task.owner_id == owner_id))
+            .values(**values)
+            .returning(*READ_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await self.session.execute(stmt)).mappings().first()
+        if row is None:
+            await self._raise_missing(task_id)
+        self._written(owner_id)
+        return _to_entity(row)
 
     async def delete(self, task_id: uuid.UUID, *, owner_id: uuid.UUID) -> None:
-        task = await self._require_owned(task_id, owner_id)
-        async with self._transaction():
-            await self.session.delete(task)
+        stmt = (
+            delete(Task)
+            .where(and_(Task.id == task_id, Task.owner_id == owner_id))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = (await self.session.execute(stmt)).scalars().first()
+        if deleted is None:
+            await self._raise_missing(task_id)
+        self._written(owner_id)
+
+    async def _foreign_ids(self, task_ids: Sequence[uuid.UUID]) -> Set[uuid.UUID]:
+        """Пакетный аналог _raise_missing: из ненайденных id — те, что существуют (403)."""
+        if not task_ids:
+            return set()
+        res = await self.session.execute(select(Task.id).where(Task.id.in_(task_ids)))
+        return set(res.scalars().all())
+
+    async def _missing_errors(
+        self, task_ids: Sequence[uuid.UUID]
+    ) -> Dict[uuid.UUID, RepositoryError]:
+        foreign = await self._foreign_ids(task_ids)
+        return {
+            task_id: (
+                ForbiddenError("Task belongs to another user")
+                if task_id in foreign
+                else NotFoundError("Task not found")
+            )
+            for task_id in task_ids
+        }
+
+    async def create_many(
+        self, *, owner_id: uuid.UUID, items: Sequence[Mapping[str, Any]]
+    ) -> List[TaskEntity]:
+        """
+        Один многострочный INSERT ... RETURNING. id генерируем заранее: порядок строк
+        в RETURNING не гарантирован, а результат нужно сопоставить с входными элементами.
+        """
+        rows = [{**item, "id": uuid.uuid4(), "owner_id": owner_id} for item in items]
+        stmt = insert(Task).values(rows).returning(*READ_COLUMNS)
+        returned = (await self.session.execute(stmt)).mappings().all()
+        self._written(owner_id)
+        by_id = {row["id"]: _to_entity(row) for row in returned}
+        return [by_id[row["id"]] for row in rows]
+
+    async def copy_many(self, *, owner_id: uuid.UUID, items: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Загрузка через COPY (asyncpg copy_records_to_table) на соединении текущей
+        транзакции: без построения INSERT и без RETURNING. id, created/updated и
+        generated columns заполняет БД; task_counters обновляют те же триггеры на INSERT.
+        """
+        if not items:
+            return 0
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        records = [
+            (
+                item["name"],
+                item["description"],
+                TaskState(item["state"]).value,
+                TaskPriority(item["priority"]).value,
+                owner_id,
+                item.get("due_at"),
+            )
+            for item in items
+        ]
+        await raw.driver_connection.copy_records_to_table(
+            Task.__tablename__, records=records, columns=COPY_COLUMNS
+        )
+        self._written(owner_id)
+        return len(records)
+
+    async def update_many(
+        self, *, owner_id: uuid.UUID, items: Sequence[Mapping[str, Any]]
+    ) -> Dict[uuid.UUID, Union[TaskEntity, RepositoryError]]:
+        """
+        UPDATE tasks ... FROM (VALUES ...) одним выражением. Отсутствующее в элементе
+        поле приходит как NULL и через COALESCE оставляет текущее значение.
+        id в items должны быть уникальны.
+        """
+        table = Task.__table__
+        patch = values(
+            *(column(name, table.c[name].type) for name in ("id", *BATCH_UPDATE_FIELDS)),
+            name="patch",
+        ).data([tuple(item.get(name) for name in ("id", *BATCH_UPDATE_FIELDS)) for item in items])
+        stmt = (
+            update(Task)
+            .where(and_(Task.id == patch.c.id, Task.owner_id == owner_id))
+            .values(
+                {
+                    # CAST: столбец VALUES из одних NULL Postgres типизирует как text
+                    name: func.coalesce(cast(patch.c[name], table.c[name].type), table.c[name])
+                    for name in BATCH_UPDATE_FIELDS
+                }
+            )
+            .returning(*READ_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        returned = (await self.session.execute(stmt)).mappings().all()
+        if returned:
+            self._written(owner_id)
+        results: Dict[uuid.UUID, Union[TaskEntity, RepositoryError]] = {
+            row["id"]: _to_entity(row) for row in returned
+        }
+        missing = [item["id"] for item in items if item["id"] not in results]
+        results.update(await self._missing_errors(missing))
+        return results
+
+    async def delete_many(
+        self, *, owner_id: uuid.UUID, task_ids: Sequence[uuid.UUID]
+    ) -> Dict[uuid.UUID, Optional[RepositoryError]]:
+        """DELETE ... WHERE id IN (...) RETURNING id; None в результате — удалено."""
+        stmt = (
+            delete(Task)
+            .where(and_(Task.id.in_(task_ids), Task.owner_id == owner_id))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = set((await self.session.execute(stmt)).scalars().all())
+        if deleted:
+            self._written(owner_id)
+        results: Dict[uuid.UUID, Optional[RepositoryError]] = dict.fromkeys(deleted)
+        results.update(await self._missing_errors([i for i in task_ids if i not in deleted]))
+        return results
 
     async def count(
         self,
@@ -134,18 +379,63 @@ class TaskRepository(BaseRepository):
         owner_id: uuid.UUID,
         state: Optional[TaskState] = None,
         due_before: Optional[dt.datetime] = None,
+        archived: bool = False,
     ) -> int:
-        filters = [Task.owner_id == owner_id]
-        if state is not None:
-            filters.append(Task.state == state)
-        if due_before is not None and hasattr(Task, "due_at"):
-            filters.append(getattr(Task, "due_at") < due_before)  # type: ignore[misc]
+        res = await self._execute_read(
+            count_statement(state is not None, due_before is not None, archived),
+            owner_id,
+            {"owner_id": owner_id, "state": state, "due_before": due_before},
+        )
+        return int(res.scalar_one())
 
-        res = await self.session.execute(
-            select(func.count()).select_from(select(Task.id).where(and_(*filters)).subquery())
+    async def stream(
+        self,
+        *,
+        owner_id: Optional[uuid.UUID],
+        state: Optional[TaskState] = None,
+        due_before: Optional[dt.datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+        """
+        Все подходящие задачи пачками по batch_size через серверный курсор (yield_per):
+        в памяти одновременно не больше одной пачки. owner_id=None — по всем владельцам.
+        """
+        params: Dict[str, Any] = {}
+        if owner_id is not None:
+            params["owner_id"] = owner_id
+        if state is not None:
+            params["state"] = state
+        if due_before is not None:
+            params["due_before"] = due_before
+        stmt = export_statement(owner_id is not None, state is not None, due_before is not None)
+        result = await self.session.stream(
+            stmt, params, execution_options={"yield_per": batch_size}
         )
+        async for rows in result.mappings().partitions():
+            yield rows
+
+    async def version(self, *, owner_id: uuid.UUID) -> int:
+        """Версия задач владельца (task_list_versions) — для ETag списка."""
+        res = await self._execute_read(LIST_VERSION, owner_id, {"owner_id": owner_id})
         return int(res.scalar_one())
 
+    async def stats(self, *, owner_id: uuid.UUID, now: dt.datetime) -> List[TaskStatsBucket]:
+        """Все пары статус×приоритет, включая пустые, — из одного GROUP BY."""
+        res = await self._execute_read(STATS, owner_id, {"owner_id": owner_id, "now": now})
+        # mappings(): у Row атрибут count — метод кортежа, а не столбец
+        found = {(row["state"], row["priority"]): row for row in res.mappings()}
+        empty = {"count": 0, "overdue": 0}
+        return [
+            TaskStatsBucket(
+                state,
+                priority,
+                found.get((state, priority), empty)["count"],
+                found.get((state, priority), empty)["overdue"],
+            )
+            for state in TaskState
+            for priority in TaskPriority
+        ]
+
     async def admin_list_all(
         self,
         *,
@@ -153,24 +443,47 @@ class TaskRepository(BaseRepository):
         due_before: Optional[dt.datetime] = None,
         limit: int = 100,
         offset: int = 0,
-    ) -> Sequence[Task]:
-        filters = []
-        if state is not None:
-            filters.append(Task.state == state)
-        if due_before is not None and hasattr(Task, "due_at"):
-            filters.append(getattr(Task, "due_at") < due_before)
+        cursor: Optional[str] = None,
+        order_by_due_first: bool = True,
+    ) -> Page:
+        return await self._fetch_page(
+            owner_id=None,
+            state=state,
+            due_before=due_before,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            order_by_due_first=order_by_due_first,
+        )
 
-        stmt = (
-            select(Task)
-            .options(selectinload(Task.owner))
-            .where(and_(*filters) if filters else True)
+    async def archive_done(self, *, updated_before: dt.datetime, limit: int) -> int:
+        """
+        Переносит до limit выполненных задач, не менявшихся с updated_before, в
+        tasks_archive одним выражением: DELETE ... RETURNING внутри CTE и INSERT из него.
+        SKIP LOCKED пропускает строки, которые сейчас правит API. task_counters
+        уменьшает триггер на DELETE. Возвращает число перенесённых задач; кэши
+        затронутых владельцев сбрасываются во всех воркерах через шину инвалидации.
+        """
+        candidates = (
+            select(Task.id)
+            .where(and_(Task.state == TaskState.DONE, Task.updated < updated_before))
+            .order_by(Task.updated)
             .limit(limit)
-            .offset(offset)
+            .with_for_update(skip_locked=True)
         )
-        if hasattr(Task, "due_at"):
-            stmt = stmt.order_by(getattr(Task, "due_at").asc().nulls_last(), Task.priority.desc())
-        else:
-            stmt = stmt.order_by(Task.priority.desc(), Task.id.asc())
-
-        res = await self.session.execute(stmt)
-        return list(res.scalars().all())
+        names = [c.key for c in READ_COLUMNS] + ["priority_rank", "created"]
+        moved = (
+            delete(Task)
+            .where(Task.id.in_(candidates.scalar_subquery()))
+            .returning(*(getattr(Task, name) for name in names))
+            .cte("moved")
+        )
+        stmt = (
+            insert(TaskArchive)
+            .from_select(names, select(*(moved.c[name] for name in names)))
+            .returning(TaskArchive.owner_id)
+        )
+        owners = (await self.session.execute(stmt)).scalars().all()
+        for owner_id in set(owners):
+            self._publish_invalidation(invalidation.TASKS, owner_id)
+        return len(owners)
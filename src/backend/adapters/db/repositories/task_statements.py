@@ -0,0 +1,249 @@
+"""
+Заранее собранные выражения для горячих чтений задач.
+
+Каждая «форма» запроса (какие фильтры заданы, есть ли курсор и какие его значения NULL)
+собирается один раз, а значения передаются через bindparam при выполнении. Один и тот же
+объект выражения даёт стабильный ключ кэша компиляции SQLAlchemy и один и тот же текст
+SQL — значит, и переиспользование prepared statements asyncpg на соединении.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from adapters.db.models.task import SEARCH_CONFIG, Task
+from adapters.db.models.task_archive import TaskArchive
+from adapters.db.models.task_list_version import TaskListVersion
+from domain.value_objects.task_state import TaskState
+from sqlalchemy import Select, and_, bindparam, func, literal_column, or_, select, true, union_all
+
+from .pagination import SortKey, keyset_after, order_by_clauses
+
+# Ровно то, что отдаёт API (TaskRead), и updated для ETag: чтение идёт без ORM-сущностей
+READ_COLUMNS = (
+    Task.id,
+    Task.name,
+    Task.description,
+    Task.state,
+    Task.priority,
+    Task.owner_id,
+    Task.due_at,
+    Task.updated,
+)
+
+# Горячие и архивные задачи одним источником: UNION ALL с теми же столбцами.
+# Фильтры и границу курсора внешнего SELECT Postgres проталкивает в обе ветки,
+# а ORDER BY ... LIMIT собирает через Merge Append по индексам обеих таблиц.
+ALL_TASKS = union_all(
+    select(*READ_COLUMNS, Task.priority_rank),
+    select(*(getattr(TaskArchive, c.key) for c in READ_COLUMNS), TaskArchive.priority_rank),
+).subquery("all_tasks")
+
+
+def _source(include_archived: bool) -> Any:
+    """Task или столбцы ALL_TASKS: оба дают доступ к столбцам как к атрибутам."""
+    return ALL_TASKS.c if include_archived else Task
+
+
+def sort_keys(order_by_due_first: bool = True, include_archived: bool = False) -> List[SortKey]:
+    source = _source(include_archived)
+    keys = []
+    if order_by_due_first:
+        keys.append(SortKey(source.due_at, nullable=True))
+    # id — уникальный tie-breaker, без него курсор неоднозначен
+    keys += [SortKey(source.priority_rank, descending=True), SortKey(source.id, descending=True)]
+    return keys
+
+
+class PageShape(NamedTuple):
+    owned: bool  # фильтр по владельцу (GET /tasks) или без него (admin)
+    has_state: bool
+    has_due_before: bool
+    order_by_due_first: bool = True
+    # None — без курсора; иначе для каждого ключа: равно ли его значение в курсоре NULL
+    cursor_nulls: Optional[Tuple[bool, ...]] = None
+    has_offset: bool = False
+    include_archived: bool = False  # читать и tasks, и tasks_archive
+
+
+def _cursor_param(index: int) -> str:
+    return f"cursor_{index}"
+
+
+def _page_select(source: Any, keys: List[SortKey], filters: List[Any]) -> Select:
+    # Ключи сортировки, которых нет в TaskRead (priority_rank), нужны только для курсора
+    read_columns = [getattr(source, column.key) for column in READ_COLUMNS]
+    read_names = {column.key for column in READ_COLUMNS}
+    extra = [key.column for key in keys if key.column.key not in read_names]
+    return (
+        select(*read_columns, *extra)
+        .where(and_(*filters) if filters else true())
+        .order_by(*order_by_clauses(keys))
+        .limit(bindparam("limit"))
+    )
+
+
+@lru_cache(maxsize=256)
+def page_statement(shape: PageShape) -> Select:
+    source = _source(shape.include_archived)
+    keys = sort_keys(shape.order_by_due_first, shape.include_archived)
+    filters: List[Any] = []
+    if shape.owned:
+        filters.append(source.owner_id == bindparam("owner_id"))
+    if shape.has_state:
+        filters.append(source.state == bindparam("state"))
+    if shape.has_due_before:
+        filters.append(source.due_at < bindparam("due_before"))
+    if shape.cursor_nulls is not None:
+        bounds = [
+            None if is_null else bindparam(_cursor_param(i), type_=key.column.type)
+            for i, (key, is_null) in enumerate(zip(keys, shape.cursor_nulls))
+        ]
+        after = keyset_after(keys, bounds)
+        lead = keys[0]
+        if lead.nullable and bounds[0] is not None:
+            # При NULLS LAST после непустого значения идут большие значения, а затем все
+            # NULL. OR этих частей не задаёт диапазон индекса, поэтому две ветки: каждая
+            # начинается с границы в индексе порядка и читает не больше limit строк.
+            start = lead.column <= bounds[0] if lead.descending else lead.column >= bounds[0]
+            parts = union_all(
+                _page_select(source, keys, [*filters, start, after]),
+                _page_select(source, keys, [*filters, lead.column.is_(None)]),
+            ).subquery("page")
+            outer = [SortKey(parts.c[key.column.key], key.descending, key.nullable) for key in keys]
+            return select(*parts.c).order_by(*order_by_clauses(outer)).limit(bindparam("limit"))
+        if lead.nullable:
+            # Курсор на NULL: дальше только NULL — равенство по столбцу индекса
+            filters.append(lead.column.is_(None))
+        filters.append(after)
+
+    stmt = _page_select(source, keys, filters)
+    if shape.has_offset:
+        stmt = stmt.offset(bindparam("offset"))
+    return stmt
+
+
+def page_params(
+    shape: PageShape,
+    *,
+    owner_id: Any = None,
+    state: Any = None,
+    due_before: Any = None,
+    cursor_values: Sequence[Any] = (),
+    limit: int,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"limit": limit}
+    if shape.owned:
+        params["owner_id"] = owner_id
+    if shape.has_state:
+        params["state"] = state
+    if shape.has_due_before:
+        params["due_before"] = due_before
+    for i, value in enumerate(cursor_values):
+        if value is not None:
+            params[_cursor_param(i)] = value
+    if shape.has_offset:
+        params["offset"] = offset
+    return params
+
+
+@lru_cache(maxsize=8)
+def count_statement(has_state: bool, has_due_before: bool, archived: bool = False) -> Select:
+    """COUNT по tasks либо, при archived=True, только по tasks_archive."""
+    model: Any = TaskArchive if archived else Task
+    filters = [model.owner_id == bindparam("owner_id")]
+    if has_state:
+        filters.append(model.state == bindparam("state"))
+    if has_due_before:
+        filters.append(model.due_at < bindparam("due_before"))
+    return select(func.count()).select_from(model).where(and_(*filters))
+
+
+@lru_cache(maxsize=8)
+def export_statement(owned: bool, has_state: bool, has_due_before: bool) -> Select:
+    """Выгрузка без LIMIT/OFFSET в порядке первичного ключа; читается потоково."""
+    filters: List[Any] = []
+    if owned:
+        filters.append(Task.owner_id == bindparam("owner_id"))
+    if has_state:
+        filters.append(Task.state == bindparam("state"))
+    if has_due_before:
+        filters.append(Task.due_at < bindparam("due_before"))
+    return select(*READ_COLUMNS).where(and_(*filters) if filters else true()).order_by(Task.id)
+
+
+# Статистика владельца одним GROUP BY: число задач и просроченных в каждой паре статус×приоритет
+STATS = (
+    select(
+        Task.state,
+        Task.priority,
+        func.count().label("count"),
+        func.count()
+        .filter(and_(Task.due_at < bindparam("now"), Task.state != TaskState.DONE))
+        .label("overdue"),
+    )
+    .where(Task.owner_id == bindparam("owner_id"))
+    .group_by(Task.state, Task.priority)
+)
+
+# Версия задач владельца для ETag списка: одна строка по первичному ключу; владелец
+# без записей после миграции — версия 0
+LIST_VERSION = select(
+    func.coalesce(
+        select(TaskListVersion.version)
+        .where(TaskListVersion.owner_id == bindparam("owner_id"))
+        .scalar_subquery(),
+        0,
+    ).label("version")
+)
+
+GET_TASK = select(*READ_COLUMNS).where(
+    and_(Task.id == bindparam("task_id"), Task.owner_id == bindparam("owner_id"))
+)
+
+
+# Подстрочный поиск включается с 3 символов: короче pg_trgm индекс не использует
+MIN_SUBSTRING_QUERY = 3
+
+# Совпадает с выражением индекса ix_tasks_owner_id_search_text_trgm
+LIKE_ESCAPE = "!"
+
+_SEARCH_TEXT = Task.name.concat(literal_column("' '")).concat(Task.description)
+
+
+def like_pattern(q: str) -> str:
+    """Подстрока для ILIKE: служебные символы экранируются через LIKE_ESCAPE."""
+    for char in (LIKE_ESCAPE, "%", "_"):
+        q = q.replace(char, LIKE_ESCAPE + char)
+    return f"%{q}%"
+
+
+@lru_cache(maxsize=16)
+def search_statement(has_state: bool, has_due_before: bool, substring: bool) -> Select:
+    """
+    Поиск по задачам владельца: полнотекстовый (tsvector) и, для q от 3 символов,
+    по подстроке (pg_trgm). Оба условия покрыты GIN-индексами с owner_id первым
+    столбцом, так что Postgres объединяет два bitmap-скана, а не читает все задачи.
+    """
+    query = func.websearch_to_tsquery(
+        literal_column(f"'{SEARCH_CONFIG}'::regconfig"), bindparam("q")
+    )
+    matches = Task.search_vector.bool_op("@@")(query)
+    order_by = [func.ts_rank(Task.search_vector, query).desc()]
+    if substring:
+        matches = or_(matches, _SEARCH_TEXT.ilike(bindparam("pattern"), escape=LIKE_ESCAPE))
+        order_by.append(func.similarity(_SEARCH_TEXT, bindparam("q")).desc())
+    order_by.append(Task.id.desc())
+
+    filters = [Task.owner_id == bindparam("owner_id"), matches]
+    if has_state:
+        filters.append(Task.state == bindparam("state"))
+    if has_due_before:
+        filters.append(Task.due_at < bindparam("due_before"))
+    return (
+        select(*READ_COLUMNS)
+        .where(and_(*filters))
+        .order_by(*order_by)
+        .limit(bindparam("limit"))
+        .offset(bindparam("offset"))
+    )
@@ -1,17 +1,29 @@
 import uuid
 from typing import Optional
 
+from adapters.db import invalidation
 from adapters.db.models.user import User
-from sqlalchemy import select
+from app.core.principals import invalidate_principal
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .base import BaseRepository, NotFoundError
+from .base import AlreadyExistsError, BaseRepository, NotFoundError
 
 
 class UserRepository(BaseRepository):
     def __init__(self, session: AsyncSession):
         super().__init__(session)
 
+    def _changed(self, user_id: uuid.UUID) -> None:
+        """
+        Principal пользователя в кэше этого процесса сбрасывается после commit,
+        остальные воркеры узнают об изменении через шину инвалидации.
+        """
+        self._pin_reads(user_id)  # удаление пользователя каскадом удаляет и его задачи
+        self._after_commit(lambda: invalidate_principal(user_id))
+        self._publish_invalidation(invalidation.USERS, user_id)
+
     async def create(
         self,
         *,
@@ -20,12 +32,29 @@ class UserRepository(BaseRepository):
         pass_hash: str,
         is_admin: bool = False,
     ) -> User:
-        user = User(login=login, email=email, pass_hash=pass_hash, is_admin=is_admin)
-        async with self._transaction():
-            self.session.add(user)
-            await self._flush_refresh(user)
+        """
+        Один INSERT ... ON CONFLICT DO NOTHING RETURNING: уникальность проверяет сама БД,
+        поэтому нет гонки между проверкой и вставкой. Лишний SELECT — только при конфликте,
+        чтобы сообщить, какое поле занято.
+        """
+        stmt = (
+            pg_insert(User)
+            .values(login=login, email=email, pass_hash=pass_hash, is_admin=is_admin)
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        user = (await self.session.scalars(stmt)).first()
+        if user is None:
+            raise AlreadyExistsError(await self._conflicting_field(login=login, email=email))
         return user
 
+    async def _conflicting_field(self, *, login: str, email: str) -> str:
+        res = await self.session.execute(
+            select(User.login).where(or_(User.login == login, User.email == email)).limit(1)
+        )
+        existing_login = res.scalars().first()
+        return "email" if existing_login is not None and existing_login != login else "login"
+
     async def get_by_id(self, user_id: uuid.UUID) -> Optional[User]:
         res = await self.session.execute(select(User).where(User.id == user_id))
         return res.scalars().first()
@@ -47,18 +76,19 @@ class UserRepository(BaseRepository):
     async def set_password(self, user_id: uuid.UUID, new_pass_hash: str) -> User:
         user = await self.require_by_id(user_id)
         user.pass_hash = new_pass_hash
-        async with self._transaction():
-            await self._flush_refresh(user)
+        await self.session.flush()
+        self._changed(user_id)
         return user
 
     async def set_admin(self, user_id: uuid.UUID, is_admin: bool) -> User:
         user = await self.require_by_id(user_id)
         user.is_admin = is_admin
-        async with self._transaction():
-            await self._flush_refresh(user)
+        await self.session.flush()
+        self._changed(user_id)
         return user
 
     async def delete(self, user_id: uuid.UUID) -> None:
         user = await self.require_by_id(user_id)
-        async with self._transaction():
-            await self.session.delete(user)
+        await self.session.delete(user)
+        await self.session.flush()
+        self._changed(user_id)
@@ -0,0 +1,66 @@
+import time
+import uuid
+from typing import Callable, Optional
+
+from app.core.cache import TTLCache
+from app.core.metrics import registry
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_replica_reads = registry.counter("db_replica_reads_total", "Чтения, выполненные на реплике")
+_replica_failures = registry.counter(
+    "db_replica_failures_total", "Ошибки реплики, после которых чтение ушло в primary"
+)
+
+
+class ReplicaRouter:
+    """
+    Решает, можно ли отправить чтение в реплику.
+
+    Нельзя, если владелец недавно писал (read-your-writes: его запись могла ещё
+    не доехать до реплики) или если реплика недавно падала (cooldown).
+
+    Закрепления хранятся в памяти процесса. Между воркерами их передаёт шина
+    инвалидации (cache.bus): получив сообщение о записи владельца, воркер закрепляет
+    его у себя. Без шины read-your-writes гарантирован только в пределах воркера.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        read_your_writes_seconds: float,
+        unhealthy_cooldown_seconds: float,
+        max_pinned_owners: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.engine = engine
+        self.unhealthy_cooldown_seconds = unhealthy_cooldown_seconds
+        self._clock = clock
+        self._unhealthy_until = 0.0
+        self._pins: TTLCache[uuid.UUID, bool] = TTLCache(
+            "replica_pins",
+            max_size=max_pinned_owners,
+            ttl_seconds=read_your_writes_seconds,
+            enabled=read_your_writes_seconds > 0,
+            clock=clock,
+            flushable=False,  # сброс кэшей данных не должен открывать реплику писавшим
+        )
+
+    @property
+    def healthy(self) -> bool:
+        return self._clock() >= self._unhealthy_until
+
+    def pin(self, owner_id: uuid.UUID) -> None:
+        self._pins.set(owner_id, True)
+
+    def engine_for_read(self, owner_id: Optional[uuid.UUID] = None) -> Optional[AsyncEngine]:
+        if not self.healthy:
+            return None
+        if owner_id is not None and self._pins.get(owner_id):
+            return None
+        _replica_reads.inc()
+        return self.engine
+
+    def mark_unhealthy(self) -> None:
+        _replica_failures.inc()
+        self._unhealthy_until = self._clock() + self.unhealthy_cooldown_seconds
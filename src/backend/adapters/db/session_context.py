@@ -1,15 +1,109 @@
+import time
+import uuid
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable, Optional
 
-from app.core.settings import config
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from adapters.db.routing import ReplicaRouter
+from app.core.metrics import registry
+from app.core.settings import DatabaseConfig, config
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-engine = create_async_engine(url=config.database.url, echo=False)
-sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+_checkout_wait = registry.summary(
+    "db_pool_checkout_wait_seconds", "Ожидание соединения из пула (включая подключение)"
+)
+_in_use = registry.gauge("db_pool_in_use", "Соединения, выданные из пула")
+_timeouts = registry.counter("db_pool_timeouts_total", "Отказы по pool timeout")
+
+engine: Optional[AsyncEngine] = None
+sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+# Маршрутизатор чтений в реплику; None — реплика не настроена
+replica: Optional[ReplicaRouter] = None
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """QueuePool, замеряющий, сколько запрос ждёт соединение."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _timeouts.inc()
+            raise
+        finally:
+            _checkout_wait.observe(time.perf_counter() - started)
+
+
+def _on_checkout(*_) -> None:
+    _in_use.inc()
+
+
+def _on_checkin(*_) -> None:
+    _in_use.dec()
+
+
+def _create_engine(url: str, database: DatabaseConfig) -> AsyncEngine:
+    pool = database.pool
+    created = create_async_engine(
+        url=url,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_size=pool.size,
+        max_overflow=pool.max_overflow,
+        pool_timeout=pool.timeout_seconds,
+        pool_recycle=pool.recycle_seconds,
+        pool_pre_ping=pool.pre_ping,
+    )
+    event.listen(created.sync_engine.pool, "checkout", _on_checkout)
+    event.listen(created.sync_engine.pool, "checkin", _on_checkin)
+    return created
+
+
+def init_engine(database: DatabaseConfig = config.database) -> AsyncEngine:
+    """Создаёт engine и sessionmaker. Вызывается из lifespan приложения или из job'ов."""
+    global engine, sessionmaker, replica
+    engine = _create_engine(database.url, database)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    if database.replica is not None and database.replica_url is not None:
+        replica = ReplicaRouter(
+            _create_engine(database.replica_url, database),
+            read_your_writes_seconds=database.replica.read_your_writes_seconds,
+            unhealthy_cooldown_seconds=database.replica.unhealthy_cooldown_seconds,
+            max_pinned_owners=database.replica.max_pinned_owners,
+        )
+    return engine
+
+
+def pin_reads(owner_id: uuid.UUID) -> None:
+    """После записи чтения владельца какое-то время идут в primary (read-your-writes)."""
+    if replica is not None:
+        replica.pin(owner_id)
+
+
+async def dispose_engine() -> None:
+    global engine, sessionmaker, replica
+    if replica is not None:
+        await replica.engine.dispose()
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    sessionmaker = None
+    replica = None
 
 
 @asynccontextmanager
 async def get_async_session_manager() -> AsyncGenerator[AsyncSession, None]:
+    if sessionmaker is None:
+        raise RuntimeError("Database engine is not initialized; call init_engine() first")
     session = sessionmaker()
     try:
         yield session
@@ -20,6 +114,37 @@ async def get_async_session_manager() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
-async def get_async_session():
+@asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Одна транзакция на единицу работы: репозитории только выполняют выражения и flush,
+    commit — один раз при успешном выходе, rollback — при исключении.
+    """
     async with get_async_session_manager() as session:
         yield session
+        await session.commit()
+
+
+async def get_async_session():
+    """Сессия запроса = unit of work: общий для всех зависимостей и один commit в конце."""
+    async with unit_of_work() as session:
+        yield session
+
+
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Отложить callback до успешного commit сессии; при rollback он отбрасывается."""
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_commit(session: Session, _previous_transaction) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
@@ -2,7 +2,9 @@ from typing import Annotated
 
 from adapters.db.repositories.user_repo import UserRepository
 from adapters.db.session_context import get_async_session
+from app.core.principals import principal_cache, principal_generations
 from app.core.security import decode_token
+from domain.entities.principal import Principal
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,19 +15,29 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     session: AsyncSession = Depends(get_async_session),
-):
+) -> Principal:
     try:
         user_id = decode_token(token)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    # Смена прав или удаление, закоммиченные во время чтения, сдвинут поколение:
+    # тогда прочитанное может быть устаревшим, и в кэш оно не попадает
+    generation = principal_generations.get(user_id)
     user = await UserRepository(session).get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    principal = Principal.model_validate(user)
+    if principal_generations.get(user_id) == generation:
+        principal_cache.set(user_id, principal)
+    return principal
 
 
-async def admin_required(current_user=Depends(get_current_user)):
+async def admin_required(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required"
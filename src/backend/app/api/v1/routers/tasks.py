@@ -1,13 +1,38 @@
+import csv
 import datetime as dt
+import io
+import json
 import uuid
-from typing import Any, Optional, cast
+from typing import Any, AsyncIterator, Literal, Mapping, NamedTuple, Optional, Sequence, Union, cast
 
 from app.api.v1.deps.auth import admin_required, get_current_user
-from app.api.v1.schemas import TaskCreate, TaskRead, TaskUpdate
+from app.api.v1.schemas import (
+    MAX_IMPORT_ERRORS,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchItemResult,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskBatchUpdateItem,
+    TaskCreate,
+    TaskImportLineError,
+    TaskImportResult,
+    TaskRead,
+    TaskStats,
+    TaskStatsItem,
+    TaskUpdate,
+)
+from app.core.cache import TTLCache
+from app.core.conditional import is_not_modified, strong_etag, validator_headers
+from app.core.errors import ProblemException
+from app.core.settings import config
 from domain.value_objects.task_state import TaskState
-from fastapi import APIRouter, Depends, Query, Response
-from services.fastapi_adapters import map_service_errors
-from services.task_service import TaskService, get_task_service
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from services.errors import ConflictError
+from services.fastapi_adapters import map_service_errors, service_error_problem
+from services.task_service import TaskService, get_task_service, stream_tasks, task_list_generations
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -20,6 +45,23 @@ def _normalize_dt(value: Optional[dt.datetime]) -> Optional[dt.datetime]:
     return value.astimezone(dt.timezone.utc)
 
 
+MAX_CURSOR_LENGTH = 512
+MAX_SEARCH_LENGTH = 200
+# due — по дедлайну, затем по приоритету; priority — только по приоритету (индекс по priority_rank)
+TaskSort = Literal["due", "priority"]
+
+
+def _set_next_page_headers(
+    request: Request, response: Response, next_cursor: Optional[str]
+) -> None:
+    """Ссылка на следующую страницу: Link rel="next" (RFC 8288) и X-Next-Cursor."""
+    if next_cursor is None:
+        return
+    next_url = request.url.remove_query_params("offset").include_query_params(cursor=next_cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+    response.headers["X-Next-Cursor"] = next_cursor
+
+
 @router.post("/", response_model=TaskRead, status_code=201)
 async def create_task(
     payload: TaskCreate,
@@ -41,43 +83,502 @@ async def create_task(
         raise
 
 
+class CachedTaskList(NamedTuple):
+    body: bytes  # JSON списка TaskRead
+    etag: str
+    total: Optional[int]  # X-Total-Count; None для поиска
+    next_cursor: Optional[str]
+
+
+_TASK_LIST = TypeAdapter(list[TaskRead])
+
+# (owner_id, поколение задач владельца, нормализованные параметры) -> готовый ответ.
+# Запись владельца поднимает поколение (TaskService), старые страницы больше не читаются.
+task_list_cache: TTLCache[tuple, CachedTaskList] = TTLCache(
+    "task_lists",
+    max_size=config.cache.task_lists.max_size,
+    ttl_seconds=config.cache.task_lists.ttl_seconds,
+    enabled=config.cache.task_lists.enabled,
+    weigh=lambda entry: len(entry.body),
+    max_bytes=config.cache.task_lists.max_bytes,
+)
+
+
+async def _load_task_list(
+    request: Request,
+    svc: TaskService,
+    owner_id: uuid.UUID,
+    *,
+    status: Optional[TaskState],
+    due_before: Optional[dt.datetime],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    q: Optional[str],
+    include_archived: bool,
+    sort: TaskSort,
+) -> Union[CachedTaskList, str]:
+    """Страница из БД; ETag (str), если клиентская копия актуальна и читать список не нужно."""
+    # Версия считается до чтения страницы: запись между ними даст лишний 200, но не 304
+    # с устаревшим телом. Опрос без изменений — один запрос по индексам вместо списка.
+    version = await svc.list_version(owner_id=owner_id)
+    etag: str = strong_etag(owner_id, version)
+    if is_not_modified(request, etag):
+        return etag
+    page = await svc.list_tasks(
+        owner_id=owner_id,
+        status=status,
+        due_before=due_before,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        q=q,
+        include_archived=include_archived,
+        order_by_due_first=sort == "due",
+    )
+    total = None
+    if q is None:
+        # Для поиска итог не считаем: это был бы второй полный поиск
+        total = await svc.count(
+            owner_id=owner_id,
+            status=status,
+            due_before=due_before,
+            include_archived=include_archived,
+        )
+    body = _TASK_LIST.dump_json(_TASK_LIST.validate_python(page.items, from_attributes=True))
+    return CachedTaskList(body, etag, total, page.next_cursor)
+
+
 @router.get("/", response_model=list[TaskRead])
 async def list_tasks(
+    request: Request,
     status: Optional[TaskState] = Query(default=None, alias="status"),
     due_before: Optional[dt.datetime] = Query(default=None, alias="due<"),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0, le=1000),
+    cursor: Optional[str] = Query(default=None, max_length=MAX_CURSOR_LENGTH),
+    q: Optional[str] = Query(default=None, min_length=1, max_length=MAX_SEARCH_LENGTH),
+    include_archived: bool = Query(default=False),
+    sort: TaskSort = Query(default="due"),
     svc: TaskService = Depends(get_task_service),
     current_user: Any = Depends(get_current_user),
-) -> list[TaskRead]:
+) -> Response:
+    owner_id = current_user.id
+    params: dict[str, Any] = dict(
+        status=status,
+        due_before=_normalize_dt(due_before),
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        q=q,
+        include_archived=include_archived,
+        sort=sort,
+    )
+    # Поколение читается до запросов в БД: запись, завершившаяся во время чтения,
+    # уже поднимет его, и сохранённая ниже страница не будет отдана
+    key = (owner_id, task_list_generations.get(owner_id), *params.values())
+    cached = task_list_cache.get(key)
+    if cached is None:
+        try:
+            loaded = await _load_task_list(request, svc, owner_id, **params)
+        except Exception as e:
+            map_service_errors(e)
+            raise
+        if isinstance(loaded, str):
+            return Response(status_code=304, headers=validator_headers(loaded))
+        cached = loaded
+        task_list_cache.set(key, cached)
+    elif is_not_modified(request, cached.etag):
+        return Response(status_code=304, headers=validator_headers(cached.etag))
+
+    response = Response(content=cached.body, media_type="application/json")
+    response.headers.update(validator_headers(cached.etag))
+    if cached.total is not None:
+        response.headers["X-Total-Count"] = str(cached.total)
+    _set_next_page_headers(request, response, cached.next_cursor)
+    return response
+
+
+# Объявлен до /{task_id}, иначе "stats" попадёт в параметр пути
+@router.get("/stats", response_model=TaskStats)
+async def task_stats(
+    svc: TaskService = Depends(get_task_service),
+    current_user: Any = Depends(get_current_user),
+) -> TaskStats:
+    """Число задач по статусу и приоритету и просроченные — одним GROUP BY, с кэшем."""
     try:
-        tasks = cast(
-            list[TaskRead],
-            await svc.list_tasks(
-                owner_id=current_user.id,
-                status=status,
-                due_before=_normalize_dt(due_before),
-                limit=limit,
-                offset=offset,
-            ),
+        buckets = await svc.stats(owner_id=current_user.id)
+    except Exception as e:
+        map_service_errors(e)
+        raise
+    items = [TaskStatsItem(**bucket._asdict()) for bucket in buckets]
+    return TaskStats(
+        total=sum(item.count for item in items),
+        overdue=sum(item.overdue for item in items),
+        items=items,
+    )
+
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# С этих символов табличный редактор начинает формулу (CSV injection); апостроф
+# экранируется тоже, чтобы снятие экранирования при импорте было однозначным
+CSV_ESCAPED_PREFIXES = ("=", "+", "-", "@", "\t", "\r", "'")
+
+
+def _csv_cell(value: Any) -> Any:
+    """Ячейка, которую редактор покажет текстом: опасный префикс гасится апострофом."""
+    if isinstance(value, str) and value.startswith(CSV_ESCAPED_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def _export_body(
+    fmt: ExportFormat, batches: AsyncIterator[Sequence[Mapping[str, Any]]]
+) -> AsyncIterator[str]:
+    """Одна пачка строк БД — один кусок тела ответа; ничего не накапливается."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(TaskRead.model_fields)
+    async for rows in batches:
+        # model_construct: строки уже типизированы БД, нужна только сериализация
+        tasks = [TaskRead.model_construct(**row) for row in rows]
+        if fmt == "ndjson":
+            yield "".join(task.model_dump_json() + "\n" for task in tasks)
+            continue
+        writer.writerows(
+            [_csv_cell(value) for value in task.model_dump(mode="json").values()] for task in tasks
         )
-        return tasks
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _export_response(
+    fmt: ExportFormat, batches: AsyncIterator[Sequence[Mapping[str, Any]]]
+) -> StreamingResponse:
+    return StreamingResponse(
+        _export_body(fmt, batches),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{fmt}"'},
+    )
+
+
+# Объявлен до /{task_id}, иначе "export" попадёт в параметр пути
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    status: Optional[TaskState] = Query(default=None, alias="status"),
+    due_before: Optional[dt.datetime] = Query(default=None, alias="due<"),
+    fmt: ExportFormat = Query(default="ndjson", alias="format"),
+    current_user: Any = Depends(get_current_user),
+) -> StreamingResponse:
+    """Все задачи пользователя потоком NDJSON/CSV, без лимита и offset."""
+    return _export_response(
+        fmt,
+        stream_tasks(owner_id=current_user.id, status=status, due_before=_normalize_dt(due_before)),
+    )
+
+
+IMPORT_CHUNK_SIZE = 1000  # строк на один COPY
+MAX_IMPORT_LINE_BYTES = 16 * 1024  # на запись; у CSV — вместе с переносами внутри кавычек
+MAX_IMPORT_BYTES = 32 * 1024 * 1024
+MAX_IMPORT_ROWS = 100_000  # импорт — одна транзакция, её размер ограничен
+
+
+def _import_too_large(detail: str) -> ProblemException:
+    return ProblemException(
+        status_code=413,
+        title="Payload Too Large",
+        detail=detail,
+        type_="https://example.com/problems/import-too-large",
+        errors={
+            "code": "tasks.import_too_large",
+            "max_bytes": MAX_IMPORT_BYTES,
+            "max_rows": MAX_IMPORT_ROWS,
+        },
+    )
+
+
+def _import_line_too_long(line_no: int) -> ProblemException:
+    return ProblemException(
+        status_code=413,
+        title="Payload Too Large",
+        detail=f"Import line {line_no} exceeds {MAX_IMPORT_LINE_BYTES} bytes.",
+        type_="https://example.com/problems/import-line-too-long",
+        errors={"code": "tasks.import_line_too_long", "line": line_no},
+    )
+
+
+async def _import_lines(request: Request) -> AsyncIterator[tuple[int, bytes]]:
+    """Строки тела по мере поступления, с номерами от 1; тело целиком не читается."""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > MAX_IMPORT_BYTES:
+        raise _import_too_large(f"Import body exceeds {MAX_IMPORT_BYTES} bytes.")
+    received = 0
+    buffer = b""
+    line_no = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_IMPORT_BYTES:  # без Content-Length (chunked) — по факту
+            raise _import_too_large(f"Import body exceeds {MAX_IMPORT_BYTES} bytes.")
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for raw in lines:
+            line_no += 1
+            yield line_no, raw
+        if len(buffer) > MAX_IMPORT_LINE_BYTES:
+            raise _import_line_too_long(line_no + 1)
+    if buffer:
+        yield line_no + 1, buffer
+
+
+async def _import_records(
+    fmt: ExportFormat, lines: AsyncIterator[tuple[int, bytes]]
+) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Записи с номером первой строки. У CSV поле в кавычках может содержать переносы
+    (так их пишет экспорт): строки склеиваются, пока число кавычек нечётное — удвоенная
+    кавычка внутри поля чётность не меняет.
+    """
+    first = 0
+    parts: list[bytes] = []
+    quotes = size = 0
+    async for line_no, raw in lines:
+        if not parts:
+            first = line_no
+        parts.append(raw)
+        size += len(raw) + 1
+        if fmt == "csv":
+            quotes += raw.count(b'"')
+            if quotes % 2:
+                if size > MAX_IMPORT_LINE_BYTES:
+                    raise _import_line_too_long(first)
+                continue
+        yield first, b"\n".join(parts)
+        parts = []
+        quotes = size = 0
+    if parts:  # незакрытая кавычка в конце тела — ошибка разбора этой записи
+        yield first, b"\n".join(parts)
+
+
+def _csv_row(text: str) -> list[str]:
+    rows = list(csv.reader(io.StringIO(text, newline=""), strict=True))
+    if len(rows) != 1:
+        raise ValueError("Unbalanced quotes in CSV record")
+    return rows[0]
+
+
+def _csv_value(value: str) -> str:
+    """Снимает экранирование экспорта (_csv_cell): «'=1» снова «=1», «''x» — «'x»."""
+    if value[:1] == "'" and value[1:].startswith(CSV_ESCAPED_PREFIXES):
+        return value[1:]
+    return value
+
+
+class _ImportReport:
+    def __init__(self) -> None:
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[TaskImportLineError] = []
+
+    def fail(self, line: int, errors: list[Any]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append(TaskImportLineError(line=line, errors=errors))
+
+
+def _parse_import_line(fmt: ExportFormat, text: str, header: Sequence[str]) -> Any:
+    if fmt == "ndjson":
+        return json.loads(text)
+    values = _csv_row(text)
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    # пустое поле CSV = значение не задано (например, due_at)
+    return {name: _csv_value(value) for name, value in zip(header, values) if value != ""}
+
+
+# Объявлен до /{task_id}, иначе "import" попадёт в параметр пути
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    fmt: ExportFormat = Query(default="ndjson", alias="format"),
+    svc: TaskService = Depends(get_task_service),
+    current_user: Any = Depends(get_current_user),
+) -> TaskImportResult:
+    """
+    Импорт NDJSON/CSV (по записи на строку; у CSV первая строка — заголовок, поля в
+    кавычках могут занимать несколько строк). Записи валидируются TaskCreate (лимиты
+    совпадают со столбцами) по мере чтения тела, валидные уходят в БД через COPY
+    пачками по IMPORT_CHUNK_SIZE. Всё в одной транзакции запроса, поэтому тело и
+    число записей ограничены; невалидные записи попадают в отчёт и пропускаются.
+    """
+    report = _ImportReport()
+    header: Optional[list[str]] = None
+    chunk: list[dict[str, Any]] = []
+    rows = 0
+    try:
+        async for line_no, raw in _import_records(fmt, _import_lines(request)):
+            if not raw.strip():
+                continue
+            rows += 1
+            if rows > MAX_IMPORT_ROWS + (fmt == "csv"):  # заголовок CSV не считается
+                raise _import_too_large(f"Import exceeds {MAX_IMPORT_ROWS} records.")
+            try:
+                text = raw.decode()
+                if fmt == "csv" and header is None:
+                    header = [name.strip() for name in _csv_row(text)]
+                    continue
+                item = _parse_import_line(fmt, text, header or [])
+                chunk.append(TaskCreate.model_validate(item).model_dump())
+            except ValidationError as e:
+                report.fail(line_no, e.errors(include_url=False, include_context=False))
+            except (ValueError, csv.Error) as e:  # JSON/CSV/UTF-8
+                report.fail(line_no, [{"type": "value_error", "msg": str(e)}])
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                report.imported += await svc.import_tasks(owner_id=current_user.id, items=chunk)
+                chunk = []
+        report.imported += await svc.import_tasks(owner_id=current_user.id, items=chunk)
+    except ProblemException:
+        raise
+    except Exception as e:
+        map_service_errors(e)
+        raise
+    return TaskImportResult(imported=report.imported, failed=report.failed, errors=report.errors)
+
+
+def _failed_item(
+    index: int, exc: Exception, task_id: Optional[uuid.UUID] = None
+) -> TaskBatchItemResult:
+    if isinstance(exc, ValidationError):
+        problem = ProblemException(
+            status_code=400,
+            title="Validation error",
+            detail="Batch item validation failed.",
+            type_="https://example.com/problems/validation-error",
+            errors={"fields": exc.errors(include_url=False, include_context=False)},
+        )
+    else:
+        problem = service_error_problem(exc)
+    return TaskBatchItemResult(
+        index=index, status=problem.status_code, id=task_id, problem=problem.as_problem()
+    )
+
+
+# Пакетные маршруты объявлены до /{task_id}, иначе "batch" попадёт в параметр пути
+@router.post("/batch", response_model=TaskBatchResult, status_code=207)
+async def create_tasks_batch(
+    payload: TaskBatchCreate,
+    svc: TaskService = Depends(get_task_service),
+    current_user: Any = Depends(get_current_user),
+) -> TaskBatchResult:
+    """Один INSERT на весь пакет; невалидные элементы получают 400 и не мешают остальным."""
+    results: dict[int, TaskBatchItemResult] = {}
+    valid: list[tuple[int, TaskCreate]] = []
+    for index, raw in enumerate(payload.items):
+        try:
+            valid.append((index, TaskCreate.model_validate(raw)))
+        except ValidationError as e:
+            results[index] = _failed_item(index, e)
+    try:
+        if valid:
+            created = await svc.create_tasks(
+                owner_id=current_user.id, items=[item.model_dump() for _, item in valid]
+            )
+            for (index, _), task in zip(valid, created):
+                results[index] = TaskBatchItemResult(
+                    index=index, status=201, id=task.id, task=TaskRead.model_validate(task)
+                )
+    except Exception as e:
+        map_service_errors(e)
+        raise
+    return TaskBatchResult(items=[results[i] for i in range(len(payload.items))])
+
+
+@router.patch("/batch", response_model=TaskBatchResult, status_code=207)
+async def update_tasks_batch(
+    payload: TaskBatchUpdate,
+    svc: TaskService = Depends(get_task_service),
+    current_user: Any = Depends(get_current_user),
+) -> TaskBatchResult:
+    """Один UPDATE ... FROM (VALUES ...); чужие/несуществующие задачи — 403/404 по элементу."""
+    results: dict[int, TaskBatchItemResult] = {}
+    valid: list[tuple[int, TaskBatchUpdateItem]] = []
+    seen: set[uuid.UUID] = set()
+    for index, raw in enumerate(payload.items):
+        try:
+            item = TaskBatchUpdateItem.model_validate(raw)
+        except ValidationError as e:
+            results[index] = _failed_item(index, e)
+            continue
+        if item.id in seen:
+            results[index] = _failed_item(
+                index, ConflictError("Duplicate id in batch", field="id"), item.id
+            )
+            continue
+        seen.add(item.id)
+        valid.append((index, item))
+    try:
+        if valid:
+            outcome = await svc.update_tasks(
+                owner_id=current_user.id, items=[item.model_dump() for _, item in valid]
+            )
+            for index, item in valid:
+                result = outcome[item.id]
+                if isinstance(result, Exception):
+                    results[index] = _failed_item(index, result, item.id)
+                else:
+                    results[index] = TaskBatchItemResult(
+                        index=index, status=200, id=item.id, task=TaskRead.model_validate(result)
+                    )
     except Exception as e:
         map_service_errors(e)
         raise
+    return TaskBatchResult(items=[results[i] for i in range(len(payload.items))])
+
+
+@router.delete("/batch", response_model=TaskBatchResult, status_code=207)
+async def delete_tasks_batch(
+    payload: TaskBatchDelete,
+    svc: TaskService = Depends(get_task_service),
+    current_user: Any = Depends(get_current_user),
+) -> TaskBatchResult:
+    """Один DELETE ... WHERE id IN (...) RETURNING id и одна проверка ненайденных."""
+    try:
+        outcome = await svc.delete_tasks(owner_id=current_user.id, task_ids=payload.ids)
+    except Exception as e:
+        map_service_errors(e)
+        raise
+    return TaskBatchResult(
+        items=[
+            (
+                _failed_item(index, error, task_id)
+                if (error := outcome[task_id]) is not None
+                else TaskBatchItemResult(index=index, status=204, id=task_id)
+            )
+            for index, task_id in enumerate(payload.ids)
+        ]
+    )
 
 
 @router.get("/{task_id}", response_model=TaskRead)
 async def get_task(
     task_id: uuid.UUID,
+    request: Request,
+    response: Response,
     svc: TaskService = Depends(get_task_service),
     current_user: Any = Depends(get_current_user),
-) -> TaskRead:
+) -> Union[TaskRead, Response]:
     try:
-        return await svc.get_task(task_id, owner_id=current_user.id)
+        task = await svc.get_task(task_id, owner_id=current_user.id)
     except Exception as e:
         map_service_errors(e)
         raise
+    etag = strong_etag(task.id, task.updated)
+    # 304 возвращается до сериализации TaskRead
+    if is_not_modified(request, etag, task.updated):
+        return Response(status_code=304, headers=validator_headers(etag, task.updated))
+    response.headers.update(validator_headers(etag, task.updated))
+    return cast(TaskRead, task)
 
 
 @router.patch("/{task_id}", response_model=TaskRead)
@@ -122,23 +623,41 @@ admin_router = APIRouter(prefix="/admin/tasks", tags=["admin:tasks"])
 
 @admin_router.get("/", response_model=list[TaskRead])
 async def admin_list_all_tasks(
+    request: Request,
+    response: Response,
     status: Optional[TaskState] = Query(default=None, alias="status"),
     due_before: Optional[dt.datetime] = Query(default=None, alias="due<"),
     limit: int = Query(default=100, ge=1, le=200),
     offset: int = Query(default=0, ge=0, le=2000),
+    cursor: Optional[str] = Query(default=None, max_length=MAX_CURSOR_LENGTH),
+    sort: TaskSort = Query(default="due"),
     svc: TaskService = Depends(get_task_service),
     _admin: Any = Depends(admin_required),
 ) -> list[TaskRead]:
     try:
-        return cast(
-            list[TaskRead],
-            await svc.admin_list_all(
-                status=status,
-                due_before=_normalize_dt(due_before),
-                limit=limit,
-                offset=offset,
-            ),
+        page = await svc.admin_list_all(
+            status=status,
+            due_before=_normalize_dt(due_before),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            order_by_due_first=sort == "due",
         )
+        _set_next_page_headers(request, response, page.next_cursor)
+        return cast(list[TaskRead], page.items)
     except Exception as e:
         map_service_errors(e)
         raise
+
+
+@admin_router.get("/export", response_class=StreamingResponse)
+async def admin_export_tasks(
+    status: Optional[TaskState] = Query(default=None, alias="status"),
+    due_before: Optional[dt.datetime] = Query(default=None, alias="due<"),
+    fmt: ExportFormat = Query(default="ndjson", alias="format"),
+    _admin: Any = Depends(admin_required),
+) -> StreamingResponse:
+    """Выгрузка всей таблицы задач потоком: память не растёт с числом строк."""
+    return _export_response(
+        fmt, stream_tasks(owner_id=None, status=status, due_before=_normalize_dt(due_before))
+    )
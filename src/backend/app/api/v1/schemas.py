@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import datetime as dt
 import uuid
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from domain.value_objects.task_priority import TaskPriority
 from domain.value_objects.task_state import TaskState
@@ -38,8 +38,10 @@ class UserCreate(BaseModel):
 
 
 # -------- Tasks --------
-MAX_NAME_LENGTH = 120
-MAX_DESCRIPTION_LENGTH = 2000
+# Совпадают с длиной столбцов tasks.name varchar(63) и tasks.description varchar(255):
+# длиннее значение прошло бы проверку и уронило бы INSERT (и весь пакет/импорт) в 500
+MAX_NAME_LENGTH = 63
+MAX_DESCRIPTION_LENGTH = 255
 
 
 class TaskBase(BaseModel):
@@ -55,6 +57,8 @@ class TaskBase(BaseModel):
     @classmethod
     def _strip_text(cls, value: Optional[str]) -> Optional[str]:
         if isinstance(value, str):
+            if "\x00" in value:  # text в Postgres не хранит NUL: INSERT/COPY упал бы
+                raise ValueError("NUL characters are not allowed")
             value = value.strip()
         return value
 
@@ -87,6 +91,68 @@ class TaskRead(BaseModel):
     state: TaskState
     priority: TaskPriority
     owner_id: uuid.UUID
+    due_at: Optional[dt.datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class TaskStatsItem(BaseModel):
+    state: TaskState
+    priority: TaskPriority
+    count: int
+    overdue: int  # due_at в прошлом, задача не выполнена
+
+
+class TaskStats(BaseModel):
+    total: int
+    overdue: int
+    items: List[TaskStatsItem]  # все пары статус×приоритет, включая нулевые
+
+
+# -------- Batch --------
+MAX_BATCH_SIZE = 100
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    id: uuid.UUID
+
+
+class TaskBatchCreate(BaseModel):
+    # Элементы валидируются по одному (TaskCreate), чтобы ошибка в одном не роняла весь пакет
+    items: List[Dict[str, Any]] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchUpdate(BaseModel):
+    items: List[Dict[str, Any]] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: List[uuid.UUID] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchItemResult(BaseModel):
+    index: int
+    status: int
+    id: Optional[uuid.UUID] = None
+    task: Optional[TaskRead] = None
+    problem: Optional[Dict[str, Any]] = None  # RFC 7807 для неуспешного элемента
+
+
+class TaskBatchResult(BaseModel):
+    items: List[TaskBatchItemResult]
+
+
+# -------- Import --------
+MAX_IMPORT_ERRORS = 1000
+
+
+class TaskImportLineError(BaseModel):
+    line: int  # номер строки тела запроса, с 1
+    errors: List[Dict[str, Any]]
+
+
+class TaskImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TaskImportLineError]  # не больше MAX_IMPORT_ERRORS, остальные только в failed
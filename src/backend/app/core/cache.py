@@ -0,0 +1,171 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.metrics import registry
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Ограниченный по размеру LRU-кэш с временем жизни записей.
+
+    Каждая запись живёт не дольше ttl_seconds (или индивидуального ttl, если он меньше).
+    При переполнении вытесняется давно не использовавшаяся запись. Если задан weigh
+    (размер значения в байтах), кэш ограничен ещё и max_bytes.
+    Счётчики попаданий/промахов публикуются в реестр метрик как cache_<name>_*.
+    flushable=False — кэш не данных (пины чтений, проверенные токены): полный сброс
+    по шине инвалидации его не трогает.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_size: int,
+        ttl_seconds: float,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        weigh: Optional[Callable[[V], int]] = None,
+        max_bytes: Optional[int] = None,
+        flushable: bool = True,
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.flushable = flushable
+        self._clock = clock
+        self._weigh = weigh
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._lookups = 0
+        self._hit_count = 0
+        self._hits = registry.counter(f"cache_{name}_hits_total", f"Попадания в кэш {name}")
+        self._misses = registry.counter(f"cache_{name}_misses_total", f"Промахи кэша {name}")
+        self._evictions = registry.counter(
+            f"cache_{name}_evictions_total", f"Вытеснения из кэша {name} по размеру"
+        )
+        self._size = registry.gauge(f"cache_{name}_size", f"Число записей в кэше {name}")
+        self._hit_ratio = registry.gauge(
+            f"cache_{name}_hit_ratio", f"Доля попаданий в кэш {name} с запуска процесса"
+        )
+        self._bytes_gauge = (
+            registry.gauge(f"cache_{name}_bytes", f"Размер значений в кэше {name}, байт")
+            if weigh is not None
+            else None
+        )
+        caches[name] = self
+
+    def _pop(self, key: K) -> None:
+        """Удаляет запись и обновляет размеры; вызывается под self._lock."""
+        entry = self._data.pop(key, None)
+        if entry is not None and self._weigh is not None:
+            self._bytes -= self._weigh(entry[1])
+
+    def _publish_size(self) -> None:
+        self._size.set(len(self._data))
+        if self._bytes_gauge is not None:
+            self._bytes_gauge.set(self._bytes)
+
+    def _over_limit(self) -> bool:
+        if len(self._data) > self.max_size:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def get(self, key: K) -> Optional[V]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._pop(key)
+                self._publish_size()
+                entry = None
+            elif entry is not None:
+                self._data.move_to_end(key)
+            self._lookups += 1
+            self._hit_count += entry is not None
+            self._hit_ratio.set(self._hit_count / self._lookups)
+        if entry is None:
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        return entry[1]
+
+    def set(self, key: K, value: V, *, ttl: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        lifetime = self.ttl_seconds if ttl is None else min(ttl, self.ttl_seconds)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (self._clock() + lifetime, value)
+            if self._weigh is not None:
+                self._bytes += self._weigh(value)
+            while self._data and self._over_limit():
+                self._pop(next(iter(self._data)))
+                self._evictions.inc()
+            self._publish_size()
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._pop(key)
+            self._publish_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._publish_size()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class Generations(Generic[K]):
+    """
+    Номер поколения данных на ключ (например, владельца задач). Кэш кладёт текущий
+    номер в ключ записи, а bump() после записи в БД выдаёт новый — старые записи
+    становятся недостижимыми и вытесняются сами (LRU/TTL), без перебора кэша.
+
+    Номера глобально уникальны и растут. Ключ без записи получает общий «пол»;
+    при вытеснении любого ключа пол сдвигается на новый номер, поэтому забытый
+    ключ никогда не вернётся к номеру, под которым лежат устаревшие записи.
+    """
+
+    def __init__(self, *, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[K, int]" = OrderedDict()
+        self._numbers = itertools.count(1)
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> int:
+        with self._lock:
+            return self._data.get(key, self._floor)
+
+    def bump(self, key: K) -> None:
+        with self._lock:
+            self._data[key] = next(self._numbers)
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._floor = next(self._numbers)
+
+    def bump_all(self) -> None:
+        """Сбросить все поколения сразу (например, при потере сообщений об изменениях)."""
+        with self._lock:
+            self._data.clear()
+            self._floor = next(self._numbers)
+
+
+# Все созданные кэши процесса по имени — для точечной или полной инвалидации.
+caches: Dict[str, TTLCache] = {}
@@ -0,0 +1,57 @@
+import datetime as dt
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+
+def strong_etag(*parts: Any) -> str:
+    """Сильный ETag из частей версии; внутренние значения (id, время) наружу не видны."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def http_date(value: dt.datetime) -> str:
+    return format_datetime(value.astimezone(dt.timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match сравнивает слабо (RFC 9110, 13.1.2): префикс W/ не учитывается
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def _not_modified_since(if_modified_since: str, last_modified: dt.datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False  # некорректная дата заголовка игнорируется
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=dt.timezone.utc)
+    # HTTP-дата с точностью до секунды
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[dt.datetime] = None
+) -> bool:
+    """
+    Нужно ли ответить 304. If-Modified-Since учитывается, только если нет
+    If-None-Match (RFC 9110, 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        return _not_modified_since(if_modified_since, last_modified)
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[dt.datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
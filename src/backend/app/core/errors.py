@@ -24,12 +24,26 @@ class ProblemException(Exception):
         detail: str,
         type_: str = "about:blank",
         errors: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
     ):
         self.status_code = status_code
         self.title = title
         self.detail = detail
         self.type_ = type_
         self.errors = errors or {}
+        self.headers = headers or {}
+
+    def as_problem(self) -> Dict[str, Any]:
+        """Тело RFC 7807 без привязки к запросу — для ошибок внутри пакетных ответов."""
+        problem: Dict[str, Any] = {
+            "type": self.type_,
+            "title": self.title,
+            "status": self.status_code,
+            "detail": self.detail,
+        }
+        if self.errors:
+            problem["errors"] = self.errors
+        return problem
 
 
 HTTP_STATUS_TITLES = {
@@ -41,6 +55,7 @@ HTTP_STATUS_TITLES = {
     413: "Payload Too Large",
     429: "Too Many Requests",
     500: "Internal Server Error",
+    503: "Service Unavailable",
 }
 
 
@@ -64,6 +79,7 @@ def problem_response(
     detail: str,
     type_: str = "about:blank",
     extra: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
 ) -> JSONResponse:
     correlation_id = get_correlation_id(request)
 
@@ -79,10 +95,13 @@ def problem_response(
     if extra:
         problem.update(extra)
 
+    response_headers = dict(headers or {})
+    response_headers["X-Correlation-ID"] = correlation_id
+
     return JSONResponse(
         status_code=status_code,
         content=problem,
-        headers={"X-Correlation-ID": correlation_id},
+        headers=response_headers,
     )
 
 
@@ -95,6 +114,7 @@ async def problem_exception_handler(request: Request, exc: ProblemException) ->
         detail=exc.detail,
         type_=exc.type_,
         extra=extra,
+        headers=exc.headers,
     )
 
 
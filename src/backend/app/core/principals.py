@@ -0,0 +1,24 @@
+import uuid
+
+from app.core.cache import Generations, TTLCache
+from app.core.settings import config
+from domain.entities.principal import Principal
+
+# user_id -> Principal. Записи явно сбрасывает UserRepository при смене прав/пароля/удалении.
+principal_cache: TTLCache[uuid.UUID, Principal] = TTLCache(
+    "principals",
+    max_size=config.cache.principals.max_size,
+    ttl_seconds=config.cache.principals.ttl_seconds,
+    enabled=config.cache.principals.enabled,
+)
+
+# user_id -> поколение пользователя; запрос, читавший БД до смены поколения,
+# не кладёт в кэш прочитанный (возможно, уже устаревший) Principal
+principal_generations: Generations[uuid.UUID] = Generations(
+    max_size=config.cache.principals.max_size
+)
+
+
+def invalidate_principal(user_id: uuid.UUID) -> None:
+    principal_cache.invalidate(user_id)
+    principal_generations.bump(user_id)
@@ -0,0 +1,176 @@
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Protocol, Tuple
+from urllib.parse import parse_qs
+
+from app.core.errors import problem_response
+from app.core.metrics import registry
+from app.core.settings import RateLimitRule
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Тело логин-формы небольшое; больше этого не читаем, чтобы не буферизовать чужие загрузки
+MAX_LOGIN_BODY_SIZE = 16 * 1024
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class RateLimitStore(Protocol):
+    async def hit(self, key: str, *, limit: int, window_seconds: float) -> RateLimitDecision: ...
+
+
+class InMemoryRateLimitStore:
+    """
+    Token bucket в памяти процесса: ёмкость limit, пополнение limit/window_seconds в секунду.
+    Подходит для одного воркера; число ключей ограничено, вытесняются давно не активные.
+    """
+
+    def __init__(self, *, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def hit(self, key: str, *, limit: int, window_seconds: float) -> RateLimitDecision:
+        now = self._clock()
+        rate = limit / window_seconds
+        tokens, updated = self._buckets.get(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - updated) * rate)
+
+        if tokens >= 1:
+            decision = RateLimitDecision(True)
+            tokens -= 1
+        else:
+            decision = RateLimitDecision(False, (1 - tokens) / rate)
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return decision
+
+
+def _rule_matches(rule: RateLimitRule, path: str, method: str) -> bool:
+    if rule.methods and method not in rule.methods:
+        return False
+    return path.startswith(rule.path)
+
+
+def _extract_login(body: bytes) -> Optional[str]:
+    values = parse_qs(body.decode("latin-1"), max_num_fields=16).get("username")
+    if not values or not values[0]:
+        return None
+    return values[0].strip().lower()
+
+
+class RateLimitMiddleware:
+    """
+    ASGI-лимитер запросов, срабатывающий до маршрутизации и зависимостей.
+
+    Для каждого запроса применяются все подходящие правила. Ключ правила — IP клиента
+    или логин из urlencoded-формы (для /auth/token), так что перебор паролей отсекается
+    раньше, чем запрос доходит до bcrypt. Отказ — RFC 7807 429 с Retry-After.
+
+    Правила с shared=True считаются в shared_store (общем для воркеров), если он задан;
+    остальные — в store процесса.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        rules: List[RateLimitRule],
+        store: RateLimitStore,
+        shared_store: Optional[RateLimitStore] = None,
+    ):
+        self.app = app
+        self.rules = rules
+        self.store = store
+        self.shared_store = shared_store
+        self._rejected = registry.counter(
+            "rate_limit_rejected_total", "Запросы, отклонённые лимитером"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path, method = scope["path"], scope["method"]
+        rules = [r for r in self.rules if _rule_matches(r, path, method)]
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        login: Optional[str] = None
+        if any(rule.key == "login" for rule in rules):
+            body, receive = await self._buffer_body(receive)
+            if body is not None and _is_urlencoded(scope):
+                login = _extract_login(body)
+
+        client = scope.get("client")
+        client_ip = client[0] if client else None
+
+        for rule in rules:
+            identity = client_ip if rule.key == "ip" else login
+            if identity is None:
+                continue
+            raw_key = f"{rule.key}:{rule.path}:{identity}"
+            key = hashlib.sha256(raw_key.encode()).hexdigest()
+            store = self.shared_store if rule.shared and self.shared_store else self.store
+            decision = await store.hit(key, limit=rule.limit, window_seconds=rule.window_seconds)
+            if not decision.allowed:
+                self._rejected.inc()
+                response = problem_response(
+                    Request(scope),
+                    status_code=429,
+                    title="Too Many Requests",
+                    detail="Rate limit exceeded, retry later.",
+                    type_="https://example.com/problems/rate-limited",
+                    extra={"errors": {"code": "rate_limit.exceeded"}},
+                    headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _buffer_body(receive: Receive) -> Tuple[Optional[bytes], Receive]:
+        """
+        Читает тело запроса, чтобы достать логин, и возвращает receive, который отдаст
+        его приложению повторно. Слишком большое тело не разбирается (None).
+        """
+        messages: List[Message] = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False) or size > MAX_LOGIN_BODY_SIZE:
+                break
+
+        complete = messages[-1].get("type") == "http.request" and not messages[-1].get(
+            "more_body", False
+        )
+        body = b"".join(m.get("body", b"") for m in messages) if complete else None
+
+        async def replay() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return body, replay
+
+
+def _is_urlencoded(scope: Scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"content-type":
+            return value.split(b";")[0].strip() == b"application/x-www-form-urlencoded"
+    return False
@@ -1,8 +1,17 @@
+import asyncio
+import hashlib
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from functools import partial
+from typing import Any, Callable, Optional, cast
 
+from app.core.cache import TTLCache
+from app.core.errors import ProblemException
+from app.core.metrics import registry
 from app.core.settings import config  # expects SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM
+from fastapi import status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -13,6 +22,185 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
     return pwd_context.verify(plain_password, password_hash)
 
 
+def hash_password(plain_password: str, rounds: Optional[int] = None) -> str:
+    handler = pwd_context.handler()
+    if rounds is not None:
+        handler = handler.using(rounds=rounds)
+    return handler.hash(plain_password)
+
+
+def measure_bcrypt_seconds(rounds: int) -> float:
+    started = time.perf_counter()
+    hash_password("calibration-password", rounds)
+    return time.perf_counter() - started
+
+
+def calibrate_bcrypt_rounds(
+    *,
+    target_ms: float,
+    min_rounds: int,
+    max_rounds: int,
+    measure: Callable[[int], float] = measure_bcrypt_seconds,
+) -> int:
+    """
+    Подбирает наибольший cost, при котором хэш укладывается в target_ms.
+    Каждый +1 к rounds удваивает время bcrypt, поэтому хватает одного замера на min_rounds.
+    Ниже min_rounds не опускаемся, даже если CPU медленный.
+    """
+    elapsed_ms = measure(min_rounds) * 1000
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+class PasswordHasher:
+    """
+    Асинхронный фасад над bcrypt.
+
+    Хэширование и проверка выполняются в пуле процессов, чтобы не блокировать event loop.
+    Число одновременно ожидающих операций ограничено: при переполнении отвечаем 503
+    с Retry-After, а не копим очередь, которая всё равно не уложится в таймауты клиентов.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_pending: int,
+        retry_after_seconds: int,
+        rounds: Optional[int] = None,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after_seconds = retry_after_seconds
+        self.rounds: Optional[int] = None
+        # Своя копия политики: по ней решаем, устарел ли сохранённый хэш
+        self._policy = pwd_context.copy()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._queue_depth = registry.gauge(
+            "password_hasher_queue_depth", "Операции bcrypt в пуле (выполняются + ждут)"
+        )
+        self._latency = registry.summary(
+            "password_hasher_latency_seconds", "Время операции bcrypt, включая ожидание в пуле"
+        )
+        self._rejected = registry.counter(
+            "password_hasher_rejected_total", "Операции, отклонённые из-за переполнения пула"
+        )
+        self._rounds_gauge = registry.gauge("password_hasher_bcrypt_rounds", "Текущий cost bcrypt")
+        self._rehashed = registry.counter(
+            "password_hasher_rehashed_total", "Пароли, перехэшированные при логине"
+        )
+        if rounds is not None:
+            self.set_rounds(rounds)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected.inc()
+            raise ProblemException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                title="Service Unavailable",
+                detail="Authentication service is busy, retry later.",
+                type_="https://example.com/problems/service-unavailable",
+                errors={"code": "auth.hasher_saturated"},
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+
+        self._pending += 1
+        self._queue_depth.set(self._pending)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+            self._queue_depth.set(self._pending)
+            self._latency.observe(time.perf_counter() - started)
+
+    def set_rounds(self, rounds: int) -> None:
+        """
+        Фиксирует cost для новых хэшей. Устаревшим (needs_rehash) считается только хэш
+        с cost ниже текущего: более сильный хэш не понижаем, а воркеры, откалиброванные
+        на разный cost, не перехэшируют одного пользователя туда-обратно.
+        """
+        self.rounds = rounds
+        self._policy.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+        self._rounds_gauge.set(rounds)
+
+    async def calibrate(self, *, target_ms: float, min_rounds: int, max_rounds: int) -> int:
+        """Замеряет bcrypt в рабочем процессе пула и выставляет подобранный cost (один раз)."""
+        if self.rounds is None:
+            loop = asyncio.get_running_loop()
+            rounds = await loop.run_in_executor(
+                self._get_executor(),
+                partial(
+                    calibrate_bcrypt_rounds,
+                    target_ms=target_ms,
+                    min_rounds=min_rounds,
+                    max_rounds=max_rounds,
+                ),
+            )
+            self.set_rounds(rounds)
+        return cast(int, self.rounds)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self.rounds is not None and self._policy.needs_update(password_hash)
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._submit(hash_password, plain_password, self.rounds)
+
+    async def verify(self, plain_password: str, password_hash: str) -> bool:
+        return await self._submit(verify_password, plain_password, password_hash)
+
+    async def rehash_if_stale(self, plain_password: str, password_hash: str) -> Optional[str]:
+        """
+        Новый хэш с текущим cost, если password_hash устарел, иначе None.
+        Вызывать только после успешной проверки пароля. При переполненном пуле
+        перехэширование откладывается до следующего логина, а не валит запрос.
+        """
+        if not self.needs_rehash(password_hash):
+            return None
+        try:
+            new_hash = await self.hash(plain_password)
+        except ProblemException:
+            return None
+        self._rehashed.inc()
+        return new_hash
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=config.password_hashing.workers,
+    max_pending=config.password_hashing.max_pending,
+    retry_after_seconds=config.password_hashing.retry_after_seconds,
+    rounds=config.password_hashing.rounds,
+)
+
+# sha256(token) -> sub. Запись живёт не дольше exp самого токена.
+token_cache: TTLCache[bytes, uuid.UUID] = TTLCache(
+    "tokens",
+    max_size=config.cache.tokens.max_size,
+    ttl_seconds=config.cache.tokens.ttl_seconds,
+    enabled=config.cache.tokens.enabled,
+    flushable=False,  # подпись и exp токена от данных в БД не зависят
+)
+
+
 def create_access_token(*, sub: uuid.UUID, expires_minutes: Optional[int] = None) -> str:
     expire = datetime.now(tz=timezone.utc) + timedelta(
         minutes=expires_minutes or config.security.access_token_expire_minute
@@ -22,10 +210,20 @@ def create_access_token(*, sub: uuid.UUID, expires_minutes: Optional[int] = None
 
 
 def decode_token(token: str) -> uuid.UUID:
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(
             token, config.security.secret_key, algorithms=[config.security.algorithm]
         )
-        return uuid.UUID(payload.get("sub"))
+        sub = uuid.UUID(payload.get("sub"))
     except (JWTError, ValueError) as e:
         raise ValueError("Invalid token") from e
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(digest, sub, ttl=exp - time.time())
+    return sub
@@ -1,10 +1,11 @@
 import os
 import re
 from pathlib import Path
+from typing import List, Literal, Optional
 
 import yaml
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy import URL
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # путь до корня проекта
@@ -30,6 +31,28 @@ def load_yaml_config(path: str = CONFIG_PATH):
     return resolve_env_vars(raw)
 
 
+class DatabasePool(BaseModel):
+    size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=10, ge=0)
+    timeout_seconds: float = Field(default=30.0, gt=0)  # ожидание свободного соединения
+    recycle_seconds: int = Field(default=1800, ge=-1)  # -1 — не пересоздавать
+    pre_ping: bool = True
+    # Кэш подготовленных выражений asyncpg на соединение; 0 — отключить (нужно за pgbouncer)
+    prepared_statement_cache_size: int = Field(default=100, ge=0)
+
+
+class ReplicaConfig(BaseModel):
+    """Реплика для чтения; учётные данные и имя БД — как у основной."""
+
+    host: str
+    port: int = 5432
+    # Сколько после записи пользователя его чтения идут в primary (лаг репликации)
+    read_your_writes_seconds: float = Field(default=5.0, ge=0)
+    # Сколько не ходить в реплику после ошибки соединения
+    unhealthy_cooldown_seconds: float = Field(default=30.0, gt=0)
+    max_pinned_owners: int = Field(default=100_000, ge=1)
+
+
 class DatabaseConfig(BaseModel):
     host: str
     port: int
@@ -38,16 +61,31 @@ class DatabaseConfig(BaseModel):
     name: str
     driver: str
     database_system: str
+    pool: DatabasePool = DatabasePool()
+    replica: Optional[ReplicaConfig] = None
 
     @property
     def url(self):
+        return self._render_url(self.host, self.port)
+
+    @property
+    def replica_url(self) -> Optional[str]:
+        if self.replica is None:
+            return None
+        return self._render_url(self.replica.host, self.replica.port)
+
+    def _render_url(self, host: str, port: int) -> str:
+        query = {}
+        if self.driver == "asyncpg":
+            query["prepared_statement_cache_size"] = str(self.pool.prepared_statement_cache_size)
         return URL.create(
             drivername=f"{self.database_system}+{self.driver}",
             username=self.user,
             database=self.name,
             password=self.password,
-            port=self.port,
-            host=self.host,
+            port=port,
+            host=host,
+            query=query,
         ).render_as_string(hide_password=False)
 
 
@@ -57,9 +95,91 @@ class Security(BaseModel):
     algorithm: str
 
 
+class PasswordHashing(BaseModel):
+    workers: int = Field(default=2, ge=1)
+    max_pending: int = Field(default=32, ge=1)
+    retry_after_seconds: int = Field(default=1, ge=1)
+    # Cost bcrypt: если rounds не задан, подбирается при старте под target_ms,
+    # но не ниже min_rounds (security floor) и не выше max_rounds.
+    rounds: Optional[int] = Field(default=None, ge=4, le=31)
+    target_ms: float = Field(default=250.0, gt=0)
+    min_rounds: int = Field(default=10, ge=4, le=31)
+    max_rounds: int = Field(default=14, ge=4, le=31)
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = True
+    max_size: int = Field(default=10_000, ge=1)
+    ttl_seconds: float = Field(default=30.0, gt=0)
+    max_bytes: Optional[int] = Field(default=None, ge=1)  # для кэшей с размером значений
+
+
+class CacheBus(BaseModel):
+    """Инвалидация кэшей между воркерами через LISTEN/NOTIFY; для одного воркера не нужна."""
+
+    enabled: bool = False
+    reconnect_delay_seconds: float = Field(default=1.0, gt=0)
+    max_reconnect_delay_seconds: float = Field(default=30.0, gt=0)
+    keepalive_seconds: float = Field(default=30.0, gt=0)
+
+
+class Caches(BaseModel):
+    principals: CacheSettings = CacheSettings()
+    tokens: CacheSettings = CacheSettings(max_size=50_000, ttl_seconds=300.0)
+    task_stats: CacheSettings = CacheSettings(ttl_seconds=10.0)
+    task_lists: CacheSettings = CacheSettings(ttl_seconds=60.0, max_bytes=64 * 1024 * 1024)
+    bus: CacheBus = CacheBus()
+
+
+class RateLimitRule(BaseModel):
+    path: str = "/"  # префикс пути
+    methods: List[str] = []  # пусто — любые методы
+    key: Literal["ip", "login"] = "ip"
+    limit: int = Field(ge=1)
+    window_seconds: float = Field(gt=0)
+    # При store=postgres счётчик общий для воркеров (запись в БД на каждую проверку),
+    # поэтому только для узких правил вроде логина; остальные — в памяти воркера
+    shared: bool = False
+
+
+class RateLimiting(BaseModel):
+    enabled: bool = True
+    store: Literal["memory", "postgres"] = "memory"
+    max_keys: int = Field(default=100_000, ge=1)
+    rules: List[RateLimitRule] = [
+        RateLimitRule(limit=100, window_seconds=1),  # NFR-SEC-04
+        RateLimitRule(
+            path="/api/v1/auth/token",
+            methods=["POST"],
+            key="ip",
+            limit=20,
+            window_seconds=60,
+            shared=True,
+        ),
+        RateLimitRule(
+            path="/api/v1/auth/token",
+            methods=["POST"],
+            key="login",
+            limit=5,
+            window_seconds=60,
+            shared=True,
+        ),
+    ]
+
+
+class Archive(BaseModel):
+    # выполненные задачи без изменений дольше этого срока уходят в tasks_archive
+    done_after_days: int = Field(default=30, ge=1)
+    batch_size: int = Field(default=1000, ge=1)  # задач на одну транзакцию переноса
+
+
 class Config(BaseModel):
     database: DatabaseConfig
     security: Security
+    password_hashing: PasswordHashing = PasswordHashing()
+    cache: Caches = Caches()
+    rate_limit: RateLimiting = RateLimiting()
+    archive: Archive = Archive()
 
 
 def load_config() -> Config:
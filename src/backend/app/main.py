@@ -1,13 +1,56 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from adapters.db import invalidation
+from adapters.db.session_context import dispose_engine, init_engine
+from app.api.v1.deps.auth import admin_required
 from app.api.v1.routers import auth as auth_router
 from app.api.v1.routers import tasks as tasks_router
 from app.api.v1.routers import uploads as uploads_router
 from app.core import errors as error_handlers
 from app.core.errors import ProblemException
-from fastapi import APIRouter, FastAPI, HTTPException, Request
+from app.core.metrics import registry as metrics_registry
+from app.core.rate_limit import InMemoryRateLimitStore, RateLimitMiddleware, RateLimitStore
+from app.core.security import password_hasher
+from app.core.settings import config
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-app = FastAPI(title="SecDev Course App", version="0.1.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await password_hasher.calibrate(
+        target_ms=config.password_hashing.target_ms,
+        min_rounds=config.password_hashing.min_rounds,
+        max_rounds=config.password_hashing.max_rounds,
+    )
+    init_engine(config.database)
+    replica = config.database.replica
+    if (
+        replica is not None
+        and replica.read_your_writes_seconds > 0
+        and not config.cache.bus.enabled
+    ):
+        # Закрепления чтений живут в памяти воркера; другим воркерам их передаёт только шина
+        logger.warning(
+            "database.replica.read_your_writes_seconds only holds within one worker "
+            "while cache.bus.enabled is false"
+        )
+    if config.cache.bus.enabled:
+        invalidation.start_listener(config.database, config.cache.bus)
+    try:
+        yield
+    finally:
+        await invalidation.stop_listener()
+        await dispose_engine()
+        password_hasher.shutdown()
+
+
+app = FastAPI(title="SecDev Course App", version="0.1.0", lifespan=lifespan)
 
 app.add_exception_handler(
     ProblemException,
@@ -50,6 +93,31 @@ async def add_correlation_id_header(request: Request, call_next):
     return response
 
 
+def build_shared_rate_limit_store() -> Optional[RateLimitStore]:
+    if config.rate_limit.store != "postgres":
+        return None
+    from adapters.db.rate_limit_store import PostgresRateLimitStore
+
+    shared = [rule.window_seconds for rule in config.rate_limit.rules if rule.shared]
+    return PostgresRateLimitStore(retention_seconds=max(shared, default=0.0))
+
+
+# Добавляется последним, значит оборачивает всё остальное и отсекает лишнее раньше всех
+if config.rate_limit.enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=config.rate_limit.rules,
+        store=InMemoryRateLimitStore(max_keys=config.rate_limit.max_keys),
+        shared_store=build_shared_rate_limit_store(),
+    )
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", dependencies=[Depends(admin_required)])
+def metrics():
+    """Внутренние метрики (пул, кэши, хэшер, rate limit) — только администраторам."""
+    return metrics_registry.snapshot()
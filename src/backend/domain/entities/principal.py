@@ -0,0 +1,15 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class Principal(BaseModel):
+    """Аутентифицированный пользователь: только поля, нужные обработчикам запросов."""
+
+    id: UUID
+    login: str
+    is_admin: bool
+
+    class Config:
+        from_attributes = True
+        frozen = True
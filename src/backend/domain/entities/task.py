@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 from domain.value_objects.task_priority import TaskPriority
@@ -12,3 +14,5 @@ class Task(BaseModel):
     state: TaskState
     priority: TaskPriority
     owner_id: UUID
+    due_at: Optional[datetime] = None
+    updated: Optional[datetime] = None  # версия строки: ETag / Last-Modified
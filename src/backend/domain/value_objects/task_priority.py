@@ -5,3 +5,15 @@ class TaskPriority(Enum):
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
+
+    @property
+    def rank(self) -> int:
+        """Числовой ранг для сортировки: чем больше, тем срочнее."""
+        return _PRIORITY_RANKS[self]
+
+
+_PRIORITY_RANKS = {
+    TaskPriority.LOW: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.HIGH: 3,
+}
@@ -0,0 +1,57 @@
+"""
+Перенос старых выполненных задач из tasks в tasks_archive.
+
+Задача в статусе done без изменений дольше archive.done_after_days уходит в архив;
+горячая таблица и её индексы остаются размером с активную работу. Запуск:
+
+    python -m jobs.archive_done_tasks
+"""
+
+import asyncio
+import datetime as dt
+import logging
+from typing import Optional
+
+from adapters.db.repositories.task_repo import TaskRepository
+from adapters.db.session_context import dispose_engine, init_engine, unit_of_work
+from app.core.settings import config
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_done_tasks(
+    *,
+    done_after_days: int = config.archive.done_after_days,
+    batch_size: int = config.archive.batch_size,
+    now: Optional[dt.datetime] = None,
+) -> int:
+    """Переносит задачи пачками до тех пор, пока очередная пачка не окажется неполной."""
+    cutoff = (now or dt.datetime.now(dt.timezone.utc)) - dt.timedelta(days=done_after_days)
+    archived = 0
+    while True:
+        # Отдельная транзакция на пачку: блокировки строк tasks держатся недолго
+        async with unit_of_work() as session:
+            moved = await TaskRepository(session).archive_done(
+                updated_before=cutoff, limit=batch_size
+            )
+        archived += moved
+        if moved < batch_size:
+            return archived
+
+
+async def _run() -> int:
+    init_engine()
+    try:
+        return await archive_done_tasks()
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    archived = asyncio.run(_run())
+    logger.info("tasks archived: %d", archived)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Сверка task_counters с фактическим содержимым tasks.
+
+Счётчики ведут триггеры, но ручные правки, восстановление из бэкапа или
+отключённые триггеры могут оставить расхождение. Запуск:
+
+    python -m jobs.reconcile_task_counters
+"""
+
+import asyncio
+import logging
+
+from adapters.db.models.user import User
+from adapters.db.repositories.task_counter_repo import TaskCounterRepository
+from adapters.db.session_context import dispose_engine, init_engine, unit_of_work
+from sqlalchemy import select
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+async def reconcile_task_counters(batch_size: int = BATCH_SIZE) -> int:
+    """Проходит пользователей пачками по id (keyset) и чинит их счётчики."""
+    fixed = 0
+    last_id = None
+    while True:
+        # Отдельная транзакция на пачку: блокировки счётчиков держатся недолго
+        async with unit_of_work() as session:
+            stmt = select(User.id).order_by(User.id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(User.id > last_id)
+            owner_ids = list((await session.execute(stmt)).scalars())
+            if not owner_ids:
+                break
+            fixed += await TaskCounterRepository(session).reconcile(owner_ids)
+            last_id = owner_ids[-1]
+    async with unit_of_work() as session:
+        fixed += await TaskCounterRepository(session).delete_orphans()
+    return fixed
+
+
+async def _run() -> int:
+    init_engine()
+    try:
+        return await reconcile_task_counters()
+    finally:
+        await dispose_engine()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    fixed = asyncio.run(_run())
+    logger.info("task_counters reconciled: %d rows fixed", fixed)
+
+
+if __name__ == "__main__":
+    main()
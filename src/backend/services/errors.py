@@ -1,6 +1,11 @@
+from typing import Optional
+
+
 class ServiceError(RuntimeError):
     pass
 
 
 class ConflictError(ServiceError):
-    pass
+    def __init__(self, message: str, *, field: Optional[str] = None):
+        super().__init__(message)
+        self.field = field
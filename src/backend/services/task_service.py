@@ -1,20 +1,70 @@
 import datetime as dt
 import uuid
-from typing import Optional, Sequence
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Union
 
-from adapters.db.repositories.task_repo import TaskRepository
-from adapters.db.session_context import get_async_session
+from adapters.db import invalidation
+from adapters.db.repositories.base import RepositoryError
+from adapters.db.repositories.pagination import Page
+from adapters.db.repositories.task_counter_repo import TaskCounterRepository
+from adapters.db.repositories.task_repo import TaskRepository, TaskStatsBucket
+from adapters.db.session_context import (
+    after_commit,
+    get_async_session,
+    get_async_session_manager,
+    pin_reads,
+)
+from app.core.cache import Generations, TTLCache
+from app.core.settings import config
+from domain.entities.task import Task
 from domain.value_objects.task_priority import TaskPriority
 from domain.value_objects.task_state import TaskState
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# owner_id -> статистика GET /tasks/stats. Записи сбрасывают записи TaskService
+# после commit; TTL ограничивает устаревание от прочих путей (архивация, просрочка).
+task_stats_cache: TTLCache[uuid.UUID, List[TaskStatsBucket]] = TTLCache(
+    "task_stats",
+    max_size=config.cache.task_stats.max_size,
+    ttl_seconds=config.cache.task_stats.ttl_seconds,
+    enabled=config.cache.task_stats.enabled,
+)
+
+# owner_id -> поколение задач владельца; ключ кэша страниц GET /tasks включает его,
+# так что запись владельца делает все его закэшированные страницы недостижимыми
+task_list_generations: Generations[uuid.UUID] = Generations(
+    max_size=config.cache.task_lists.max_size
+)
+
+
+def _invalidate_owner(owner_id: uuid.UUID) -> None:
+    task_stats_cache.invalidate(owner_id)
+    task_list_generations.bump(owner_id)
+
+
+def _written_elsewhere(owner_id: uuid.UUID) -> None:
+    # Реплика может ещё не догнать чужую запись: без пина промах кэша здесь же
+    # прочитал бы старые данные и положил их под новым поколением
+    pin_reads(owner_id)
+    _invalidate_owner(owner_id)
+
+
+# Записи задач в других воркерах и в jobs приходят через шину инвалидации
+invalidation.register(invalidation.TASKS, lambda key: _written_elsewhere(uuid.UUID(key)))
+# Полный сброс (потеря сообщений): страницы в полёте не должны лечь под старым поколением
+invalidation.on_flush(task_list_generations.bump_all)
+
 
 class TaskService:
 
     def __init__(self, session: AsyncSession):
         self.session = session
         self.tasks = TaskRepository(session)
+        self.counters = TaskCounterRepository(session)
+
+    def _changed(self, owner_id: uuid.UUID) -> None:
+        """Задачи владельца меняются в этой транзакции: кэши сбросить после commit."""
+        after_commit(self.session, lambda: _invalidate_owner(owner_id))
 
     async def create_task(
         self,
@@ -26,6 +76,7 @@ class TaskService:
         priority: TaskPriority,
         due_at: Optional[dt.datetime] = None,
     ):
+        self._changed(owner_id)
         return await self.tasks.create(
             owner_id=owner_id,
             name=name,
@@ -46,13 +97,32 @@ class TaskService:
         due_before: Optional[dt.datetime] = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> Sequence:
+        cursor: Optional[str] = None,
+        q: Optional[str] = None,
+        include_archived: bool = False,
+        order_by_due_first: bool = True,
+    ) -> Page:
+        # Поиск идёт только по горячим задачам: GIN-индексы есть лишь у tasks;
+        # порядок результатов поиска — по релевантности
+        if q:
+            return await self.tasks.search(
+                owner_id=owner_id,
+                q=q,
+                state=status,
+                due_before=due_before,
+                limit=limit,
+                offset=offset,
+                cursor=cursor,
+            )
         return await self.tasks.list(
             owner_id=owner_id,
             state=status,
             due_before=due_before,
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            order_by_due_first=order_by_due_first,
+            include_archived=include_archived,
         )
 
     async def update_task(
@@ -66,6 +136,7 @@ class TaskService:
         priority: Optional[TaskPriority] = None,
         due_at: Optional[dt.datetime] = None,
     ):
+        self._changed(owner_id)
         return await self.tasks.update(
             task_id,
             owner_id=owner_id,
@@ -77,16 +148,65 @@ class TaskService:
         )
 
     async def delete_task(self, task_id: uuid.UUID, *, owner_id: uuid.UUID) -> None:
+        self._changed(owner_id)
         await self.tasks.delete(task_id, owner_id=owner_id)
 
+    async def create_tasks(
+        self, *, owner_id: uuid.UUID, items: Sequence[Mapping[str, Any]]
+    ) -> List[Task]:
+        self._changed(owner_id)
+        return await self.tasks.create_many(owner_id=owner_id, items=items)
+
+    async def import_tasks(self, *, owner_id: uuid.UUID, items: Sequence[Mapping[str, Any]]) -> int:
+        self._changed(owner_id)
+        return await self.tasks.copy_many(owner_id=owner_id, items=items)
+
+    async def update_tasks(
+        self, *, owner_id: uuid.UUID, items: Sequence[Mapping[str, Any]]
+    ) -> Dict[uuid.UUID, Union[Task, RepositoryError]]:
+        self._changed(owner_id)
+        return await self.tasks.update_many(owner_id=owner_id, items=items)
+
+    async def delete_tasks(
+        self, *, owner_id: uuid.UUID, task_ids: Sequence[uuid.UUID]
+    ) -> Dict[uuid.UUID, Optional[RepositoryError]]:
+        self._changed(owner_id)
+        return await self.tasks.delete_many(owner_id=owner_id, task_ids=task_ids)
+
     async def count(
         self,
         *,
         owner_id: uuid.UUID,
         status: Optional[TaskState] = None,
         due_before: Optional[dt.datetime] = None,
+        include_archived: bool = False,
     ) -> int:
-        return await self.tasks.count(owner_id=owner_id, state=status, due_before=due_before)
+        # Счётчики хранятся по (владелец, статус); фильтр по дедлайну они не покрывают
+        if due_before is None:
+            total = await self.counters.total(owner_id=owner_id, state=status)
+        else:
+            total = await self.tasks.count(owner_id=owner_id, state=status, due_before=due_before)
+        if include_archived:
+            # Архив триггерами не учитывается: COUNT по его индексу владельца
+            total += await self.tasks.count(
+                owner_id=owner_id, state=status, due_before=due_before, archived=True
+            )
+        return total
+
+    async def list_version(self, *, owner_id: uuid.UUID) -> int:
+        """
+        Версия всех задач владельца для ETag списка: её увеличивает каждый commit,
+        изменивший его задачи (создание, правка, удаление, архивация, импорт).
+        """
+        return await self.tasks.version(owner_id=owner_id)
+
+    async def stats(self, *, owner_id: uuid.UUID) -> List[TaskStatsBucket]:
+        cached = task_stats_cache.get(owner_id)
+        if cached is not None:
+            return cached
+        buckets = await self.tasks.stats(owner_id=owner_id, now=dt.datetime.now(dt.timezone.utc))
+        task_stats_cache.set(owner_id, buckets)
+        return buckets
 
     async def admin_list_all(
         self,
@@ -95,12 +215,40 @@ class TaskService:
         due_before: Optional[dt.datetime] = None,
         limit: int = 100,
         offset: int = 0,
-    ):
+        cursor: Optional[str] = None,
+        order_by_due_first: bool = True,
+    ) -> Page:
         return await self.tasks.admin_list_all(
-            state=status, due_before=due_before, limit=limit, offset=offset
+            state=status,
+            due_before=due_before,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            order_by_due_first=order_by_due_first,
         )
 
 
+EXPORT_BATCH_SIZE = 1000
+
+
+async def stream_tasks(
+    *,
+    owner_id: Optional[uuid.UUID],
+    status: Optional[TaskState] = None,
+    due_before: Optional[dt.datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[Sequence[Mapping[str, Any]]]:
+    """
+    Поток пачек строк для выгрузки. Генератор держит собственную сессию: он работает
+    уже после того, как unit of work запроса закрыт, пока StreamingResponse отдаёт тело.
+    """
+    async with get_async_session_manager() as session:
+        async for rows in TaskRepository(session).stream(
+            owner_id=owner_id, state=status, due_before=due_before, batch_size=batch_size
+        ):
+            yield rows
+
+
 async def get_task_service(
     session: AsyncSession = Depends(get_async_session),
 ) -> TaskService:
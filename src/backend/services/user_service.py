@@ -1,14 +1,28 @@
 import uuid
 
+from adapters.db import invalidation
+from adapters.db.repositories.base import AlreadyExistsError
 from adapters.db.repositories.base import NotFoundError as RepoNotFound
 from adapters.db.repositories.user_repo import UserRepository
-from adapters.db.session_context import get_async_session
+from adapters.db.session_context import get_async_session, pin_reads
+from app.core.principals import invalidate_principal, principal_generations
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .errors import ConflictError
 
 
+def _changed_elsewhere(user_id: uuid.UUID) -> None:
+    pin_reads(user_id)  # как и у записавшего воркера: реплика могла не догнать каскад
+    invalidate_principal(user_id)
+
+
+# Пользователь изменён в другом воркере или job — сообщение шины инвалидации
+invalidation.register(invalidation.USERS, lambda key: _changed_elsewhere(uuid.UUID(key)))
+# Полный сброс (потеря сообщений): Principal, прочитанный до него, в кэш не ляжет
+invalidation.on_flush(principal_generations.bump_all)
+
+
 class UserService:
     """Business logic for users. Does not hash passwords; expects pass_hash from caller."""
 
@@ -16,15 +30,14 @@ class UserService:
         self.session = session
         self.users = UserRepository(session)
 
-    # Registration with uniqueness checks
+    # Registration: uniqueness is enforced by the database in the same INSERT
     async def register(self, *, login: str, email: str, pass_hash: str, is_admin: bool = False):
-        if await self.users.get_by_login(login):
-            raise ConflictError("login is already taken")
-        if await self.users.get_by_email(email):
-            raise ConflictError("email is already taken")
-        return await self.users.create(
-            login=login, email=email, pass_hash=pass_hash, is_admin=is_admin
-        )
+        try:
+            return await self.users.create(
+                login=login, email=email, pass_hash=pass_hash, is_admin=is_admin
+            )
+        except AlreadyExistsError as e:
+            raise ConflictError(f"{e.field} is already taken", field=e.field) from e
 
     async def get(self, user_id: uuid.UUID):
         user = await self.users.get_by_id(user_id)
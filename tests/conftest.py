@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
 
 
 def _ensure_backend_on_path() -> None:
@@ -13,3 +16,131 @@ def _ensure_backend_on_path() -> None:
 
 
 _ensure_backend_on_path()
+
+
+class FakeResult:
+    """Минимальная замена sqlalchemy Result для тестов без БД."""
+
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def scalars(self):
+        return self
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def one(self):
+        assert len(self._rows) == 1
+        return self._rows[0]
+
+    def scalar_one(self):
+        return self.one()
+
+    def scalar(self):
+        return self.first()
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class FakeStreamResult:
+    """Замена AsyncResult из session.stream: отдаёт строки пачками по yield_per."""
+
+    def __init__(self, rows, yield_per):
+        self._rows = list(rows)
+        self._yield_per = yield_per
+
+    def mappings(self):
+        return self
+
+    async def partitions(self):
+        for start in range(0, len(self._rows), self._yield_per):
+            yield self._rows[start : start + self._yield_per]
+
+
+class RecordingSession:
+    """
+    AsyncSession-заглушка: запоминает выполненные выражения и по очереди отдаёт
+    заранее заданные результаты. Позволяет считать запросы на операцию.
+    Результат может быть функцией от выражения — для строк, зависящих от параметров.
+    """
+
+    def __init__(self, *results):
+        self._results = [
+            r if isinstance(r, FakeResult) or callable(r) else FakeResult(r) for r in results
+        ]
+        self.statements = []
+        self.parameters = []
+        self.commits = 0
+        self.copies = []
+        self.info = {}
+
+    async def execute(self, statement, params=None, *args, **kwargs):
+        self.statements.append(statement)
+        self.parameters.append(params)
+        result = self._results.pop(0) if self._results else FakeResult()
+        return FakeResult(result(statement)) if callable(result) else result
+
+    async def stream(self, statement, params=None, *, execution_options=None, **kwargs):
+        rows = (await self.execute(statement, params)).all()
+        return FakeStreamResult(rows, (execution_options or {}).get("yield_per", len(rows) or 1))
+
+    async def scalars(self, statement, *args, **kwargs):
+        return (await self.execute(statement, *args, **kwargs)).scalars()
+
+    async def connection(self):
+        """Соединение с «сырым» asyncpg-драйвером: записывает вызовы COPY."""
+        session = self
+
+        class _Driver:
+            async def copy_records_to_table(self, table, *, records, columns):
+                session.copies.append((table, list(columns), list(records)))
+
+        class _Connection:
+            async def get_raw_connection(self):
+                return SimpleNamespace(driver_connection=_Driver())
+
+        return _Connection()
+
+    async def flush(self, *args, **kwargs):
+        return None
+
+    async def refresh(self, *args, **kwargs):
+        return None
+
+    async def commit(self):
+        from adapters.db.session_context import _run_after_commit
+
+        self.commits += 1
+        _run_after_commit(self)  # как событие after_commit у настоящей Session
+
+    async def rollback(self):
+        return None
+
+    async def close(self):
+        return None
+
+    def add(self, instance):
+        return None
+
+
+@pytest.fixture()
+def recording_session():
+    return RecordingSession
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Кэши процесса (principals, страницы задач, статистика) не переживают тест."""
+    from app.core.cache import caches
+
+    for cache in caches.values():
+        cache.clear()
+    yield
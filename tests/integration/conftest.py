@@ -0,0 +1,75 @@
+"""
+Интеграционные тесты на настоящем Postgres: триггеры, COPY, generated columns,
+ON CONFLICT, LISTEN/NOTIFY и CTE архивации, которые заглушка сессии не исполняет.
+
+Запускаются при DB_INTEGRATION=1. Подключение — из config.yaml (DB_HOST, DB_USER,
+DB_PASSWORD), база task-manager должна существовать. Схема накатывается миграциями
+alembic один раз на прогон, таблицы очищаются перед каждым тестом.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, TypeVar
+
+import pytest
+from sqlalchemy import text
+
+T = TypeVar("T")
+
+ENABLE_ENV = "DB_INTEGRATION"
+BACKEND = Path(__file__).resolve().parents[2] / "src" / "backend"
+TABLES = (
+    "users",
+    "tasks",
+    "tasks_archive",
+    "task_counters",
+    "task_list_versions",
+    "rate_limit_counters",
+)
+
+
+def _run(scenario: Callable[[], Awaitable[T]]) -> T:
+    """Сценарий в собственном event loop: engine создаётся и закрывается в нём же."""
+    from adapters.db.session_context import dispose_engine, init_engine
+
+    async def wrapper() -> T:
+        init_engine()
+        try:
+            return await scenario()
+        finally:
+            await dispose_engine()
+
+    return asyncio.run(wrapper())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    if os.environ.get(ENABLE_ENV) != "1":
+        pytest.skip(f"{ENABLE_ENV}=1 is not set: Postgres integration tests are disabled")
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_config = Config()  # без ini: env.py не перенастраивает логирование тестов
+    alembic_config.set_main_option("script_location", str(BACKEND / "adapters/db/migrations"))
+    # С нуля и обратно: заодно проверяются downgrade всех миграций
+    command.downgrade(alembic_config, "base")
+    command.upgrade(alembic_config, "head")
+
+
+@pytest.fixture(autouse=True)
+def _clean_tables(migrated_database):
+    from adapters.db.session_context import unit_of_work
+
+    async def truncate() -> None:
+        async with unit_of_work() as session:
+            await session.execute(text(f"TRUNCATE {', '.join(TABLES)}"))
+
+    _run(truncate)
+
+
+@pytest.fixture()
+def run():
+    return _run
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from adapters.db.session_context import unit_of_work
+from app.api.v1.deps import auth as auth_deps
+from app.main import app
+from fastapi.testclient import TestClient
+from services.user_service import UserService
+
+TASKS = "/api/v1/tasks/"
+
+
+@pytest.fixture()
+def client(run):
+    async def register():
+        async with unit_of_work() as session:
+            return await UserService(session).register(
+                login="neo", email="neo@example.com", pass_hash="h"
+            )
+
+    user = run(register)
+    principal = SimpleNamespace(id=user.id, is_admin=False)
+    app.dependency_overrides[auth_deps.get_current_user] = lambda: principal
+    try:
+        with TestClient(app) as test_client:  # lifespan: настоящий engine
+            yield test_client
+    finally:
+        app.dependency_overrides.pop(auth_deps.get_current_user, None)
+
+
+def _task(name: str, **fields) -> dict:
+    return {"name": name, "description": "d", "state": "todo", "priority": "low", **fields}
+
+
+def test_list_etag_revalidates_until_any_write(client):
+    created = client.post(TASKS, json=_task("First")).json()
+    etag = client.get(TASKS).headers["etag"]
+
+    assert client.get(TASKS, headers={"If-None-Match": etag}).status_code == 304
+
+    # правка не меняет ни числа задач, ни их статусов — ETag всё равно другой
+    client.patch(f"{TASKS}{created['id']}", json={"name": "Renamed"})
+    response = client.get(TASKS, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [task["name"] for task in response.json()] == ["Renamed"]
+
+
+def test_csv_export_reimports_to_the_same_tasks(client):
+    originals = [
+        _task("=HYPERLINK(1)", description='line 1\nline 2, "quoted"'),
+        _task("'apostrophe", priority="high", due_at="2026-01-01T00:00:00Z"),
+        _task("Plain", state="done"),
+    ]
+    client.post(f"{TASKS}batch", json={"items": originals})
+    exported = client.get(f"{TASKS}export", params={"format": "csv"}).text
+    assert "'=HYPERLINK(1)" in exported  # формула в редакторе не выполнится
+
+    response = client.post(f"{TASKS}import", params={"format": "csv"}, content=exported)
+
+    assert response.json() == {"imported": 3, "failed": 0, "errors": []}
+    fields = ("name", "description", "state", "priority", "due_at")
+    tasks = client.get(TASKS, params={"limit": 100}).json()
+    copies = sorted(tuple(task[f] for f in fields) for task in tasks)
+    assert copies[::2] == copies[1::2]  # каждая задача ровно в двух экземплярах
+    assert {row[0] for row in copies} == {task["name"] for task in originals}
+    assert int(client.get(TASKS).headers["x-total-count"]) == 6
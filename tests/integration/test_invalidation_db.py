@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+from adapters.db import invalidation
+from adapters.db.repositories.task_repo import TaskRepository
+from adapters.db.session_context import unit_of_work
+from app.core.metrics import registry
+from app.core.settings import config
+from domain.value_objects.task_priority import TaskPriority
+from domain.value_objects.task_state import TaskState
+from services.task_service import task_stats_cache
+from services.user_service import UserService
+
+
+@pytest.fixture()
+def as_other_worker(monkeypatch):
+    """Сообщения уходят от имени другого узла: слушатель этого процесса их применит."""
+    monkeypatch.setattr(invalidation, "enabled", True)
+    encode = invalidation.encode
+    monkeypatch.setattr(invalidation, "encode", lambda _node, items: encode("writer", items))
+
+
+async def _owner(login: str) -> uuid.UUID:
+    async with unit_of_work() as session:
+        user = await UserService(session).register(
+            login=login, email=f"{login}@example.com", pass_hash="h"
+        )
+    return user.id
+
+
+async def _write(session, owner_id: uuid.UUID) -> None:
+    # Репозиторий, а не сервис: локальный after_commit не должен сбросить кэш раньше шины
+    await TaskRepository(session).create(
+        owner_id=owner_id,
+        name="Task",
+        description="d",
+        state=TaskState.TODO,
+        priority=TaskPriority.LOW,
+    )
+
+
+async def _until_dropped(owner_id: uuid.UUID, timeout: float = 10.0) -> None:
+    async def poll() -> None:
+        while task_stats_cache.get(owner_id) is not None:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_listener_applies_committed_writes_only(run, as_other_worker):
+    messages = registry.counter("cache_bus_messages_total")
+
+    async def scenario():
+        committed, rolled_back = await _owner("neo"), await _owner("trinity")
+        listener = invalidation.start_listener(config.database, config.cache.bus)
+        try:
+            await asyncio.wait_for(listener.connected.wait(), timeout=10)
+            task_stats_cache.set(committed, [])
+            task_stats_cache.set(rolled_back, [])
+            before = messages.value
+
+            with pytest.raises(RuntimeError):
+                async with unit_of_work() as session:
+                    await _write(session, rolled_back)
+                    raise RuntimeError("rollback")
+            async with unit_of_work() as session:
+                await _write(session, committed)
+
+            await _until_dropped(committed)
+            return task_stats_cache.get(rolled_back), messages.value - before
+        finally:
+            await invalidation.stop_listener()
+
+    kept, applied = run(scenario)
+
+    # NOTIFY доставляются по порядку: откаченного сообщения не было
+    assert kept == [] and applied == 1
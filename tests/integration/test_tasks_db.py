@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+
+import pytest
+from adapters.db.repositories.base import ForbiddenError
+from adapters.db.session_context import get_async_session_manager, unit_of_work
+from domain.value_objects.task_priority import TaskPriority
+from domain.value_objects.task_state import TaskState
+from jobs.archive_done_tasks import archive_done_tasks
+from jobs.reconcile_task_counters import reconcile_task_counters
+from services.task_service import TaskService
+from services.user_service import UserService
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+DAY = dt.timedelta(days=1)
+NOW = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _item(name: str, **overrides) -> dict:
+    item = {
+        "name": name,
+        "description": "d",
+        "state": TaskState.TODO,
+        "priority": TaskPriority.MEDIUM,
+        "due_at": None,
+    }
+    item.update(overrides)
+    return item
+
+
+async def _owner(login: str = "neo") -> uuid.UUID:
+    async with unit_of_work() as session:
+        user = await UserService(session).register(
+            login=login, email=f"{login}@example.com", pass_hash="h"
+        )
+    return user.id
+
+
+async def _counts(owner_id: uuid.UUID) -> dict:
+    """Счётчики триггеров и фактическое число задач по статусам."""
+    async with get_async_session_manager() as session:
+        counters = await session.execute(
+            text("SELECT state, count FROM task_counters WHERE owner_id = :o AND count <> 0"),
+            {"o": owner_id},
+        )
+        actual = await session.execute(
+            text("SELECT state, count(*) FROM tasks WHERE owner_id = :o GROUP BY state"),
+            {"o": owner_id},
+        )
+        return {"counters": dict(counters.all()), "actual": dict(actual.all())}
+
+
+async def _version(owner_id: uuid.UUID) -> int:
+    async with get_async_session_manager() as session:
+        return await TaskService(session).list_version(owner_id=owner_id)
+
+
+def test_triggers_track_counters_and_list_version_on_every_write(run):
+    async def scenario():
+        owner_id = await _owner()
+        seen = [await _version(owner_id)]
+
+        async with unit_of_work() as session:
+            created = await TaskService(session).create_tasks(
+                owner_id=owner_id,
+                items=[_item("One"), _item("Two"), _item("Three", state=TaskState.DONE)],
+            )
+        seen.append(await _version(owner_id))
+        assert await _counts(owner_id) == {
+            "counters": {"todo": 2, "done": 1},
+            "actual": {"todo": 2, "done": 1},
+        }
+
+        # правка без смены числа задач и статуса — версия всё равно меняется
+        async with unit_of_work() as session:
+            await TaskService(session).update_task(created[0].id, owner_id=owner_id, name="Uno")
+        seen.append(await _version(owner_id))
+
+        async with unit_of_work() as session:
+            results = await TaskService(session).update_tasks(
+                owner_id=owner_id, items=[{"id": created[1].id, "state": TaskState.IN_PROGRES}]
+            )
+            assert results[created[1].id].state is TaskState.IN_PROGRES
+        seen.append(await _version(owner_id))
+
+        async with unit_of_work() as session:
+            await TaskService(session).delete_tasks(owner_id=owner_id, task_ids=[created[2].id])
+        seen.append(await _version(owner_id))
+        assert await _counts(owner_id) == {
+            "counters": {"todo": 1, "in_progress": 1},
+            "actual": {"todo": 1, "in_progress": 1},
+        }
+
+        # откат не оставляет следов ни в счётчиках, ни в версии
+        with pytest.raises(RuntimeError):
+            async with unit_of_work() as session:
+                await TaskService(session).delete_task(created[0].id, owner_id=owner_id)
+                raise RuntimeError("rollback")
+        assert await _version(owner_id) == seen[-1]
+        return seen
+
+    seen = run(scenario)
+
+    assert seen[0] == 0
+    assert seen == sorted(set(seen))  # каждый commit — новая, большая версия
+
+
+def test_commit_of_an_older_transaction_still_changes_the_version(run):
+    async def scenario():
+        owner_id = await _owner()
+        async with unit_of_work() as session:
+            first, second = await TaskService(session).create_tasks(
+                owner_id=owner_id, items=[_item("First"), _item("Second")]
+            )
+        async with get_async_session_manager() as older:
+            await older.execute(text("SELECT 1"))  # транзакция началась: now() зафиксирован
+            async with unit_of_work() as newer:
+                await TaskService(newer).update_task(second.id, owner_id=owner_id, name="B")
+            after_newer = await _version(owner_id)
+            await TaskService(older).update_task(first.id, owner_id=owner_id, name="A")
+            await older.commit()
+        async with get_async_session_manager() as session:
+            updated = dict(
+                (
+                    await session.execute(
+                        text("SELECT name, updated FROM tasks WHERE owner_id = :o"),
+                        {"o": owner_id},
+                    )
+                ).all()
+            )
+        return after_newer, await _version(owner_id), updated
+
+    after_newer, after_older, updated = run(scenario)
+
+    # max(updated) и число задач не изменились бы: updated — время начала транзакции
+    assert updated["A"] < updated["B"]
+    assert after_older > after_newer
+
+
+def test_copy_import_fills_server_columns_and_counters(run):
+    async def scenario():
+        owner_id = await _owner()
+        items = [
+            _item("Low", priority=TaskPriority.LOW),
+            _item("High", priority=TaskPriority.HIGH, due_at=NOW),
+        ]
+        async with unit_of_work() as session:
+            imported = await TaskService(session).import_tasks(owner_id=owner_id, items=items)
+        async with get_async_session_manager() as session:
+            rows = await session.execute(
+                text(
+                    "SELECT name, priority_rank, id IS NOT NULL, created IS NOT NULL, due_at "
+                    "FROM tasks WHERE owner_id = :o ORDER BY name"
+                ),
+                {"o": owner_id},
+            )
+            return imported, rows.all(), await _counts(owner_id), await _version(owner_id)
+
+    imported, rows, counts, version = run(scenario)
+
+    assert imported == 2
+    assert [tuple(row) for row in rows] == [
+        ("High", TaskPriority.HIGH.rank, True, True, NOW),
+        ("Low", TaskPriority.LOW.rank, True, True, None),
+    ]
+    assert counts == {"counters": {"todo": 2}, "actual": {"todo": 2}}
+    assert version == 1  # один оператор COPY — одно увеличение
+
+
+def test_generated_priority_rank_follows_updates(run):
+    async def scenario():
+        owner_id = await _owner()
+        async with unit_of_work() as session:
+            [task] = await TaskService(session).create_tasks(
+                owner_id=owner_id, items=[_item("Task", priority=TaskPriority.LOW)]
+            )
+        async with unit_of_work() as session:
+            await TaskService(session).update_task(
+                task.id, owner_id=owner_id, priority=TaskPriority.HIGH
+            )
+        async with get_async_session_manager() as session:
+            rank = await session.scalar(
+                text("SELECT priority_rank FROM tasks WHERE id = :id"), {"id": task.id}
+            )
+        return rank
+
+    assert run(scenario) == TaskPriority.HIGH.rank
+
+
+def _expected_order(tasks, order_by_due_first: bool) -> list:
+    """Порядок списка в Python: due_at NULLS LAST, priority_rank DESC, id DESC."""
+    by_rank_and_id = sorted(tasks, key=lambda t: (t.priority.rank, t.id.bytes), reverse=True)
+    if not order_by_due_first:
+        return [t.id for t in by_rank_and_id]
+    with_due = [t for t in by_rank_and_id if t.due_at is not None]
+    return [t.id for t in sorted(with_due, key=lambda t: t.due_at)] + [
+        t.id for t in by_rank_and_id if t.due_at is None
+    ]
+
+
+@pytest.mark.parametrize("order_by_due_first", [True, False])
+def test_keyset_pages_cover_every_task_once_in_order(run, order_by_due_first):
+    priorities = list(TaskPriority)
+    items = [
+        _item(
+            f"Task {i}",
+            priority=priorities[i % 3],
+            due_at=None if i % 4 == 0 else NOW + (i % 5) * DAY,
+        )
+        for i in range(23)
+    ]
+
+    async def scenario():
+        owner_id = await _owner()
+        other_id = await _owner("trinity")
+        async with unit_of_work() as session:
+            created = await TaskService(session).create_tasks(owner_id=owner_id, items=items)
+            await TaskService(session).create_tasks(owner_id=other_id, items=items[:3])
+        pages, cursor = [], None
+        while True:
+            async with get_async_session_manager() as session:
+                page = await TaskService(session).list_tasks(
+                    owner_id=owner_id,
+                    limit=5,
+                    cursor=cursor,
+                    order_by_due_first=order_by_due_first,
+                )
+            pages.append([task.id for task in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                return created, pages
+
+    created, pages = run(scenario)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert [task_id for page in pages for task_id in page] == _expected_order(
+        created, order_by_due_first
+    )
+
+
+def test_admin_default_pages_read_the_due_order_index(run):
+    priorities = list(TaskPriority)
+    items = [
+        _item(
+            f"Task {i}",
+            priority=priorities[i % 3],
+            due_at=None if i % 4 == 0 else NOW + (i % 97) * DAY,
+        )
+        for i in range(1500)
+    ]
+    sent = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM tasks" in statement:
+            sent.append((statement, parameters))
+
+    async def scenario():
+        for login in ("neo", "trinity", "morpheus", "tank"):
+            owner_id = await _owner(login)
+            async with unit_of_work() as session:
+                await TaskService(session).import_tasks(owner_id=owner_id, items=items)
+        async with unit_of_work() as session:
+            await session.execute(text("ANALYZE tasks"))
+
+        event.listen(Engine, "before_cursor_execute", capture)
+        try:
+            async with get_async_session_manager() as session:
+                first = await TaskService(session).admin_list_all(limit=50)
+                # курсор на непустом due_at — две ветки UNION ALL
+                await TaskService(session).admin_list_all(limit=50, cursor=first.next_cursor)
+        finally:
+            event.remove(Engine, "before_cursor_execute", capture)
+
+        plans = []
+        async with get_async_session_manager() as session:
+            connection = await session.connection()
+            for statement, parameters in sent:
+                rows = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plans.append("\n".join(row[0] for row in rows))
+        return plans
+
+    plans = run(scenario)
+
+    assert len(plans) == 2
+    for plan in plans:
+        # страница читается из индекса в нужном порядке: ни полного прохода, ни сортировки
+        assert "ix_tasks_due_at_priority_rank_id" in plan
+        assert "Seq Scan" not in plan and "Sort  (" not in plan
+    assert plans[1].count("ix_tasks_due_at_priority_rank_id") == 2
+
+
+def test_archive_moves_done_tasks_and_keeps_them_listable(run):
+    async def scenario():
+        owner_id = await _owner()
+        async with unit_of_work() as session:
+            await TaskService(session).create_tasks(
+                owner_id=owner_id,
+                items=[
+                    _item("Open"),
+                    *(_item(f"Done {i}", state=TaskState.DONE) for i in range(3)),
+                ],
+            )
+        before = await _version(owner_id)
+        # «через год»: все выполненные задачи старше порога; пачки по 2 — две транзакции
+        future = dt.datetime.now(dt.timezone.utc) + 400 * DAY
+        archived = await archive_done_tasks(batch_size=2, now=future)
+        async with get_async_session_manager() as session:
+            svc = TaskService(session)
+            hot = await svc.list_tasks(owner_id=owner_id)
+            everything = await svc.list_tasks(owner_id=owner_id, include_archived=True)
+            total = await svc.count(owner_id=owner_id, include_archived=True)
+            archive_rank = await session.scalar(
+                text("SELECT min(priority_rank) FROM tasks_archive WHERE owner_id = :o"),
+                {"o": owner_id},
+            )
+        return (
+            archived,
+            [t.name for t in hot.items],
+            len(everything.items),
+            total,
+            archive_rank,
+            await _counts(owner_id),
+            before < await _version(owner_id),
+        )
+
+    archived, hot, listed, total, archive_rank, counts, version_changed = run(scenario)
+
+    assert archived == 3
+    assert hot == ["Open"]
+    assert (listed, total) == (4, 4)
+    assert archive_rank == TaskPriority.MEDIUM.rank
+    assert counts == {"counters": {"todo": 1}, "actual": {"todo": 1}}
+    assert version_changed
+
+
+def test_reconcile_job_repairs_drifted_counters(run):
+    async def scenario():
+        owner_id = await _owner()
+        async with unit_of_work() as session:
+            await TaskService(session).create_tasks(
+                owner_id=owner_id, items=[_item("One"), _item("Two", state=TaskState.DONE)]
+            )
+            # расхождение, которое триггеры сами не создают: ручная правка счётчиков
+            await session.execute(
+                text("UPDATE task_counters SET count = 7 WHERE owner_id = :o"), {"o": owner_id}
+            )
+            await session.execute(
+                text("INSERT INTO task_counters (owner_id, state, count) VALUES (:o, 'todo', 1)"),
+                {"o": uuid.uuid4()},
+            )
+        fixed = await reconcile_task_counters()
+        return fixed, await _counts(owner_id)
+
+    fixed, counts = run(scenario)
+
+    assert fixed == 3  # два счётчика владельца и сирота
+    assert counts["counters"] == counts["actual"] == {"todo": 1, "done": 1}
+
+
+def test_owner_scope_is_enforced_by_the_statements(run):
+    async def scenario():
+        owner_id = await _owner()
+        other_id = await _owner("trinity")
+        async with unit_of_work() as session:
+            [task] = await TaskService(session).create_tasks(
+                owner_id=owner_id, items=[_item("Mine")]
+            )
+        with pytest.raises(ForbiddenError):
+            async with unit_of_work() as session:
+                await TaskService(session).update_task(task.id, owner_id=other_id, name="Stolen")
+        async with get_async_session_manager() as session:
+            return (await TaskService(session).get_task(task.id, owner_id=owner_id)).name
+
+    assert run(scenario) == "Mine"
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from adapters.db.rate_limit_store import PostgresRateLimitStore
+from adapters.db.session_context import get_async_session_manager, unit_of_work
+from services.errors import ConflictError
+from services.user_service import UserService
+from sqlalchemy import text
+
+
+async def _register(login: str, email: str):
+    async with unit_of_work() as session:
+        return await UserService(session).register(login=login, email=email, pass_hash="h")
+
+
+async def _scalar(sql: str, **params):
+    async with get_async_session_manager() as session:
+        return await session.scalar(text(sql), params)
+
+
+@pytest.mark.parametrize(
+    "login, email, field",
+    [("neo", "other@example.com", "login"), ("other", "neo@example.com", "email")],
+)
+def test_register_conflict_reports_field_and_keeps_transaction_usable(run, login, email, field):
+    async def scenario():
+        await _register("neo", "neo@example.com")
+        async with unit_of_work() as session:
+            svc = UserService(session)
+            with pytest.raises(ConflictError) as exc:
+                await svc.register(login=login, email=email, pass_hash="h")
+            # ON CONFLICT DO NOTHING не ломает транзакцию: она продолжается и коммитится
+            await svc.register(login="morpheus", email="morpheus@example.com", pass_hash="h")
+        return exc.value.field, await _scalar("SELECT count(*) FROM users")
+
+    assert run(scenario) == (field, 2)
+
+
+def test_concurrent_registrations_of_one_login_create_one_user(run):
+    async def scenario():
+        results = await asyncio.gather(
+            *(_register("neo", f"neo{i}@example.com") for i in range(5)),
+            return_exceptions=True,
+        )
+        return results, await _scalar("SELECT count(*) FROM users")
+
+    results, users = run(scenario)
+
+    assert users == 1
+    assert sum(isinstance(result, ConflictError) for result in results) == 4
+
+
+def test_postgres_rate_limit_store_counts_windows_and_purges_old_rows(run):
+    now = [1000.0]
+    store = PostgresRateLimitStore(
+        retention_seconds=60, purge_interval_seconds=0, clock=lambda: now[0]
+    )
+
+    async def scenario():
+        decisions = [await store.hit("ip:a", limit=2, window_seconds=60) for _ in range(3)]
+        await store.hit("ip:b", limit=2, window_seconds=60)
+        now[0] += 200  # окна обоих ключей закончились
+        fresh = await store.hit("ip:a", limit=2, window_seconds=60)
+        keys = await _scalar("SELECT string_agg(key, ',') FROM rate_limit_counters")
+        return [d.allowed for d in decisions], fresh, keys
+
+    allowed, fresh, keys = run(scenario)
+
+    assert allowed == [True, True, False]
+    assert fresh.allowed  # новое окно — счётчик сброшен тем же upsert
+    assert keys == "ip:a"  # строка ip:b удалена очисткой
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from adapters.db.repositories.user_repo import UserRepository
+from app.api.v1.deps import auth as auth_deps
+from app.core.cache import Generations, TTLCache
+from app.core.metrics import registry
+from app.core.principals import principal_cache
+from app.core.security import create_access_token
+from domain.entities.principal import Principal
+from fastapi import HTTPException
+from services.user_service import UserService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache("test_lru", max_size=2, ttl_seconds=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    clock.now += 5
+    cache.set("short", 4, ttl=1)
+    clock.now += 2
+    assert cache.get("short") is None
+    clock.now += 4
+    assert cache.get("a") is None
+
+
+@pytest.fixture()
+def user_lookups(monkeypatch):
+    user = SimpleNamespace(id=uuid.uuid4(), login="bob", email="bob@example.com", is_admin=False)
+    calls: list[uuid.UUID] = []
+
+    async def _get_by_id(self, user_id):
+        calls.append(user_id)
+        return user if user_id == user.id else None
+
+    monkeypatch.setattr(UserRepository, "get_by_id", _get_by_id)
+    principal_cache.clear()
+    yield user, calls
+    principal_cache.clear()
+
+
+def test_get_current_user_caches_principal(user_lookups):
+    user, calls = user_lookups
+    token = create_access_token(sub=user.id)
+
+    first = asyncio.run(auth_deps.get_current_user(token, session=None))
+    second = asyncio.run(auth_deps.get_current_user(token, session=None))
+
+    assert first == second == Principal(id=user.id, login="bob", is_admin=False)
+    assert calls == [user.id]
+
+
+def test_user_writes_invalidate_principal(user_lookups, recording_session):
+    user, calls = user_lookups
+    token = create_access_token(sub=user.id)
+    asyncio.run(auth_deps.get_current_user(token, session=None))
+    assert principal_cache.get(user.id) is not None
+
+    session = recording_session()
+
+    asyncio.run(UserService(session).set_admin(user.id, True))
+    assert principal_cache.get(user.id) is not None  # до commit unit of work кэш не трогаем
+    asyncio.run(session.commit())
+    assert principal_cache.get(user.id) is None
+
+
+@pytest.mark.parametrize(
+    "write",
+    [lambda repo, uid: repo.set_admin(uid, True), lambda repo, uid: repo.set_password(uid, "h")],
+)
+def test_user_repository_writes_invalidate_principal_after_commit(
+    user_lookups, recording_session, write
+):
+    user, _ = user_lookups
+    principal_cache.set(user.id, Principal(id=user.id, login="bob", is_admin=False))
+    session = recording_session()
+
+    asyncio.run(write(UserRepository(session), user.id))  # без UserService
+    assert principal_cache.get(user.id) is not None
+    asyncio.run(session.commit())
+
+    assert principal_cache.get(user.id) is None
+
+
+def test_get_current_user_does_not_cache_principal_read_before_invalidation(
+    user_lookups, recording_session, monkeypatch
+):
+    user, _ = user_lookups
+    token = create_access_token(sub=user.id)
+    read = UserRepository.get_by_id
+
+    async def _read_then_demote(self, user_id):
+        stale = SimpleNamespace(**vars(await read(self, user_id)))
+        # права меняются и коммитятся, пока запрос ещё держит прочитанную строку
+        monkeypatch.setattr(UserRepository, "get_by_id", read)
+        session = recording_session()
+        await UserRepository(session).set_admin(user_id, True)
+        await session.commit()
+        return stale
+
+    monkeypatch.setattr(UserRepository, "get_by_id", _read_then_demote)
+    principal = asyncio.run(auth_deps.get_current_user(token, session=None))
+
+    assert principal.is_admin is False  # ответ этого запроса — из прочитанной строки
+    assert principal_cache.get(user.id) is None  # но в кэш она не попала
+
+
+def test_get_current_user_rejects_unknown_user(user_lookups):
+    token = create_access_token(sub=uuid.uuid4())
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth_deps.get_current_user(token, session=None))
+    assert exc.value.status_code == 401
+
+
+def test_decode_token_cache_is_bounded_by_token_exp(monkeypatch):
+    from app.core import security
+
+    clock = FakeClock()
+    monkeypatch.setattr(security.token_cache, "_clock", clock)
+    security.token_cache.clear()
+    sub = uuid.uuid4()
+    token = create_access_token(sub=sub, expires_minutes=1)
+
+    decode_calls: list[str] = []
+    real_decode = security.jwt.decode
+
+    def _counting_decode(*args, **kwargs):
+        decode_calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", _counting_decode)
+
+    assert security.decode_token(token) == sub
+    assert security.decode_token(token) == sub
+    assert len(decode_calls) == 1
+
+    # Дальше exp токена запись жить не может, даже если общий TTL кэша больше:
+    # после него подпись и срок снова проверяет jose
+    clock.now += 61
+    assert security.token_cache.get(hashlib.sha256(token.encode()).digest()) is None
+    security.decode_token(token)
+    assert len(decode_calls) == 2
+
+
+def test_decode_token_cache_can_be_disabled(monkeypatch):
+    from app.core import security
+
+    monkeypatch.setattr(security.token_cache, "enabled", False)
+    token = create_access_token(sub=uuid.uuid4())
+    security.decode_token(token)
+    assert security.token_cache.get(hashlib.sha256(token.encode()).digest()) is None
+
+
+def test_cache_bounded_by_bytes_evicts_lru():
+    cache = TTLCache("test_bytes", max_size=10, ttl_seconds=60, weigh=len, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"123")  # 12 байт > 10: вытесняется давно не читанная b
+
+    assert cache.get("b") is None and cache.get("a") == b"12345"
+    assert registry.gauge("cache_test_bytes_bytes").value == 8
+    assert registry.gauge("cache_test_bytes_hit_ratio").value == pytest.approx(2 / 3)
+
+
+def test_generations_never_return_to_a_stale_number():
+    generations: Generations[str] = Generations(max_size=1)
+    initial = generations.get("a")
+    generations.bump("a")
+    bumped = generations.get("a")
+    generations.bump("b")  # вытесняет a
+
+    assert len({initial, bumped, generations.get("a")}) == 3
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from adapters.db import session_context
+from app.core.metrics import registry as metrics_registry
+from app.core.settings import DatabaseConfig, DatabasePool, ReplicaConfig
+from app.main import app
+from fastapi.testclient import TestClient
+
+
+def _database(replica=None, **pool) -> DatabaseConfig:
+    return DatabaseConfig(
+        host="db",
+        port=5432,
+        user="u",
+        password="p",
+        name="tasks",
+        driver="asyncpg",
+        database_system="postgresql",
+        pool=DatabasePool(**pool),
+        replica=replica,
+    )
+
+
+def test_init_engine_applies_pool_settings():
+    database = _database(size=7, max_overflow=3, timeout_seconds=2, prepared_statement_cache_size=0)
+    engine = session_context.init_engine(database)
+    try:
+        pool = engine.sync_engine.pool
+        assert isinstance(pool, session_context.InstrumentedPool)
+        assert pool.size() == 7
+        assert pool._max_overflow == 3
+        assert pool._timeout == 2
+        assert engine.url.query["prepared_statement_cache_size"] == "0"
+    finally:
+        asyncio.run(session_context.dispose_engine())
+    assert session_context.sessionmaker is None
+
+
+def test_replica_engine_shares_pool_settings():
+    engine = session_context.init_engine(_database(ReplicaConfig(host="replica"), size=3))
+    try:
+        assert session_context.replica is not None
+        replica_engine = session_context.replica.engine
+        assert replica_engine.url.host == "replica"
+        assert replica_engine.sync_engine.pool.size() == 3
+        assert engine.url.host == "db"
+    finally:
+        asyncio.run(session_context.dispose_engine())
+    assert session_context.replica is None
+
+
+def test_engine_lives_within_app_lifespan():
+    with TestClient(app):
+        assert session_context.engine is not None
+        metrics = metrics_registry.snapshot()
+    assert session_context.engine is None
+    assert "db_pool_in_use" in metrics
+    assert "db_pool_checkout_wait_seconds" in metrics
+
+
+def test_session_requires_initialized_engine():
+    async def _open():
+        async with session_context.get_async_session_manager():
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_open())
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from adapters.db import invalidation, session_context
+from adapters.db.repositories.base import ForbiddenError, NotFoundError
+from adapters.db.repositories.task_counter_repo import TaskCounterRepository
+from adapters.db.repositories.task_repo import TaskRepository
+from adapters.db.repositories.user_repo import UserRepository
+from adapters.db.routing import ReplicaRouter
+from app.core.metrics import registry
+from app.core.principals import principal_cache
+from domain.entities.principal import Principal
+from domain.value_objects.task_state import TaskState
+from services.task_service import task_list_generations, task_stats_cache
+from services.user_service import UserService  # noqa: F401 — регистрирует обработчик USERS
+from sqlalchemy.dialects import postgresql
+
+
+@pytest.fixture()
+def bus_enabled(monkeypatch):
+    monkeypatch.setattr(invalidation, "enabled", True)
+
+
+def _notified(session) -> list[str]:
+    """Запускает before_commit на заглушке sync-сессии и возвращает payload'ы NOTIFY."""
+    executed: list = []
+    invalidation._notify_before_commit(SimpleNamespace(info=session.info, execute=executed.append))
+    payloads = []
+    for statement in executed:
+        compiled = statement.compile(dialect=postgresql.dialect())
+        assert "pg_notify" in str(compiled)
+        channel, payload = compiled.params.values()
+        assert channel == invalidation.CHANNEL
+        payloads.append(payload)
+    return payloads
+
+
+def test_writes_send_one_notify_per_transaction(bus_enabled, recording_session):
+    owner_id, user_id = uuid.uuid4(), uuid.uuid4()
+    user = SimpleNamespace(id=user_id, is_admin=False)
+    session = recording_session([uuid.uuid4()], [uuid.uuid4()], [user])
+    repo = TaskRepository(session)
+
+    asyncio.run(repo.delete(uuid.uuid4(), owner_id=owner_id))
+    asyncio.run(repo.delete(uuid.uuid4(), owner_id=owner_id))
+    asyncio.run(UserRepository(session).set_admin(user_id, True))
+
+    assert _notified(session) == [
+        "|".join((invalidation.NODE_ID, ",".join(sorted([f"task:{owner_id}", f"user:{user_id}"]))))
+    ]
+    assert _notified(session) == []  # отправленное не повторяется в следующей транзакции
+
+
+def test_nothing_is_published_when_bus_disabled(recording_session):
+    session = recording_session([uuid.uuid4()])
+
+    asyncio.run(TaskRepository(session).delete(uuid.uuid4(), owner_id=uuid.uuid4()))
+
+    assert _notified(session) == []
+
+
+def test_missed_update_or_delete_publishes_nothing(bus_enabled, recording_session):
+    # строка не вернулась, затем проверка существования: задача чужая (403) или её нет (404)
+    session = recording_session([], [uuid.uuid4()], [], [])
+    repo = TaskRepository(session)
+
+    with pytest.raises(ForbiddenError):
+        asyncio.run(repo.update(uuid.uuid4(), owner_id=uuid.uuid4(), name="x"))
+    with pytest.raises(NotFoundError):
+        asyncio.run(repo.delete(uuid.uuid4(), owner_id=uuid.uuid4()))
+
+    assert _notified(session) == []
+
+
+def test_rollback_drops_pending_messages(bus_enabled, recording_session):
+    session = recording_session([uuid.uuid4()])
+    asyncio.run(TaskRepository(session).delete(uuid.uuid4(), owner_id=uuid.uuid4()))
+
+    invalidation._drop_pending(session, None)
+
+    assert _notified(session) == []
+
+
+def test_archive_publishes_every_affected_owner(bus_enabled, recording_session):
+    owners = [uuid.uuid4(), uuid.uuid4()]
+    session = recording_session([owners[0], owners[1], owners[0]])
+    cutoff = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+
+    moved = asyncio.run(TaskRepository(session).archive_done(updated_before=cutoff, limit=10))
+
+    assert moved == 3
+    [payload] = _notified(session)
+    assert payload.split("|")[1].split(",") == sorted(f"task:{owner}" for owner in owners)
+
+
+def test_reconcile_publishes_only_fixed_owners(bus_enabled, recording_session):
+    drifted, stale, exact = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    stored = [
+        SimpleNamespace(owner_id=drifted, state=TaskState.TODO, count=5),
+        SimpleNamespace(owner_id=stale, state=TaskState.DONE, count=1),
+        SimpleNamespace(owner_id=exact, state=TaskState.TODO, count=2),
+    ]
+    actual = [(drifted, TaskState.TODO, 3), (exact, TaskState.TODO, 2)]
+    session = recording_session(stored, actual)
+
+    asyncio.run(TaskCounterRepository(session).reconcile([drifted, stale, exact]))
+
+    [payload] = _notified(session)
+    assert payload.split("|")[1].split(",") == sorted(f"task:{o}" for o in (drifted, stale))
+
+
+def test_oversized_payload_becomes_flush_all():
+    items = {f"task:{uuid.uuid4()}" for _ in range(300)}
+
+    assert invalidation.encode("node", items) == f"node|{invalidation.FLUSH_ALL}"
+
+
+def test_foreign_message_invalidates_caches():
+    owner_id, user_id = uuid.uuid4(), uuid.uuid4()
+    task_stats_cache.set(owner_id, [])
+    principal_cache.set(user_id, Principal(id=user_id, login="bob", is_admin=False))
+    generation = task_list_generations.get(owner_id)
+
+    invalidation.apply(f"{invalidation.NODE_ID}|task:{owner_id},user:{user_id}")
+    assert task_stats_cache.get(owner_id) == []  # свои сообщения уже применены after_commit
+
+    invalidation.apply(f"other-node|task:{owner_id},user:{user_id}")
+
+    assert task_stats_cache.get(owner_id) is None
+    assert principal_cache.get(user_id) is None
+    assert task_list_generations.get(owner_id) != generation
+
+
+def test_foreign_message_pins_reads_to_primary(monkeypatch):
+    owner_id, user_id, idle_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    replica_engine = object()
+    router = ReplicaRouter(
+        replica_engine,
+        read_your_writes_seconds=5,
+        unhealthy_cooldown_seconds=30,
+        max_pinned_owners=100,
+    )
+    monkeypatch.setattr(session_context, "replica", router)
+
+    invalidation.apply(f"other-node|task:{owner_id},user:{user_id}")
+
+    # промах кэша после сообщения читает primary: реплика могла не догнать запись
+    assert router.engine_for_read(owner_id) is None
+    assert router.engine_for_read(user_id) is None
+    assert router.engine_for_read(idle_id) is replica_engine
+
+    invalidation.apply("other-node|*")  # полный сброс кэшей данных пины не снимает
+    assert router.engine_for_read(owner_id) is None
+
+
+@pytest.mark.parametrize("payload", ["other|*", "other|unknown:1", "other|task:not-a-uuid"])
+def test_unknown_or_broken_message_flushes_everything(payload):
+    owner_id = uuid.uuid4()
+    task_stats_cache.set(owner_id, [])
+    task_list_generations.bump(owner_id)
+    generation = task_list_generations.get(owner_id)
+    flushes = registry.counter("cache_bus_flushes_total").value
+
+    invalidation.apply(payload)
+
+    assert task_stats_cache.get(owner_id) is None
+    assert task_list_generations.get(owner_id) != generation
+    assert registry.counter("cache_bus_flushes_total").value == flushes + 1
+
+
+class FakeListenConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = None
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def execute(self, query):
+        return "SELECT 1"
+
+    def is_closed(self):
+        return self.closed
+
+    def terminate(self):
+        self.closed = True
+
+    def drop(self):
+        self.closed = True
+        self.on_terminate(self)
+
+
+def test_listener_reconnects_and_flushes_after_gap():
+    owner_id = uuid.uuid4()
+    connections: list[FakeListenConnection] = []
+
+    async def connect():
+        if not connections:
+            connections.append(None)  # первая попытка: БД недоступна
+            raise OSError("connection refused")
+        connections.append(FakeListenConnection())
+        return connections[-1]
+
+    async def scenario():
+        listener = invalidation.InvalidationListener(
+            connect, reconnect_delay_seconds=0.001, keepalive_seconds=0.01
+        )
+        listener.start()
+        await asyncio.wait_for(listener.connected.wait(), timeout=1)
+        first = connections[-1]
+
+        task_stats_cache.set(owner_id, [])
+        first.listeners[invalidation.CHANNEL](first, 1, invalidation.CHANNEL, f"x|task:{owner_id}")
+        assert task_stats_cache.get(owner_id) is None
+
+        await asyncio.sleep(0.03)  # keepalive-проверки проходят, соединение то же
+        assert connections[-1] is first
+
+        task_stats_cache.set(owner_id, [])
+        first.drop()  # разрыв: сообщения за это время потеряны
+        while len(connections) < 3 or not listener.connected.is_set():
+            await asyncio.sleep(0.001)
+        await listener.stop()
+        return first
+
+    first = asyncio.run(scenario())
+
+    assert first.closed and connections[-1].closed
+    assert task_stats_cache.get(owner_id) is None  # сброшено после переподключения
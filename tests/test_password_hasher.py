@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from adapters.db.repositories.user_repo import UserRepository
+from app.core.metrics import registry as metrics_registry
+from app.core.security import (
+    PasswordHasher,
+    calibrate_bcrypt_rounds,
+    hash_password,
+    password_hasher,
+)
+from app.main import app
+from fastapi.testclient import TestClient
+
+
+def test_password_hasher_roundtrip_in_process_pool():
+    hasher = PasswordHasher(workers=1, max_pending=4, retry_after_seconds=1)
+
+    async def _roundtrip():
+        pass_hash = await hasher.hash("correct horse")
+        return (
+            await hasher.verify("correct horse", pass_hash),
+            await hasher.verify("wrong horse", pass_hash),
+        )
+
+    try:
+        ok, bad = asyncio.run(_roundtrip())
+    finally:
+        hasher.shutdown()
+    assert ok is True
+    assert bad is False
+    assert hasher.pending == 0
+
+
+def test_register_returns_503_when_hasher_saturated(monkeypatch):
+    monkeypatch.setattr(password_hasher, "_pending", password_hasher.max_pending)
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"login": "alice", "email": "alice@example.com", "password": "password123"},
+        )
+        metrics = metrics_registry.snapshot()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(password_hasher.retry_after_seconds)
+    body = response.json()
+    assert body["title"] == "Service Unavailable"
+    assert body["errors"]["code"] == "auth.hasher_saturated"
+    assert metrics["password_hasher_rejected_total"]["value"] >= 1
+    assert "password_hasher_queue_depth" in metrics
+
+
+def test_calibration_doubles_cost_per_round_within_bounds():
+    def _measure(rounds):
+        assert rounds == 10
+        return 0.030  # 30 ms на 10 раундах
+
+    assert (
+        calibrate_bcrypt_rounds(target_ms=250, min_rounds=10, max_rounds=14, measure=_measure) == 13
+    )
+    assert (
+        calibrate_bcrypt_rounds(target_ms=250, min_rounds=10, max_rounds=12, measure=_measure) == 12
+    )
+    # медленный CPU не опускает cost ниже security floor
+    assert (
+        calibrate_bcrypt_rounds(target_ms=10, min_rounds=10, max_rounds=14, measure=_measure) == 10
+    )
+
+
+def test_login_rehashes_stale_hash(monkeypatch):
+    stale_hash = hash_password("password123", 4)
+    user = SimpleNamespace(id=uuid.uuid4(), login="carol", pass_hash=stale_hash)
+    saved: list[tuple] = []
+
+    async def _get_by_login(self, login):
+        return user if login == "carol" else None
+
+    async def _set_password(self, user_id, new_pass_hash):
+        saved.append((user_id, new_pass_hash))
+        return user
+
+    monkeypatch.setattr(UserRepository, "get_by_login", _get_by_login)
+    monkeypatch.setattr(UserRepository, "set_password", _set_password)
+    monkeypatch.setattr(password_hasher, "rounds", None)
+    monkeypatch.setattr(password_hasher, "_policy", password_hasher._policy.copy())
+    password_hasher.set_rounds(5)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/auth/token", data={"username": "carol", "password": "password123"}
+        )
+        again = client.post("/api/v1/auth/token", data={"username": "carol", "password": "nope"})
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert again.status_code == 401
+    assert len(saved) == 1
+    user_id, new_hash = saved[0]
+    assert user_id == user.id
+    assert new_hash.startswith("$2b$05$")
+    assert not password_hasher.needs_rehash(new_hash)
+
+
+def test_only_weaker_hashes_need_rehash(monkeypatch):
+    monkeypatch.setattr(password_hasher, "rounds", None)
+    monkeypatch.setattr(password_hasher, "_policy", password_hasher._policy.copy())
+    password_hasher.set_rounds(5)
+
+    assert password_hasher.needs_rehash(hash_password("password123", 4))
+    assert not password_hasher.needs_rehash(hash_password("password123", 5))
+    # хэш воркера с более высоким cost не понижается обратно
+    assert not password_hasher.needs_rehash(hash_password("password123", 6))
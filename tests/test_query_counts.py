@@ -0,0 +1,619 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import io
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from adapters.db import session_context
+from adapters.db.repositories.task_statements import LIST_VERSION, PageShape, page_statement
+from app.api.v1.deps import auth as auth_deps
+from app.api.v1.routers.tasks import task_list_cache
+from app.api.v1.schemas import MAX_BATCH_SIZE
+from app.core.metrics import registry as metrics_registry
+from app.main import app
+from domain.value_objects.task_priority import TaskPriority
+from domain.value_objects.task_state import TaskState
+from fastapi.testclient import TestClient
+from services.task_service import task_stats_cache
+from sqlalchemy.dialects import postgresql
+
+OWNER_ID = uuid.uuid4()
+
+
+def _row(**overrides):
+    row = {
+        "id": uuid.uuid4(),
+        "name": "Task",
+        "description": "Desc",
+        "state": "todo",
+        "priority": "high",
+        "owner_id": OWNER_ID,
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture()
+def db(recording_session):
+    """
+    TestClient поверх настоящих unit of work, TaskService и TaskRepository;
+    sessionmaker подменён на сессию-счётчик.
+    """
+    holder = SimpleNamespace(session=None)
+    user = SimpleNamespace(id=OWNER_ID, is_admin=True)
+
+    def _use(*results):
+        holder.session = recording_session(*results)
+        return holder.session
+
+    app.dependency_overrides[auth_deps.get_current_user] = lambda: user
+    app.dependency_overrides[auth_deps.admin_required] = lambda: user
+    try:
+        with TestClient(app) as client:
+            # после init_engine в lifespan; dispose_engine на выходе сбросит подмену
+            session_context.sessionmaker = lambda: holder.session
+            yield client, _use
+    finally:
+        app.dependency_overrides.pop(auth_deps.get_current_user, None)
+        app.dependency_overrides.pop(auth_deps.admin_required, None)
+
+
+# Результат запроса версии списка (ETag), который GET /tasks выполняет первым
+VERSION = [0]
+
+
+def _sql(session, index=0) -> str:
+    return str(session.statements[index].compile(dialect=postgresql.dialect()))
+
+
+def test_list_tasks_is_version_plus_projected_query_plus_counter_lookup(db):
+    client, use = db
+    session = use(VERSION, [_row(), _row()], [7])
+
+    response = client.get("/api/v1/tasks/", params={"status": "todo"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["x-total-count"] == "7"
+    assert len(session.statements) == 3
+    sql = _sql(session, 1)
+    assert "users" not in sql
+    assert sql.startswith("SELECT tasks.id, tasks.name, tasks.description")
+    count_sql = _sql(session, 2)
+    assert "FROM task_counters" in count_sql and "tasks" not in count_sql.replace(
+        "task_counters", ""
+    )
+
+
+def test_total_with_due_filter_falls_back_to_count(db):
+    client, use = db
+    session = use(VERSION, [], [3])
+
+    response = client.get("/api/v1/tasks/", params={"due<": "2026-01-01T00:00:00Z"})
+
+    assert response.headers["x-total-count"] == "3"
+    count_sql = _sql(session, 2)
+    assert count_sql.startswith("SELECT count(*) AS count_1 \nFROM tasks")
+    assert "tasks.due_at < " in count_sql
+
+
+def test_get_task_is_one_projected_query(db):
+    client, use = db
+    row = _row()
+    session = use([row])
+
+    response = client.get(f"/api/v1/tasks/{row['id']}")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == str(row["id"])
+    assert len(session.statements) == 1
+    assert "users" not in _sql(session)
+
+
+def test_get_foreign_task_probes_only_on_miss(db):
+    client, use = db
+    session = use([], [uuid.uuid4()])
+
+    response = client.get(f"/api/v1/tasks/{uuid.uuid4()}")
+
+    assert response.status_code == 403
+    assert len(session.statements) == 2
+
+
+def test_admin_list_is_one_projected_query(db):
+    client, use = db
+    session = use([_row(owner_id=uuid.uuid4())])
+
+    response = client.get("/api/v1/admin/tasks/")
+
+    assert response.status_code == 200
+    assert len(session.statements) == 1
+    assert "users" not in _sql(session)
+
+
+def test_patch_task_is_one_update_returning(db):
+    client, use = db
+    row = _row(name="Renamed")
+    session = use([row])
+
+    response = client.patch(f"/api/v1/tasks/{row['id']}", json={"name": "Renamed"})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    assert len(session.statements) == 1
+    sql = _sql(session)
+    assert sql.startswith("UPDATE tasks SET")
+    assert "tasks.owner_id = " in sql and "RETURNING tasks.id" in sql
+    assert session.commits == 1  # один commit unit of work в конце запроса
+
+
+def test_delete_task_is_one_delete_returning(db):
+    client, use = db
+    task_id = uuid.uuid4()
+    session = use([task_id])
+
+    response = client.delete(f"/api/v1/tasks/{task_id}")
+
+    assert response.status_code == 204
+    assert len(session.statements) == 1
+    assert _sql(session).startswith("DELETE FROM tasks WHERE")
+
+
+@pytest.mark.parametrize("probe, status", [([uuid.uuid4()], 403), ([], 404)])
+def test_delete_probes_403_vs_404_only_on_miss(db, probe, status):
+    client, use = db
+    session = use([], probe)
+
+    response = client.delete(f"/api/v1/tasks/{uuid.uuid4()}")
+
+    assert response.status_code == status
+    assert len(session.statements) == 2
+    assert session.commits == 0  # ошибка запроса — rollback вместо commit
+    assert _sql(session, 1).startswith("SELECT tasks.id")
+
+
+def _inserted_rows(statement):
+    """RETURNING для INSERT: строки с теми id, что сгенерировал репозиторий."""
+    params = statement.compile(dialect=postgresql.dialect()).params
+    return [
+        _row(id=value, name=params[key.replace("id_", "name_")])
+        for key, value in params.items()
+        if key.startswith("id_m")
+    ]
+
+
+def test_batch_create_is_one_multirow_insert(db):
+    client, use = db
+    session = use(_inserted_rows)
+    items = [
+        {"name": "First", "description": "d", "state": "todo", "priority": "low"},
+        {"name": "x", "description": "d", "state": "todo", "priority": "low"},
+        {"name": "Third", "description": "d", "state": "done", "priority": "high"},
+        # длиннее столбца tasks.name varchar(63): ошибка элемента, а не 500 всего пакета
+        {"name": "n" * 64, "description": "d", "state": "todo", "priority": "low"},
+    ]
+
+    response = client.post("/api/v1/tasks/batch", json={"items": items})
+
+    assert response.status_code == 207
+    results = response.json()["items"]
+    assert [r["status"] for r in results] == [201, 400, 201, 400]
+    assert [results[0]["task"]["name"], results[2]["task"]["name"]] == ["First", "Third"]
+    assert results[1]["problem"]["type"] == "https://example.com/problems/validation-error"
+    assert len(session.statements) == 1
+    assert _sql(session).startswith("INSERT INTO tasks")
+    assert session.commits == 1
+
+
+def test_batch_patch_is_one_update_from_values_plus_one_probe(db):
+    client, use = db
+    own, foreign, missing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    session = use([_row(id=own, name="Renamed")], [foreign])
+    items = [
+        {"id": str(own), "name": "Renamed"},
+        {"id": str(foreign), "state": "done"},
+        {"id": str(missing), "priority": "low"},
+        {"id": str(own), "name": "Again"},
+        {"id": str(uuid.uuid4()), "description": "d" * 256},
+    ]
+
+    response = client.patch("/api/v1/tasks/batch", json={"items": items})
+
+    assert response.status_code == 207
+    results = response.json()["items"]
+    assert [r["status"] for r in results] == [200, 403, 404, 409, 400]
+    assert results[0]["task"]["name"] == "Renamed"
+    assert results[1]["problem"]["errors"]["code"] == "tasks.forbidden"
+    assert results[3]["problem"]["errors"]["field"] == "id"
+    assert len(session.statements) == 2
+    sql = _sql(session)
+    assert sql.startswith("UPDATE tasks SET name=coalesce(")
+    assert "FROM (VALUES" in sql and "tasks.owner_id = " in sql
+
+
+def test_batch_delete_is_one_delete_plus_one_probe(db):
+    client, use = db
+    own, foreign, missing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    session = use([own], [foreign])
+
+    response = client.request(
+        "DELETE",
+        "/api/v1/tasks/batch",
+        json={"ids": [str(own), str(foreign), str(missing)]},
+    )
+
+    assert response.status_code == 207
+    assert [r["status"] for r in response.json()["items"]] == [204, 403, 404]
+    assert len(session.statements) == 2
+    assert _sql(session).startswith("DELETE FROM tasks WHERE tasks.id IN")
+
+
+@pytest.mark.parametrize("size", [0, MAX_BATCH_SIZE + 1])
+def test_batch_size_is_bounded(db, size):
+    client, use = db
+    session = use()
+
+    ids = [str(uuid.uuid4()) for _ in range(size)]
+    response = client.request("DELETE", "/api/v1/tasks/batch", json={"ids": ids})
+
+    assert response.status_code == 400
+    assert session.statements == []
+
+
+def test_search_is_one_ranked_owner_scoped_query(db):
+    client, use = db
+    session = use(VERSION, [_row(name="Buy milk")])
+
+    response = client.get("/api/v1/tasks/", params={"q": "milk 50%", "status": "todo"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Buy milk"
+    assert "x-total-count" not in response.headers
+    assert len(session.statements) == 2
+    sql = _sql(session, 1)
+    assert "tasks.owner_id = " in sql
+    assert "tasks.search_vector @@ websearch_to_tsquery('simple'::regconfig" in sql
+    assert "ILIKE" in sql and "ORDER BY ts_rank(" in sql
+    params = session.parameters[1]
+    assert params["owner_id"] == OWNER_ID
+    assert params["pattern"] == "%milk 50!%%"
+
+
+def test_short_search_skips_substring_match(db):
+    client, use = db
+    session = use(VERSION, [])
+
+    client.get("/api/v1/tasks/", params={"q": "ab"})
+
+    assert "ILIKE" not in _sql(session, 1)
+    assert "pattern" not in session.parameters[1]
+
+
+def test_search_rejects_cursor(db):
+    client, use = db
+    session = use(VERSION)
+
+    response = client.get("/api/v1/tasks/", params={"q": "milk", "cursor": "abc"})
+
+    assert response.status_code == 400
+    assert response.json()["errors"]["code"] == "tasks.invalid_cursor"
+    assert len(session.statements) == 1  # только версия, до поиска дело не дошло
+
+
+def test_include_archived_reads_union_and_adds_archive_count(db):
+    client, use = db
+    session = use(VERSION, [_row(), _row(state="done")], [4], [6])
+
+    response = client.get("/api/v1/tasks/", params={"include_archived": "true"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["x-total-count"] == "10"
+    assert len(session.statements) == 4
+    sql = _sql(session, 1)
+    assert "FROM tasks UNION ALL SELECT" in sql and "FROM tasks_archive) AS all_tasks" in sql
+    assert "all_tasks.owner_id = " in sql
+    assert _sql(session, 3).startswith("SELECT count(*) AS count_1 \nFROM tasks_archive")
+
+
+def test_default_list_stays_on_hot_table(db):
+    client, use = db
+    session = use(VERSION, [], [0])
+
+    client.get("/api/v1/tasks/")
+
+    assert "tasks_archive" not in _sql(session, 1)
+
+
+def test_stats_is_one_group_by_cached_until_write(db):
+    client, use = db
+    task_stats_cache.clear()
+    session = use(
+        [
+            {"state": TaskState.TODO, "priority": TaskPriority.HIGH, "count": 3, "overdue": 2},
+            {"state": TaskState.DONE, "priority": TaskPriority.LOW, "count": 4, "overdue": 0},
+        ]
+    )
+
+    body = client.get("/api/v1/tasks/stats").json()
+
+    assert (body["total"], body["overdue"]) == (7, 2)
+    assert len(body["items"]) == 9
+    assert {"state": "todo", "priority": "high", "count": 3, "overdue": 2} in body["items"]
+    assert len(session.statements) == 1
+    sql = _sql(session)
+    assert "GROUP BY tasks.state, tasks.priority" in sql and "FILTER (WHERE" in sql
+    assert session.parameters[0]["owner_id"] == OWNER_ID
+
+    cached = use()
+    assert client.get("/api/v1/tasks/stats").json() == body
+    assert cached.statements == []
+
+    use([_row()])
+    client.patch(f"/api/v1/tasks/{uuid.uuid4()}", json={"name": "Renamed"})
+    refreshed = use([])
+    assert client.get("/api/v1/tasks/stats").json()["total"] == 0
+    assert len(refreshed.statements) == 1
+
+
+def test_export_streams_ndjson_without_limit(db):
+    client, use = db
+    # из БД state/priority приходят уже enum-ами
+    typed = {"state": TaskState.TODO, "priority": TaskPriority.HIGH}
+    rows = [_row(name=f"Task {i}", **typed) for i in range(5)]
+    session = use(rows)
+
+    response = client.get("/api/v1/tasks/export", params={"status": "todo"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["name"] for line in lines] == [r["name"] for r in rows]
+    sql = _sql(session)
+    assert "LIMIT" not in sql and "OFFSET" not in sql
+    assert "tasks.owner_id = " in sql and sql.endswith("ORDER BY tasks.id")
+    assert session.parameters[0] == {"owner_id": OWNER_ID, "state": TaskState.TODO}
+
+
+def test_admin_export_csv_covers_all_owners(db):
+    client, use = db
+    typed = {"state": TaskState.DONE, "priority": TaskPriority.LOW}
+    session = use([_row(owner_id=uuid.uuid4(), due_at=None, **typed), _row(name="a,b", **typed)])
+
+    response = client.get("/api/v1/admin/tasks/export", params={"format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    header, first, second = list(csv.reader(io.StringIO(response.text)))
+    assert header == ["id", "name", "description", "state", "priority", "owner_id", "due_at"]
+    assert first[-1] == "" and second[1] == "a,b"
+    assert "owner_id" not in _sql(session).split("WHERE")[-1]
+
+
+def test_csv_export_neutralizes_formulas(db):
+    client, use = db
+    typed = {"state": TaskState.TODO, "priority": TaskPriority.LOW}
+    names = ["=HYPERLINK(1)", "+1", "-1", "@SUM(A1)", "\tx", "\rx", "'quoted", "plain"]
+    use([_row(name=name, description="=1+1", **typed) for name in names])
+
+    response = client.get("/api/v1/tasks/export", params={"format": "csv"})
+
+    _, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert [row[1] for row in rows] == ["'" + name for name in names[:-1]] + ["plain"]
+    assert {row[2] for row in rows} == {"'=1+1"}
+
+
+def test_import_copies_valid_lines_and_reports_the_rest(db):
+    client, use = db
+    session = use()
+    lines = [
+        json.dumps({"name": "First", "description": "d", "state": "todo", "priority": "low"}),
+        "",
+        json.dumps({"name": "x", "description": "d", "state": "todo", "priority": "low"}),
+        "{not json",
+        json.dumps({"name": "Third", "description": "d", "state": "done", "priority": "high"}),
+    ]
+
+    response = client.post("/api/v1/tasks/import", content="\n".join(lines))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["imported"], body["failed"]) == (2, 2)
+    assert [e["line"] for e in body["errors"]] == [3, 4]
+    assert session.statements == []  # ни одного INSERT — только COPY
+    ((table, columns, records),) = session.copies
+    assert table == "tasks" and columns[:4] == ["name", "description", "state", "priority"]
+    assert [r[0] for r in records] == ["First", "Third"]
+    assert records[1][2:5] == ("done", "high", OWNER_ID)
+    assert session.commits == 1
+
+
+def test_import_csv_uses_header_and_chunks_copies(db, monkeypatch):
+    client, use = db
+    session = use()
+    monkeypatch.setattr("app.api.v1.routers.tasks.IMPORT_CHUNK_SIZE", 2)
+    rows = ["name,description,state,priority,due_at"]
+    rows += [f"Task {i},d,todo,low," for i in range(5)]
+    rows.append("Broken,d,todo")
+
+    response = client.post(
+        "/api/v1/tasks/import", params={"format": "csv"}, content="\n".join(rows) + "\n"
+    )
+
+    body = response.json()
+    assert (body["imported"], body["failed"]) == (5, 1)
+    assert body["errors"][0]["line"] == 7
+    assert [len(records) for _, _, records in session.copies] == [2, 2, 1]
+    assert session.copies[0][2][0][5] is None  # пустой due_at
+
+
+def test_import_rejects_overlong_line(db, monkeypatch):
+    client, use = db
+    session = use()
+    monkeypatch.setattr("app.api.v1.routers.tasks.MAX_IMPORT_LINE_BYTES", 8)
+
+    response = client.post("/api/v1/tasks/import", content="x" * 20)
+
+    assert response.status_code == 413
+    assert response.json()["errors"]["code"] == "tasks.import_line_too_long"
+    assert session.commits == 0
+
+
+def test_import_csv_reads_multiline_fields_and_export_escaping(db):
+    client, use = db
+    typed = {"state": TaskState.TODO, "priority": TaskPriority.LOW}
+    use([_row(name="=Formula", description='line 1\nline 2, "quoted"', **typed)])
+    exported = client.get("/api/v1/tasks/export", params={"format": "csv"}).text
+    header, row = exported.split("\r\n", 1)
+    fields = ("name", "description", "state", "priority", "due_at")
+    picked = [header.split(",").index(name) for name in fields]
+    ((values),) = list(csv.reader(io.StringIO(row, newline="")))
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([fields, [values[i] for i in picked], ["Long" * 20, "d", "todo"]])
+    session = use()
+
+    response = client.post(
+        "/api/v1/tasks/import", params={"format": "csv"}, content=buffer.getvalue()
+    )
+
+    body = response.json()
+    assert (body["imported"], body["failed"]) == (1, 1)
+    assert body["errors"][0]["line"] == 4  # номер первой строки записи, после двухстрочной
+    ((_, _, records),) = session.copies
+    assert records[0][:2] == ("=Formula", 'line 1\nline 2, "quoted"')
+
+
+def test_import_reports_values_the_columns_cannot_hold(db):
+    client, use = db
+    session = use()
+    base = {"description": "d", "state": "todo", "priority": "low"}
+    lines = [
+        json.dumps({**base, "name": "x" * 64}),
+        json.dumps({**base, "name": "Nul\x00name"}),
+        json.dumps({**base, "name": "Fine"}),
+    ]
+
+    body = client.post("/api/v1/tasks/import", content="\n".join(lines)).json()
+
+    assert (body["imported"], body["failed"]) == (1, 2)
+    assert [e["line"] for e in body["errors"]] == [1, 2]
+    assert [r[0] for _, _, records in session.copies for r in records] == ["Fine"]
+
+
+def test_import_caps_rows_and_body_size(db, monkeypatch):
+    client, use = db
+    session = use()
+    monkeypatch.setattr("app.api.v1.routers.tasks.MAX_IMPORT_ROWS", 2)
+    monkeypatch.setattr("app.api.v1.routers.tasks.IMPORT_CHUNK_SIZE", 1)
+    line = json.dumps({"name": "Task", "description": "d", "state": "todo", "priority": "low"})
+
+    response = client.post("/api/v1/tasks/import", content="\n".join([line] * 3))
+
+    assert response.status_code == 413
+    assert response.json()["errors"]["code"] == "tasks.import_too_large"
+    assert session.commits == 0  # уже скопированные пачки откатываются вместе с импортом
+
+    monkeypatch.setattr("app.api.v1.routers.tasks.MAX_IMPORT_BYTES", 16)
+    response = client.post("/api/v1/tasks/import", content=line)
+    assert response.status_code == 413
+    assert response.json()["errors"]["max_bytes"] == 16
+
+
+def test_list_etag_short_circuits_to_304_after_one_query(db):
+    client, use = db
+    version = [41]
+    use(version, [], [2])
+    etag = client.get("/api/v1/tasks/", params={"limit": 10}).headers["etag"]
+    task_list_cache.clear()  # как у другого воркера, где страницы ещё нет в кэше
+
+    session = use(version)
+    response = client.get(
+        "/api/v1/tasks/", params={"limit": 10}, headers={"If-None-Match": f'W/{etag}, "x"'}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag and response.content == b""
+    assert len(session.statements) == 1
+    assert session.statements[0] is LIST_VERSION
+    assert session.parameters[0] == {"owner_id": OWNER_ID}
+
+    # любой commit с записью задач владельца увеличивает версию — список читается заново
+    use([42], [], [2])
+    assert client.get("/api/v1/tasks/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_get_task_etag_and_last_modified(db):
+    client, use = db
+    updated = dt.datetime(2026, 1, 1, 12, 0, 0, 500, tzinfo=dt.timezone.utc)
+    row = _row(updated=updated)
+    use([row])
+    response = client.get(f"/api/v1/tasks/{row['id']}")
+    etag = response.headers["etag"]
+    assert response.headers["last-modified"] == "Thu, 01 Jan 2026 12:00:00 GMT"
+
+    use([row])
+    assert (
+        client.get(f"/api/v1/tasks/{row['id']}", headers={"If-None-Match": etag}).status_code == 304
+    )
+    use([row])
+    since = {"If-Modified-Since": "Thu, 01 Jan 2026 12:00:00 GMT"}
+    assert client.get(f"/api/v1/tasks/{row['id']}", headers=since).status_code == 304
+
+    use([{**row, "updated": updated + dt.timedelta(seconds=1)}])
+    changed = client.get(f"/api/v1/tasks/{row['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_list_response_is_cached_until_owner_writes(db):
+    client, use = db
+    params = {"status": "todo", "limit": 50}
+    first = use(VERSION, [_row(name="Cached")], [1])
+    response = client.get("/api/v1/tasks/", params=params)
+    assert len(first.statements) == 3
+
+    # тот же запрос с другим порядком параметров — из кэша, без БД
+    again = use()
+    cached = client.get("/api/v1/tasks/?limit=50&status=todo")
+    assert again.statements == []
+    assert cached.json() == response.json() and cached.json()[0]["name"] == "Cached"
+    assert cached.headers["x-total-count"] == "1"
+    assert cached.headers["etag"] == response.headers["etag"]
+
+    use([_row()])
+    client.patch(f"/api/v1/tasks/{uuid.uuid4()}", json={"name": "Renamed"})
+    after_write = use(VERSION, [], [0])
+    assert client.get("/api/v1/tasks/", params=params).json() == []
+    assert len(after_write.statements) == 3
+
+    metrics = metrics_registry.snapshot()
+    assert 0 < metrics["cache_task_lists_hit_ratio"]["value"] < 1
+    # страница прошлого поколения недостижима и ждёт вытеснения по LRU/TTL
+    assert metrics["cache_task_lists_size"]["value"] == 2
+    assert metrics["cache_task_lists_bytes"]["value"] == len(response.content) + len(b"[]")
+
+
+def test_priority_sort_pages_by_rank_index(db):
+    client, use = db
+    rows = [_row(priority_rank=3), _row(priority_rank=1)]
+    session = use(VERSION, rows, [2])
+
+    response = client.get("/api/v1/tasks/", params={"sort": "priority", "limit": 1})
+
+    assert response.status_code == 200
+    assert session.statements[1] is page_statement(
+        PageShape(owned=True, has_state=False, has_due_before=False, order_by_due_first=False)
+    )
+    cursor = response.links["next"]["url"].split("cursor=")[1]
+
+    # курсор одного порядка к другому не подходит
+    use(VERSION)
+    mismatched = client.get("/api/v1/tasks/", params={"cursor": cursor})
+    assert mismatched.status_code == 400
+
+    session = use(VERSION, [rows[1]], [2])
+    client.get("/api/v1/tasks/", params={"sort": "priority", "limit": 1, "cursor": cursor})
+    assert session.parameters[1]["cursor_0"] == 3
+    assert "ORDER BY tasks.priority_rank DESC, tasks.id DESC" in _sql(session, 1)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.rate_limit import InMemoryRateLimitStore, RateLimitMiddleware
+from app.core.settings import RateLimitRule
+from fastapi import FastAPI, Form
+from fastapi.testclient import TestClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_over_window():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(max_keys=10, clock=clock)
+
+    async def _hits(n):
+        return [await store.hit("k", limit=2, window_seconds=10) for _ in range(n)]
+
+    first, second, third = asyncio.run(_hits(3))
+    assert first.allowed and second.allowed
+    assert not third.allowed
+    assert third.retry_after == 5
+
+    clock.now += 5
+    assert asyncio.run(_hits(1))[0].allowed
+
+
+def _limited_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v1/auth/token")
+    def token(username: str = Form(...), password: str = Form(...)):
+        return {"username": username}
+
+    @app.get("/api/v1/tasks/")
+    def tasks():
+        return []
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=[
+            RateLimitRule(path="/api/v1/tasks", limit=1, window_seconds=60),
+            RateLimitRule(
+                path="/api/v1/auth/token",
+                methods=["POST"],
+                key="login",
+                limit=2,
+                window_seconds=60,
+            ),
+        ],
+        store=InMemoryRateLimitStore(max_keys=100),
+    )
+    return app
+
+
+def test_login_limit_is_per_login_and_replays_body():
+    with TestClient(_limited_app()) as client:
+        for _ in range(2):
+            ok = client.post("/api/v1/auth/token", data={"username": "Eve", "password": "x"})
+            assert ok.status_code == 200
+            assert ok.json() == {"username": "Eve"}
+
+        blocked = client.post(
+            "/api/v1/auth/token",
+            data={"username": "eve", "password": "y"},
+            headers={"X-Correlation-ID": "cid-rl"},
+        )
+        other = client.post("/api/v1/auth/token", data={"username": "bob", "password": "x"})
+
+    assert blocked.status_code == 429
+    assert int(blocked.headers["retry-after"]) >= 1
+    body = blocked.json()
+    assert body["title"] == "Too Many Requests"
+    assert body["errors"]["code"] == "rate_limit.exceeded"
+    assert body["correlation_id"] == "cid-rl"
+    assert other.status_code == 200
+
+
+def test_per_route_rule_limits_by_ip():
+    with TestClient(_limited_app()) as client:
+        assert client.get("/api/v1/tasks/").status_code == 200
+        assert client.get("/api/v1/tasks/").status_code == 429
+
+
+class CountingStore(InMemoryRateLimitStore):
+    def __init__(self):
+        super().__init__(max_keys=100)
+        self.hits = 0
+
+    async def hit(self, key, *, limit, window_seconds):
+        self.hits += 1
+        return await super().hit(key, limit=limit, window_seconds=window_seconds)
+
+
+def test_only_shared_rules_use_shared_store():
+    app = FastAPI()
+
+    @app.post("/api/v1/auth/token")
+    def token(username: str = Form(...), password: str = Form(...)):
+        return {"username": username}
+
+    @app.get("/api/v1/tasks/")
+    def tasks():
+        return []
+
+    local, shared = CountingStore(), CountingStore()
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=[
+            RateLimitRule(limit=100, window_seconds=1),
+            RateLimitRule(
+                path="/api/v1/auth/token", key="login", limit=5, window_seconds=60, shared=True
+            ),
+        ],
+        store=local,
+        shared_store=shared,
+    )
+    with TestClient(app) as client:
+        client.get("/api/v1/tasks/")
+        client.get("/api/v1/tasks/")
+        client.post("/api/v1/auth/token", data={"username": "eve", "password": "x"})
+
+    assert local.hits == 3  # правило "/" — в памяти воркера, в том числе для логина
+    assert shared.hits == 1
+
+
+def test_postgres_store_purges_expired_windows(monkeypatch, recording_session):
+    from contextlib import asynccontextmanager
+
+    from adapters.db import session_context
+    from adapters.db.rate_limit_store import PostgresRateLimitStore
+
+    sessions = []
+
+    @asynccontextmanager
+    async def _session():
+        sessions.append(recording_session([len(sessions) + 1]))  # hits после upsert
+        yield sessions[-1]
+
+    monkeypatch.setattr(session_context, "get_async_session_manager", _session)
+    clock = FakeClock()
+    clock.now = 1000.0
+    store = PostgresRateLimitStore(retention_seconds=60, purge_interval_seconds=30, clock=clock)
+
+    async def _hit():
+        return await store.hit("k", limit=2, window_seconds=60)
+
+    assert asyncio.run(_hit()).allowed
+    clock.now += 10
+    assert asyncio.run(_hit()).allowed
+    clock.now += 30
+    decision = asyncio.run(_hit())
+
+    assert not decision.allowed
+    counts = [len(session.statements) for session in sessions]
+    assert counts == [2, 1, 2]  # upsert + DELETE истёкших окон не чаще purge_interval
+    purge = sessions[0].statements[1]
+    assert purge.is_delete and purge.compile().params["window_start_1"] == 940.0
+    assert all(session.commits == 1 for session in sessions)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+from adapters.db import session_context
+from adapters.db.repositories.task_repo import TaskRepository
+from adapters.db.routing import ReplicaRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeReplicaEngine:
+    def __init__(self, rows=(), fail=False):
+        self.rows = list(rows)
+        self.fail = fail
+        self.statements = []
+
+    @asynccontextmanager
+    async def connect(self):
+        if self.fail:
+            raise OSError("replica is down")
+        yield self
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return _Rows(self.rows)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+def _router(engine, clock) -> ReplicaRouter:
+    return ReplicaRouter(
+        engine,
+        read_your_writes_seconds=5,
+        unhealthy_cooldown_seconds=30,
+        max_pinned_owners=100,
+        clock=clock,
+    )
+
+
+def test_router_pins_owner_after_write_and_backs_off_after_failure():
+    clock = FakeClock()
+    engine = FakeReplicaEngine()
+    router = _router(engine, clock)
+    owner_id = uuid.uuid4()
+
+    assert router.engine_for_read(owner_id) is engine
+    router.pin(owner_id)
+    assert router.engine_for_read(owner_id) is None
+    assert router.engine_for_read(uuid.uuid4()) is engine  # пиннинг только для писавшего
+    clock.now += 6
+    assert router.engine_for_read(owner_id) is engine
+
+    router.mark_unhealthy()
+    assert router.engine_for_read() is None
+    clock.now += 31
+    assert router.engine_for_read() is engine
+
+
+def test_reads_go_to_replica_and_writes_pin_primary(recording_session, monkeypatch):
+    owner_id = uuid.uuid4()
+    row = {"id": uuid.uuid4(), "name": "Task", "owner_id": owner_id}
+    engine = FakeReplicaEngine([row])
+    monkeypatch.setattr(session_context, "replica", _router(engine, FakeClock()))
+    session = recording_session([row["id"]], [row])
+    repo = TaskRepository(session)
+
+    assert asyncio.run(repo.get(row["id"], owner_id=owner_id)).id == row["id"]
+    assert len(engine.statements) == 1 and session.statements == []
+
+    asyncio.run(repo.delete(row["id"], owner_id=owner_id))
+    asyncio.run(repo.get(row["id"], owner_id=owner_id))
+    assert len(engine.statements) == 1
+    assert len(session.statements) == 2  # DELETE и чтение после него — в primary
+
+
+def test_replica_failure_falls_back_to_primary(recording_session, monkeypatch):
+    owner_id = uuid.uuid4()
+    router = _router(FakeReplicaEngine(fail=True), FakeClock())
+    monkeypatch.setattr(session_context, "replica", router)
+    session = recording_session([{"id": uuid.uuid4(), "owner_id": owner_id}])
+
+    asyncio.run(TaskRepository(session).get(uuid.uuid4(), owner_id=owner_id))
+
+    assert len(session.statements) == 1
+    assert not router.healthy
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from adapters.db.repositories.pagination import InvalidCursorError, decode_cursor
+from adapters.db.repositories.task_counter_repo import TaskCounterRepository
+from adapters.db.repositories.task_repo import TaskRepository
+from adapters.db.repositories.task_statements import PageShape, page_statement
+from domain.value_objects.task_priority import TaskPriority
+from domain.value_objects.task_state import TaskState
+from services.errors import ConflictError
+from services.user_service import UserService
+from sqlalchemy.dialects import postgresql
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_register_is_a_single_statement(recording_session):
+    user = SimpleNamespace(id=uuid.uuid4(), login="neo", email="neo@example.com")
+    session = recording_session([user])
+
+    created = asyncio.run(
+        UserService(session).register(login="neo", email="neo@example.com", pass_hash="h")
+    )
+
+    assert created is user
+    assert len(session.statements) == 1  # поведение ON CONFLICT — tests/integration
+    assert session.commits == 0  # commit делает unit of work запроса
+
+
+@pytest.mark.parametrize(
+    "existing_login, field",
+    [("neo", "login"), ("someone-else", "email")],
+)
+def test_register_reports_conflicting_field(recording_session, existing_login, field):
+    session = recording_session([], [existing_login])
+
+    with pytest.raises(ConflictError) as exc:
+        asyncio.run(
+            UserService(session).register(login="neo", email="neo@example.com", pass_hash="h")
+        )
+
+    assert exc.value.field == field
+    assert str(exc.value) == f"{field} is already taken"
+    assert len(session.statements) == 2
+
+
+def _task(priority: TaskPriority, due_at=None) -> dict:
+    return {
+        "due_at": due_at,
+        "id": uuid.uuid4(),
+        "name": "Task",
+        "description": "Desc",
+        "state": TaskState.TODO,
+        "priority": priority,
+        "priority_rank": priority.rank,
+        "owner_id": uuid.uuid4(),
+    }
+
+
+def test_list_uses_keyset_cursor_instead_of_offset(recording_session):
+    owner_id = uuid.uuid4()
+    rows = [_task(TaskPriority.HIGH), _task(TaskPriority.LOW), _task(TaskPriority.LOW)]
+    session = recording_session(rows, rows[2:])
+    repo = TaskRepository(session)
+
+    first = asyncio.run(repo.list(owner_id=owner_id, limit=2, order_by_due_first=False))
+    assert [t.id for t in first.items] == [r["id"] for r in rows[:2]]
+    assert first.next_cursor is not None
+
+    second = asyncio.run(
+        repo.list(
+            owner_id=owner_id,
+            limit=2,
+            offset=5,
+            cursor=first.next_cursor,
+            order_by_due_first=False,
+        )
+    )
+    assert [t.id for t in second.items] == [rows[2]["id"]]
+    assert second.next_cursor is None
+
+    sql = _sql(session.statements[1])
+    assert "(tasks.priority_rank, tasks.id) < (" in sql
+    assert "OFFSET" not in sql
+    params = session.parameters[1]
+    assert rows[1]["id"] in params.values()
+    assert TaskPriority.LOW.rank in params.values()
+    assert params["limit"] == 3 and "offset" not in params
+
+
+def test_priority_rank_orders_by_urgency():
+    ranks = [p.rank for p in (TaskPriority.LOW, TaskPriority.MEDIUM, TaskPriority.HIGH)]
+    assert ranks == sorted(set(ranks))
+
+
+def test_due_first_keyset_binds_filter_and_cursor_values(recording_session):
+    due = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    rows = [_task(TaskPriority.HIGH, due), _task(TaskPriority.LOW)]
+    session = recording_session(rows)
+    repo = TaskRepository(session)
+
+    page = asyncio.run(repo.list(owner_id=uuid.uuid4(), limit=1, due_before=due))
+    assert page.items[0].due_at == due
+    assert session.parameters[0]["due_before"] == due
+
+    asyncio.run(repo.list(owner_id=uuid.uuid4(), limit=1, cursor=page.next_cursor))
+    # порядок страниц проверяет tests/integration; здесь — что курсор стал параметрами
+    assert session.statements[1] is page_statement(
+        PageShape(owned=True, has_state=False, has_due_before=False, cursor_nulls=(False,) * 3)
+    )
+    cursor_values = [session.parameters[1][f"cursor_{i}"] for i in range(3)]
+    assert cursor_values == [due, TaskPriority.HIGH.rank, rows[0]["id"]]
+
+
+def test_decode_cursor_rejects_garbage():
+    keys = TaskRepository._sort_keys()
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(keys, "bm90LWpzb24")
+
+
+def test_reconcile_rewrites_only_drifted_counters(recording_session):
+    owner_id = uuid.uuid4()
+    stored = [
+        SimpleNamespace(owner_id=owner_id, state=TaskState.TODO, count=5),
+        SimpleNamespace(owner_id=owner_id, state=TaskState.IN_PROGRES, count=2),
+        SimpleNamespace(owner_id=owner_id, state=TaskState.DONE, count=1),
+    ]
+    actual = [(owner_id, TaskState.TODO, 3), (owner_id, TaskState.IN_PROGRES, 2)]
+    session = recording_session(stored, actual)
+
+    fixed = asyncio.run(TaskCounterRepository(session).reconcile([owner_id]))
+
+    assert fixed == 2
+    assert session.statements[0]._for_update_arg is not None  # сверка под блокировкой строк
+    assert len(session.statements) == 4  # итог на реальной БД — tests/integration
+
+
+def test_page_statement_is_built_once_per_filter_shape(recording_session):
+    session = recording_session()
+    repo = TaskRepository(session)
+
+    asyncio.run(repo.list(owner_id=uuid.uuid4(), state=TaskState.TODO, limit=10))
+    asyncio.run(repo.list(owner_id=uuid.uuid4(), state=TaskState.DONE, limit=20))
+    asyncio.run(repo.list(owner_id=uuid.uuid4(), limit=20))
+
+    first, second, third = session.statements
+    assert first is second  # значения — только в параметрах, выражение то же
+    assert third is not first
+    assert first is page_statement(PageShape(owned=True, has_state=True, has_due_before=False))
+    assert session.parameters[1]["state"] is TaskState.DONE
+
+
+def test_cursor_after_due_date_reads_two_index_ranges():
+    """После непустого due_at: ветка due_at >= курсора и ветка due_at IS NULL, обе с LIMIT."""
+    after_value = page_statement(PageShape(True, False, False, cursor_nulls=(False, False, False)))
+    after_null = page_statement(PageShape(True, False, False, cursor_nulls=(True, False, False)))
+
+    [page] = after_value.get_final_froms()
+    branches = [grouping.element for grouping in page.element.selects]
+    assert len(branches) == 2
+    assert all(branch._limit_clause is not None for branch in branches)
+    assert "tasks.due_at >= " in _sql(branches[0]) and "tasks.due_at IS NULL" in _sql(branches[1])
+    # курсор на NULL — одна выборка с равенством по due_at
+    assert after_null.get_final_froms()[0].name == "tasks"
+    assert "tasks.due_at IS NULL AND" in _sql(after_null)
+
+
+def test_archive_done_moves_batch_in_one_statement(recording_session):
+    moved = [uuid.uuid4(), uuid.uuid4()]
+    session = recording_session(moved)
+    cutoff = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+
+    count = asyncio.run(TaskRepository(session).archive_done(updated_before=cutoff, limit=500))
+
+    assert count == 2
+    assert len(session.statements) == 1  # перенос на реальной БД — tests/integration
+    assert "FOR UPDATE SKIP LOCKED" in _sql(session.statements[0])
@@ -8,16 +8,18 @@ from types import SimpleNamespace
 
 import pytest
 from adapters.db.repositories.base import ForbiddenError
+from adapters.db.repositories.pagination import Page
 from app.api.v1.deps import auth as auth_deps
 from app.api.v1.routers import uploads as uploads_module
-from app.api.v1.schemas import TaskCreate, TaskRead, TaskUpdate
+from app.api.v1.schemas import TaskCreate, TaskUpdate
 from app.main import app
+from domain.entities.task import Task as TaskEntity
 from domain.value_objects.task_priority import TaskPriority
 from domain.value_objects.task_state import TaskState
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from pydantic import ValidationError
-from services.task_service import get_task_service
+from services.task_service import TaskService, get_task_service
 
 if not any(getattr(route, "path", None) == "/__test__/http-error" for route in app.router.routes):
 
@@ -33,13 +35,15 @@ class DummyTaskService:
         self.create_calls: list[dict] = []
         self.update_calls: list[dict] = []
         self.delete_calls: list[uuid.UUID] = []
-        self.sample_task = TaskRead(
+        self.next_cursor = None
+        self.sample_task = TaskEntity(
             id=uuid.uuid4(),
             name="Sample",
             description="Desc",
             state=TaskState.TODO,
             priority=TaskPriority.LOW,
             owner_id=uuid.uuid4(),
+            updated=dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc),
         )
 
     async def list_tasks(
@@ -50,6 +54,10 @@ class DummyTaskService:
         due_before=None,
         limit=50,
         offset=0,
+        cursor=None,
+        q=None,
+        include_archived=False,
+        order_by_due_first=True,
     ):
         self.list_calls.append(
             {
@@ -58,9 +66,19 @@ class DummyTaskService:
                 "due_before": due_before,
                 "limit": limit,
                 "offset": offset,
+                "cursor": cursor,
+                "q": q,
+                "include_archived": include_archived,
+                "order_by_due_first": order_by_due_first,
             }
         )
-        return []
+        return Page([], self.next_cursor)
+
+    async def count(self, *, owner_id, status=None, due_before=None, include_archived=False):
+        return 0
+
+    async def list_version(self, *, owner_id):
+        return 0
 
     async def create_task(self, **kwargs):
         self.create_calls.append(kwargs)
@@ -84,6 +102,8 @@ class DummyTaskService:
         due_before=None,
         limit=100,
         offset=0,
+        cursor=None,
+        order_by_due_first=True,
     ):
         self.admin_calls.append(
             {
@@ -91,9 +111,11 @@ class DummyTaskService:
                 "due_before": due_before,
                 "limit": limit,
                 "offset": offset,
+                "cursor": cursor,
+                "order_by_due_first": order_by_due_first,
             }
         )
-        return []
+        return Page([], self.next_cursor)
 
 
 @pytest.fixture()
@@ -257,8 +279,16 @@ def test_list_tasks_normalizes_due_before(client: TestClient, task_service_spy:
     assert call["due_before"].isoformat() == "2024-02-01T00:00:00+00:00"
 
 
+def test_task_text_limits_match_columns():
+    from adapters.db.models.task import Task
+    from app.api.v1.schemas import MAX_DESCRIPTION_LENGTH, MAX_NAME_LENGTH
+
+    assert MAX_NAME_LENGTH == Task.__table__.c.name.type.length
+    assert MAX_DESCRIPTION_LENGTH == Task.__table__.c.description.type.length
+
+
 def test_task_create_rejects_long_description():
-    long_text = "A" * 3000
+    long_text = "A" * 256
     with pytest.raises(ValidationError):
         TaskCreate(
             name="valid name",
@@ -361,6 +391,9 @@ def test_tasks_endpoint_maps_repo_forbidden(client: TestClient):
     prev_override = app.dependency_overrides[get_task_service]
 
     class FailingService:
+        async def list_version(self, **kwargs):
+            return 0
+
         async def list_tasks(self, **kwargs):
             raise ForbiddenError("nope")
 
@@ -423,3 +456,39 @@ def test_delete_task_returns_no_content(client: TestClient, task_service_spy: Du
     response = client.delete(f"/api/v1/tasks/{task_id}")
     assert response.status_code == 204
     assert task_id in task_service_spy.delete_calls
+
+
+def test_list_tasks_returns_next_page_link(client: TestClient, task_service_spy: DummyTaskService):
+    task_service_spy.next_cursor = "abc"
+    response = client.get("/api/v1/tasks/", params={"limit": 10, "offset": 20})
+    assert response.status_code == 200
+    assert response.headers["x-next-cursor"] == "abc"
+    link = response.headers["link"]
+    assert link.endswith('>; rel="next"')
+    assert "cursor=abc" in link and "offset" not in link and "limit=10" in link
+
+    response = client.get("/api/v1/tasks/", params={"cursor": "abc"})
+    assert task_service_spy.list_calls[-1]["cursor"] == "abc"
+
+
+def test_list_tasks_rejects_invalid_cursor(client: TestClient, recording_session):
+    prev_override = app.dependency_overrides[get_task_service]
+    version = [0]
+    app.dependency_overrides[get_task_service] = lambda: TaskService(recording_session(version))
+    try:
+        response = client.get("/api/v1/tasks/", params={"cursor": "not-a-cursor"})
+    finally:
+        app.dependency_overrides[get_task_service] = prev_override
+    assert response.status_code == 400
+    assert response.json()["errors"]["code"] == "tasks.invalid_cursor"
+
+
+def test_metrics_require_admin(client: TestClient, auth_overrides):
+    app.dependency_overrides.pop(auth_deps.admin_required)
+    assert client.get("/metrics").status_code == 200
+
+    auth_overrides.is_admin = False
+    assert client.get("/metrics").status_code == 403
+
+    app.dependency_overrides.pop(auth_deps.get_current_user)
+    assert client.get("/metrics").status_code == 401